@@ -98,6 +98,101 @@ def drop_all_tables(conn):
         logger.error(f"Error dropping tables: {e}")
         conn.rollback()
 
+def _dedupe_sql(table: str, hash_column: str, keep: str = 'oldest') -> str:
+    """
+    Delete rows sharing (workspace_id, hash_column), keeping the oldest or newest id
+
+    One window pass (sort per partition) instead of a self-join, which has no
+    index to use on a column that was just added.
+    """
+    order = 'id' if keep == 'oldest' else 'id DESC'
+    return f"""DELETE FROM {table} WHERE id IN (
+               SELECT id FROM (
+                   SELECT id, ROW_NUMBER() OVER (PARTITION BY workspace_id, {hash_column} ORDER BY {order}) AS n
+                   FROM {table}
+                   WHERE {hash_column} IS NOT NULL
+               ) ranked
+               WHERE n > 1
+           )"""
+
+def _schema_upgrades():
+    """
+    Additive upgrades for databases created before a column existed.
+    create_all() only creates missing tables, so new columns are added here.
+    Returns (table, column, statements) - statements run once, when column is missing.
+    """
+    from src.models.ContentDiscovery import url_hash_sql
+    
+    return [
+        ('content_discovery', 'url_hash', [
+            "ALTER TABLE content_discovery ADD COLUMN url_hash BIGINT",
+            f"UPDATE content_discovery SET url_hash = {url_hash_sql('discovered_url')}",
+            _dedupe_sql('content_discovery', 'url_hash'),
+            "DROP INDEX IF EXISTS idx_content_target_url",
+            """CREATE UNIQUE INDEX IF NOT EXISTS idx_content_workspace_url_hash
+               ON content_discovery (workspace_id, url_hash) NULLS NOT DISTINCT""",
+        ]),
+        ('js_endpoints', 'endpoint_hash', [
+            "ALTER TABLE js_endpoints ADD COLUMN endpoint_hash BIGINT",
+            f"UPDATE js_endpoints SET endpoint_hash = {url_hash_sql('endpoint')}",
+            _dedupe_sql('js_endpoints', 'endpoint_hash'),
+            """CREATE UNIQUE INDEX IF NOT EXISTS idx_jsendpoint_workspace_hash
+               ON js_endpoints (workspace_id, endpoint_hash) NULLS NOT DISTINCT""",
+        ]),
+        ('api_parameters', 'param_hash', [
+            "ALTER TABLE api_parameters ADD COLUMN param_hash BIGINT",
+            f"""UPDATE api_parameters SET param_hash = {url_hash_sql(
+                "target_url || chr(10) || parameter_name || chr(10) || COALESCE(parameter_type, 'query')"
+            )}""",
+            _dedupe_sql('api_parameters', 'param_hash'),
+            """CREATE UNIQUE INDEX IF NOT EXISTS idx_apiparam_workspace_hash
+               ON api_parameters (workspace_id, param_hash) NULLS NOT DISTINCT""",
+        ]),
+        ('api_parameters', 'occurrence_count', [
+            "ALTER TABLE api_parameters ADD COLUMN occurrence_count INTEGER NOT NULL DEFAULT 1",
+            "ALTER TABLE api_parameters ADD COLUMN IF NOT EXISTS last_seen_at TIMESTAMP WITH TIME ZONE",
+        ]),
+        ('vuln_scans', 'workspace_id', [
+            "ALTER TABLE vuln_scans ADD COLUMN workspace_id VARCHAR(36) REFERENCES workspaces(id) ON DELETE CASCADE",
+            "CREATE INDEX IF NOT EXISTS ix_vuln_scans_workspace_id ON vuln_scans (workspace_id)",
+            "CREATE INDEX IF NOT EXISTS idx_vuln_workspace_target ON vuln_scans (workspace_id, target, scanner)",
+        ]),
+        ('vuln_scans', 'target_fingerprint', [
+            "ALTER TABLE vuln_scans ADD COLUMN IF NOT EXISTS template_version VARCHAR(32)",
+            "ALTER TABLE vuln_scans ADD COLUMN target_fingerprint VARCHAR(64)",
+        ]),
+        ('vuln_findings', 'finding_hash', [
+            "ALTER TABLE vuln_findings ADD COLUMN workspace_id VARCHAR(36) REFERENCES workspaces(id) ON DELETE CASCADE",
+            "ALTER TABLE vuln_findings ADD COLUMN finding_hash BIGINT",
+            """UPDATE vuln_findings f SET workspace_id = s.workspace_id
+               FROM vuln_scans s WHERE s.id = f.vuln_scan_id""",
+            f"""UPDATE vuln_findings SET finding_hash = {url_hash_sql(
+                "COALESCE(template_id, name) || chr(10) || COALESCE(matched_at, target_url)"
+            )}""",
+            _dedupe_sql('vuln_findings', 'finding_hash', keep='newest'),
+            "CREATE INDEX IF NOT EXISTS ix_vuln_findings_workspace_id ON vuln_findings (workspace_id)",
+            """CREATE UNIQUE INDEX IF NOT EXISTS idx_finding_workspace_hash
+               ON vuln_findings (workspace_id, finding_hash) NULLS NOT DISTINCT""",
+        ]),
+    ]
+
+def apply_schema_upgrades():
+    """Add columns/indexes introduced after a table was first created"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    
+    for table, column, statements in _schema_upgrades():
+        if table not in existing_tables:
+            continue
+        columns = {c['name'] for c in inspector.get_columns(table)}
+        if column in columns:
+            continue
+        
+        logger.info(f"⬆️  Upgrading {table}: adding {column}")
+        with engine.begin() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+
 def init_db():
     """
     Initialize database tables.
@@ -107,7 +202,7 @@ def init_db():
     try:
         # Import all models to register them with the shared Base
         logger.info("📦 Importing models...")
-        from src.models import Workspace, Subdomain, ContentDiscovery, JSEndpoint, APIParameter, PortScan
+        from src.models import Workspace, Subdomain, ContentDiscovery, JSEndpoint, APIParameter, PortScan, VulnScan, VulnFinding
         
         logger.info("✓ Models imported successfully")
         
@@ -127,6 +222,7 @@ def init_db():
             # Try to create tables (will fail if there are conflicts)
             logger.info("🏗️  Attempting to create/update tables...")
             try:
+                apply_schema_upgrades()
                 Base.metadata.create_all(bind=engine)
                 
                 # Verify tables were created/updated
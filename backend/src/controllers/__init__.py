@@ -50,6 +50,23 @@ from src.controllers.content_discovery import (
     get_api_parameters
 )
 
+from src.controllers.param_mining import mine_parameters
+
+from src.controllers.adaptive_wordlist import build_adaptive_wordlist
+
+from src.controllers.zap_client import get_active_zap_scans
+
+from src.controllers.passive_cache import (
+    get_cache_stats,
+    clear_cache
+)
+
+from src.controllers.content_batch import (
+    create_content_batch,
+    run_content_batch,
+    get_content_batch_progress
+)
+
 from src.controllers.visualization import (
     get_domain_visualization_data,
     get_technology_breakdown,
@@ -70,6 +87,7 @@ from src.controllers.validation import (
 
 from src.controllers.vuln_scanner import (
     run_vulnerability_scan,
+    run_batch_vulnerability_scan,
     get_vuln_stats_by_workspace,
     get_vuln_summary
 )
@@ -116,6 +134,14 @@ __all__ = [
     'get_interesting_discoveries',
     'get_js_endpoints',
     'get_api_parameters',
+    'create_content_batch',
+    'run_content_batch',
+    'get_content_batch_progress',
+    'mine_parameters',
+    'build_adaptive_wordlist',
+    'get_active_zap_scans',
+    'get_cache_stats',
+    'clear_cache',
     
     # Visualization
     'get_domain_visualization_data',
@@ -135,6 +161,7 @@ __all__ = [
     
     # Vuln Scanner
     'run_vulnerability_scan',
+    'run_batch_vulnerability_scan',
     'get_vuln_stats_by_workspace',
     'get_vuln_summary'
 ]
\ No newline at end of file
@@ -0,0 +1,189 @@
+"""
+Adaptive Wordlist
+Builds fuzzing wordlists from the paths a workspace has already revealed
+
+Path segments of stored discoveries and JS endpoints are counted per host in
+one SQL pass. A token's hit rate is the share of the workspace's hosts where
+it appeared, with confirmed responses (status other than 404/5xx) counting
+fully and unconfirmed ones (passive, crawled, JS) counting a quarter. Ranked
+tokens go first, followed by the deduplicated base wordlist, cut to a limit,
+so fuzzers try the words most likely to hit before the long tail.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from src.config.database import engine
+from src.controllers.url_reducer import HASH_SEGMENT, NUMERIC_SEGMENT, STATIC_EXTENSIONS, UUID_SEGMENT
+from src.controllers.wordlist_index import WordlistIndex
+
+logger = logging.getLogger(__name__)
+
+ADAPTIVE_WORDLIST_DIR = os.getenv('ADAPTIVE_WORDLIST_DIR', os.path.join(tempfile.gettempdir(), 'adaptive_wordlists'))
+
+UNCONFIRMED_WEIGHT = 0.25
+MAX_TOKEN_LENGTH = 100
+
+# Characters that show up in real path segments; anything else is usually JS template noise
+TOKEN_PATTERN = re.compile(r'^[\w.\-~@+,;=:]+$')
+
+TOKEN_STATS_SQL = """
+    WITH discovered AS (
+        SELECT substring(cd.discovered_url from '^(?:[a-zA-Z][a-zA-Z0-9+.-]*://)?([^/:?#]+)') AS host,
+               split_part(split_part(coalesce(cd.path, '/'), '?', 1), '#', 1) AS path,
+               (cd.status_code IS NOT NULL AND cd.status_code <> 404 AND cd.status_code < 500) AS confirmed
+        FROM content_discovery cd
+        WHERE cd.workspace_id IS NOT DISTINCT FROM :workspace_id
+        UNION ALL
+        SELECT substring(je.source_url from '^(?:[a-zA-Z][a-zA-Z0-9+.-]*://)?([^/:?#]+)'),
+               split_part(split_part(regexp_replace(je.endpoint, '^(?:[a-zA-Z][a-zA-Z0-9+.-]*:)?//[^/]*', ''), '?', 1), '#', 1),
+               false
+        FROM js_endpoints je
+        WHERE je.workspace_id IS NOT DISTINCT FROM :workspace_id
+    ),
+    tokens AS (
+        SELECT host, token, confirmed
+        FROM discovered
+        CROSS JOIN LATERAL regexp_split_to_table(path, '/') AS token
+        WHERE token <> '' AND length(token) <= :max_length
+    )
+    SELECT token,
+           count(DISTINCT host) FILTER (WHERE confirmed) AS confirmed_hosts,
+           count(DISTINCT host) AS hosts,
+           count(*) AS occurrences,
+           (SELECT count(DISTINCT host) FROM discovered) AS total_hosts
+    FROM tokens
+    GROUP BY token
+"""
+
+
+@dataclass
+class AdaptiveWordlist:
+    path: str
+    words: int = 0
+    mined_words: int = 0
+    base_words: int = 0
+    total_hosts: int = 0
+    top_words: List[Tuple[str, float]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return {
+            'path': self.path,
+            'words': self.words,
+            'mined_words': self.mined_words,
+            'base_words': self.base_words,
+            'total_hosts': self.total_hosts,
+            'top_words': [{'word': word, 'hit_rate': round(rate, 4)} for word, rate in self.top_words],
+        }
+
+
+def is_wordlist_token(token: str) -> bool:
+    """Whether a path segment is worth fuzzing elsewhere (not an ID, hash or static asset)"""
+    if not TOKEN_PATTERN.match(token):
+        return False
+    if NUMERIC_SEGMENT.match(token) or UUID_SEGMENT.match(token) or HASH_SEGMENT.match(token):
+        return False
+    if '.' in token and token.rsplit('.', 1)[1].lower() in STATIC_EXTENSIONS:
+        return False
+    return True
+
+
+def rank_tokens(workspace_id: Optional[str]) -> Tuple[List[Tuple[str, float]], int]:
+    """
+    Path tokens of a workspace ranked by hit rate
+
+    Returns:
+        ([(token, hit_rate)] best first, number of hosts in the workspace)
+    """
+    with engine.connect() as conn:
+        rows = conn.execute(text(TOKEN_STATS_SQL), {
+            'workspace_id': workspace_id,
+            'max_length': MAX_TOKEN_LENGTH,
+        }).all()
+
+    if not rows:
+        return [], 0
+
+    total_hosts = max(1, rows[0].total_hosts)
+    scored = []
+    for row in rows:
+        if not is_wordlist_token(row.token):
+            continue
+        unconfirmed = row.hosts - row.confirmed_hosts
+        hit_rate = (row.confirmed_hosts + UNCONFIRMED_WEIGHT * unconfirmed) / total_hosts
+        scored.append((row.token, hit_rate, row.occurrences))
+
+    scored.sort(key=lambda item: (-item[1], -item[2], item[0]))
+    return [(token, hit_rate) for token, hit_rate, _ in scored], total_hosts
+
+
+def build_adaptive_wordlist(
+    workspace_id: Optional[str],
+    base_wordlist: Optional[str] = None,
+    limit: Optional[int] = 5000
+) -> AdaptiveWordlist:
+    """
+    Write a ranked wordlist for a workspace
+
+    Args:
+        workspace_id: Workspace whose discoveries are mined
+        base_wordlist: Static wordlist appended after the mined tokens
+        limit: Maximum words in the result (None keeps everything)
+
+    Returns:
+        AdaptiveWordlist with the file path and ranking stats
+    """
+    ranked, total_hosts = rank_tokens(workspace_id)
+
+    key = hashlib.sha1(f"{base_wordlist}:{limit}".encode()).hexdigest()[:8]
+    os.makedirs(ADAPTIVE_WORDLIST_DIR, exist_ok=True)
+    path = os.path.join(ADAPTIVE_WORDLIST_DIR, f"adaptive_{workspace_id or 'global'}_{key}.txt")
+    result = AdaptiveWordlist(path=path, total_hosts=total_hosts, top_words=ranked[:20])
+
+    seen = set()
+    # Unique per writer: scans in one workspace may build the same list at once, and
+    # scans running in the same process share a PID
+    fd, tmp_path = tempfile.mkstemp(dir=ADAPTIVE_WORDLIST_DIR, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            def emit(word: str) -> bool:
+                if limit is not None and result.words >= limit:
+                    return False
+                if word not in seen:
+                    seen.add(word)
+                    f.write(word)
+                    f.write('\n')
+                    result.words += 1
+                return True
+
+            for token, _ in ranked:
+                if not emit(token):
+                    break
+            result.mined_words = result.words
+
+            if base_wordlist:
+                try:
+                    with WordlistIndex(base_wordlist) as index:
+                        for word in index.words():
+                            if not emit(word):
+                                break
+                except OSError as e:
+                    logger.warning(f"Could not read base wordlist {base_wordlist}: {e}")
+            result.base_words = result.words - result.mined_words
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    logger.info(f"Adaptive wordlist for workspace {workspace_id}: {result.words} words "
+                f"({result.mined_words} mined from {total_hosts} hosts, {result.base_words} from base)")
+    return result
@@ -0,0 +1,304 @@
+"""
+Batch Content Discovery
+Runs content discovery across every matching host in a workspace
+
+Hosts are selected from probed subdomains (is_active / http_status / risk_score
+filters) and scanned by a bounded worker pool. The wordlist is loaded and
+deduplicated once per batch and shared by every host's fuzzers; so is the
+adaptive wordlist, when one is requested. Per-host
+progress is kept in memory and aggregated on request.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from src.models.Subdomain import Subdomain
+from src.controllers.adaptive_wordlist import build_adaptive_wordlist
+from src.controllers.content_discovery import ContentDiscoveryConfig, start_content_discovery
+
+logger = logging.getLogger(__name__)
+
+# Hard cap on hosts scanned at once by a single batch
+MAX_BATCH_CONCURRENCY = 10
+
+# Finished batches kept in memory for progress queries
+BATCH_HISTORY_SIZE = 50
+
+HOST_STATUSES = ('queued', 'running', 'completed', 'failed')
+
+_batches: 'OrderedDict[str, ContentBatch]' = OrderedDict()
+_batches_lock = threading.Lock()
+
+
+class ContentBatch:
+    """In-memory progress of one batch run (updated from worker threads)"""
+
+    def __init__(self, workspace_id: str, hosts: List[Dict], options: Dict, max_concurrent: int):
+        self.id = str(uuid.uuid4())
+        self.workspace_id = workspace_id
+        self.options = options
+        self.max_concurrent = max_concurrent
+        self.status = 'pending'
+        self.created_at = datetime.utcnow()
+        self.completed_at: Optional[datetime] = None
+        self.adaptive_wordlist: Optional[Dict] = None
+        self._lock = threading.Lock()
+        self.hosts: Dict[str, Dict] = {
+            host['target_url']: {
+                'target_url': host['target_url'],
+                'subdomain_id': host['subdomain_id'],
+                'status': 'queued',
+                'scan_id': None,
+                'total_unique_urls': 0,
+                'new_urls_saved': 0,
+                'tool_results': {},
+                'error': None,
+                'started_at': None,
+                'completed_at': None,
+            }
+            for host in hosts
+        }
+
+    def update_host(self, target_url: str, **fields):
+        with self._lock:
+            self.hosts[target_url].update(fields)
+
+    def to_dict(self, include_hosts: bool = True) -> Dict:
+        with self._lock:
+            hosts = [dict(host) for host in self.hosts.values()]
+
+        counts = {status: 0 for status in HOST_STATUSES}
+        for host in hosts:
+            counts[host['status']] += 1
+
+        finished = counts['completed'] + counts['failed']
+        result = {
+            'batch_id': self.id,
+            'workspace_id': self.workspace_id,
+            'status': self.status,
+            'max_concurrent': self.max_concurrent,
+            'total_hosts': len(hosts),
+            'hosts_by_status': counts,
+            'progress': round(finished / len(hosts) * 100, 1) if hosts else 100.0,
+            'total_unique_urls': sum(host['total_unique_urls'] for host in hosts),
+            'new_urls_saved': sum(host['new_urls_saved'] for host in hosts),
+            'created_at': self.created_at.isoformat(),
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'adaptive_wordlist': self.adaptive_wordlist,
+        }
+        if include_hosts:
+            result['hosts'] = hosts
+        return result
+
+
+def select_batch_hosts(
+    db: Session,
+    workspace_id: str,
+    is_active: Optional[bool] = True,
+    http_status: Optional[List[int]] = None,
+    min_risk_score: Optional[int] = None,
+    max_risk_score: Optional[int] = None
+) -> List[Dict]:
+    """Probed subdomains in a workspace matching the batch filters"""
+    query = db.query(Subdomain).filter(Subdomain.workspace_id == workspace_id)
+
+    if is_active is not None:
+        query = query.filter(Subdomain.is_active == is_active)
+    if http_status:
+        query = query.filter(
+            (Subdomain.http_status.in_(http_status)) | (Subdomain.https_status.in_(http_status))
+        )
+    if min_risk_score is not None:
+        query = query.filter(Subdomain.risk_score >= min_risk_score)
+    if max_risk_score is not None:
+        query = query.filter(Subdomain.risk_score <= max_risk_score)
+
+    hosts = []
+    seen = set()
+    for subdomain in query.order_by(Subdomain.risk_score.desc()).all():
+        scheme = 'https' if subdomain.https_status else 'http'
+        target_url = f"{scheme}://{subdomain.full_domain}"
+        if target_url in seen:
+            continue
+        seen.add(target_url)
+        hosts.append({'target_url': target_url, 'subdomain_id': subdomain.id})
+
+    return hosts
+
+
+def load_shared_wordlist(path: str, batch_id: str) -> Optional[str]:
+    """
+    Read and deduplicate a wordlist once, writing a copy every host in the batch uses
+
+    Returns:
+        Path of the shared copy, or None if the wordlist can't be read
+    """
+    try:
+        with open(path, 'r', errors='ignore') as f:
+            words = list(dict.fromkeys(line.strip() for line in f if line.strip() and not line.startswith('#')))
+    except OSError as e:
+        logger.warning(f"Could not load wordlist {path}: {e}")
+        return None
+
+    shared = os.path.join(tempfile.gettempdir(), f"wordlist_{batch_id}.txt")
+    with open(shared, 'w') as f:
+        f.write('\n'.join(words))
+
+    logger.info(f"Loaded {len(words)} unique words from {path} for batch {batch_id}")
+    return shared
+
+
+def create_content_batch(
+    db: Session,
+    workspace_id: str,
+    is_active: Optional[bool] = True,
+    http_status: Optional[List[int]] = None,
+    min_risk_score: Optional[int] = None,
+    max_risk_score: Optional[int] = None,
+    max_concurrent: int = 3,
+    **options
+) -> ContentBatch:
+    """
+    Select hosts and register a batch (run it with run_content_batch)
+
+    A batch whose filters match no host is registered as already completed.
+
+    Args:
+        db: Database session
+        workspace_id: Workspace whose subdomains are scanned
+        is_active / http_status / min_risk_score / max_risk_score: Host filters
+        max_concurrent: Hosts scanned at once (capped at MAX_BATCH_CONCURRENCY)
+        **options: ContentDiscoveryConfig fields applied to every host
+
+    Returns:
+        The registered ContentBatch
+    """
+    hosts = select_batch_hosts(db, workspace_id, is_active, http_status, min_risk_score, max_risk_score)
+    batch = ContentBatch(
+        workspace_id=workspace_id,
+        hosts=hosts,
+        options=options,
+        max_concurrent=max(1, min(max_concurrent, MAX_BATCH_CONCURRENCY))
+    )
+    if not hosts:
+        # Nothing to run, so no run_content_batch will ever finish it
+        batch.status = 'completed'
+        batch.completed_at = datetime.utcnow()
+
+    with _batches_lock:
+        _batches[batch.id] = batch
+        while len(_batches) > BATCH_HISTORY_SIZE:
+            _batches.popitem(last=False)
+
+    logger.info(f"Created content batch {batch.id} with {len(hosts)} hosts for workspace {workspace_id}")
+    return batch
+
+
+def _scan_host(batch: ContentBatch, target_url: str, options: Dict):
+    host = batch.hosts[target_url]
+    batch.update_host(target_url, status='running', started_at=datetime.utcnow().isoformat())
+
+    try:
+        result = start_content_discovery(
+            target_url=target_url,
+            workspace_id=batch.workspace_id,
+            subdomain_id=host['subdomain_id'],
+            **options
+        )
+        batch.update_host(
+            target_url,
+            status='completed',
+            scan_id=result.get('scan_id'),
+            total_unique_urls=result.get('total_unique_urls', 0),
+            new_urls_saved=result.get('new_urls_saved', 0),
+            tool_results=result.get('tool_results', {}),
+            completed_at=datetime.utcnow().isoformat()
+        )
+    except Exception as e:
+        logger.error(f"Batch content discovery failed for {target_url}: {e}")
+        batch.update_host(target_url, status='failed', error=str(e), completed_at=datetime.utcnow().isoformat())
+
+
+def use_batch_adaptive_wordlist(batch: ContentBatch, options: Dict) -> Optional[str]:
+    """
+    Build the workspace's adaptive wordlist once and point every host at it
+
+    Hosts then skip building their own copy. Returns the built file's path, or
+    None when adaptive wordlists are off or the build fails (hosts keep the
+    static list, as a single scan would).
+    """
+    if not options.get('adaptive_wordlist'):
+        return None
+    options['adaptive_wordlist'] = False
+    if options.get('scan_type', ContentDiscoveryConfig.scan_type).lower() not in ('full', 'fuzzing'):
+        return None
+
+    base_wordlist = options.get('wordlist', ContentDiscoveryConfig.wordlist)
+    try:
+        wordlist = build_adaptive_wordlist(
+            batch.workspace_id,
+            base_wordlist=base_wordlist,
+            limit=options.get('adaptive_wordlist_limit', ContentDiscoveryConfig.adaptive_wordlist_limit)
+        )
+    except Exception as e:
+        logger.warning(f"Adaptive wordlist failed for batch {batch.id}, keeping {base_wordlist}: {e}")
+        return None
+
+    if not wordlist.words:
+        return None
+    options['wordlist'] = wordlist.path
+    batch.adaptive_wordlist = wordlist.to_dict()
+    return wordlist.path
+
+
+def run_content_batch(batch_id: str):
+    """Scan every host of a batch with at most batch.max_concurrent at once (blocking)"""
+    batch = get_content_batch(batch_id)
+    if batch is None:
+        logger.error(f"Content batch {batch_id} not found")
+        return
+
+    batch.status = 'running'
+    options = dict(batch.options)
+    wordlist = options.get('wordlist', ContentDiscoveryConfig.wordlist)
+    shared_wordlist = load_shared_wordlist(wordlist, batch.id)
+    if shared_wordlist:
+        options['wordlist'] = shared_wordlist
+    adaptive_wordlist = use_batch_adaptive_wordlist(batch, options)
+
+    try:
+        with ThreadPoolExecutor(max_workers=batch.max_concurrent) as executor:
+            for target_url in list(batch.hosts):
+                executor.submit(_scan_host, batch, target_url, options)
+        batch.status = 'completed'
+    except Exception as e:
+        logger.error(f"Content batch {batch.id} failed: {e}")
+        batch.status = 'failed'
+    finally:
+        batch.completed_at = datetime.utcnow()
+        # The adaptive list's name derives from its base, so it's private to this batch only when
+        # built on the batch's own copy (single scans may be using one built on the static list)
+        for path in (shared_wordlist, adaptive_wordlist if shared_wordlist else None):
+            if path and os.path.exists(path):
+                os.unlink(path)
+
+    logger.info(f"Content batch {batch.id} finished: {batch.to_dict(include_hosts=False)['hosts_by_status']}")
+
+
+def get_content_batch(batch_id: str) -> Optional[ContentBatch]:
+    with _batches_lock:
+        return _batches.get(batch_id)
+
+
+def get_content_batch_progress(batch_id: str, include_hosts: bool = True) -> Optional[Dict]:
+    batch = get_content_batch(batch_id)
+    return batch.to_dict(include_hosts=include_hosts) if batch else None
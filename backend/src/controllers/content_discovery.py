@@ -6,7 +6,10 @@ import logging
 import re
 import os
 import tempfile
-from typing import List, Dict, Optional, Set
+import shutil
+import threading
+import itertools
+from typing import Callable, List, Dict, Iterator, Optional, Tuple
 from urllib.parse import urlparse, urljoin
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
@@ -15,10 +18,29 @@ import requests
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from src.config.database import get_db, SessionLocal
-from src.models.ContentDiscovery import ContentDiscovery, JSEndpoint, APIParameter
+from src.models.ContentDiscovery import ContentDiscovery, JSEndpoint, APIParameter, url_hash, param_key
 from src.models.Workspace import Workspace
+from src.controllers.discovery_records import DiscoveryRecord, DiscoveryMerge
+from src.controllers.url_reducer import reduce_records
+from src.controllers.js_analysis import analyze_js_urls, classify_endpoint, collect_js_urls
+from src.controllers.recursion_scheduler import RecursionScheduler
+from src.controllers.response_calibration import Calibration, calibrate_target
+from src.controllers.param_mining import mine_parameters
+from src.controllers.passive_cache import DEFAULT_TTL as PASSIVE_CACHE_TTL, CacheWriter, iter_cached_lines
+from src.controllers.zap_client import zap_service
+from src.controllers.tool_stream import FileStream, ToolStream
+from src.controllers.tool_scheduler import ToolScheduler, ToolTask, split_rate_limit
+from src.controllers.wordlist_index import ShardCheckpoint, WordlistIndex
+from src.controllers.adaptive_wordlist import build_adaptive_wordlist
+from src.controllers.content_ingest import (
+    bulk_ingest_discoveries,
+    INTERESTING_STATUS_CODES,
+    INTERESTING_KEYWORDS,
+    INTERESTING_CONTENT_LENGTH
+)
 
 # Disable SSL warnings
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
@@ -47,6 +69,14 @@ class ContentDiscoveryConfig:
     use_ffuf: bool = True
     use_feroxbuster: bool = True
     wordlist: str = "/opt/wordlists/common.txt"
+    recursive_fuzzing: bool = True  # fuzz promising discovered directories (replaces feroxbuster -d 2)
+    recursion_request_budget: int = 50000  # follow-up fuzzing requests per target
+    recursion_max_depth: int = 3
+    wordlist_extensions: Optional[List[str]] = None  # e.g. ["php", "bak"]; each word is also tried with these
+    wordlist_shards: int = 1  # >1 splits the deduped wordlist into checkpointed shards
+    fuzz_workers: int = 1  # ffuf/feroxbuster processes working through the shards
+    adaptive_wordlist: bool = False  # put the workspace's highest hit-rate path tokens first
+    adaptive_wordlist_limit: int = 5000
     
     # Passive options
     use_waymore: bool = True
@@ -63,20 +93,29 @@ class ContentDiscoveryConfig:
     # JS Analysis options
     use_linkfinder: bool = True
     use_jsluice: bool = False
+    use_js_fetch: bool = True  # fetch .js files found by crawlers and mine endpoints
+    js_fetch_limit: int = 500
+    js_fetch_concurrency: int = 20
     
     # API Discovery options
     use_kiterunner: bool = False
     use_paramspider: bool = False
+    mine_parameters: bool = True  # build the parameter inventory from saved URLs
     
     # Specialized tools
-    use_unfurl: bool = True
-    use_uro: bool = True
+    use_unfurl: bool = True  # canonicalize URLs in-process (see url_canonical)
+    use_uro: bool = True  # reduce URLs by pattern in-process (see url_reducer)
     use_nuclei: bool = False
     
     # General options
     threads: int = 10
     timeout: int = 600
     rate_limit: int = 150
+    max_active_tools: int = 2  # tools hitting the target at once; rate_limit is split between them
+    max_parallel_tools: int = 4
+    calibrate: bool = True  # filter soft-404 / wildcard responses
+    refresh_passive_cache: bool = False  # ignore cached gau/waymore/paramspider output
+    passive_cache_ttl: int = PASSIVE_CACHE_TTL
     follow_redirects: bool = True
     subdomain_id: Optional[int] = None
     
@@ -89,8 +128,17 @@ class ContentDiscoveryScanner:
     def __init__(self, config: ContentDiscoveryConfig):
         self.config = config
         self.scan_id = str(uuid.uuid4())
-        self.discovered_urls: Set[str] = set()
+        self.discovered_urls: DiscoveryMerge = DiscoveryMerge()
         self.results: List[Dict] = []
+        self.calibration: Optional[Calibration] = None
+        self.js_analysis: Optional[Dict] = None
+        self.recursion: Optional[Dict] = None
+        self.sharding: Dict[str, Dict] = {}
+        # URL patterns and URLs already saved by sharded fuzzing (use_uro), shared by every shard and tool
+        self._shard_patterns: set = set()
+        self._shard_saved_urls: List[str] = []
+        self._shard_patterns_lock = threading.Lock()
+        self.adaptive_wordlist: Optional[Dict] = None
         
     def check_tool_installed(self, tool_name: str) -> bool:
         try:
@@ -112,27 +160,63 @@ class ContentDiscoveryScanner:
             path += '?' + parsed.query
         return path
     
+    def _new_merge(self) -> DiscoveryMerge:
+        # use_unfurl now means in-process canonicalization as tools report URLs
+        return DiscoveryMerge(canonical=self.config.use_unfurl)
+    
+    def calibrate(self) -> Optional[Calibration]:
+        try:
+            return calibrate_target(self.normalize_url(self.config.target_url))
+        except Exception as e:
+            logger.warning(f"Calibration failed for {self.config.target_url}: {e}")
+            return None
+    
+    def use_adaptive_wordlist(self):
+        """Swap the configured wordlist for one ranked by the workspace's discovery history"""
+        try:
+            wordlist = build_adaptive_wordlist(
+                self.config.workspace_id,
+                base_wordlist=self.config.wordlist,
+                limit=self.config.adaptive_wordlist_limit
+            )
+        except Exception as e:
+            logger.warning(f"Adaptive wordlist failed, keeping {self.config.wordlist}: {e}")
+            return
+        
+        if wordlist.words:
+            self.config.wordlist = wordlist.path
+            self.adaptive_wordlist = wordlist.to_dict()
+    
+    def _tool_scheduler(self) -> ToolScheduler:
+        return ToolScheduler(
+            urlparse(self.normalize_url(self.config.target_url)).netloc.lower(),
+            max_active=self.config.max_active_tools,
+            max_parallel=self.config.max_parallel_tools
+        )
+    
+    def _active_rate_limit(self) -> int:
+        return split_rate_limit(self.config.rate_limit, self.config.max_active_tools)
+    
     # ==================== FUZZING TOOLS ====================
     
-    def run_ffuf(self) -> Set[Dict]:
-        if not self.check_tool_installed('ffuf'):
-            logger.warning("ffuf not installed, skipping...")
-            return set()
+    def _ffuf_pass(self, target: str, wordlist: str, rate: int, tag: str,
+                   extensions: Optional[List[str]] = None) -> DiscoveryMerge:
+        """One ffuf run over a wordlist; raises on timeout so callers can retry the work"""
+        results = self._new_merge()
+        output_file = f"/tmp/ffuf_{self.scan_id}_{tag}.json"
         
-        logger.info(f"Running ffuf for {self.config.target_url}")
-        results = set()
+        cmd = [
+            'ffuf', '-u', f"{target}/FUZZ", '-w', wordlist,
+            '-mc', 'all', '-fc', '404', '-t', str(self.config.threads),
+            '-rate', str(rate), '-o', output_file,
+            '-of', 'json', '-s', '-timeout', '10'
+        ]
+        if extensions:
+            cmd += ['-e', ','.join(f".{ext.lstrip('.')}" for ext in extensions)]
+        if self.calibration:
+            cmd += self.calibration.ffuf_args()
         
         try:
-            target = self.normalize_url(self.config.target_url)
-            output_file = f"/tmp/ffuf_{self.scan_id}.json"
-            
-            cmd = [
-                'ffuf', '-u', f"{target}/FUZZ", '-w', self.config.wordlist,
-                '-mc', 'all', '-fc', '404', '-t', str(self.config.threads),
-                '-rate', str(self.config.rate_limit), '-o', output_file,
-                '-of', 'json', '-s', '-timeout', '10'
-            ]
-            
             subprocess.run(cmd, capture_output=True, timeout=self.config.timeout)
             
             if os.path.exists(output_file):
@@ -141,17 +225,38 @@ class ContentDiscoveryScanner:
                     for result in data.get('results', []):
                         discovered_url = result.get('url', '')
                         if discovered_url:
-                            results.add(json.dumps({
-                                'url': discovered_url,
-                                'status_code': result.get('status', 0),
-                                'content_length': result.get('length', 0),
-                                'words': result.get('words', 0),
-                                'lines': result.get('lines', 0),
-                                'response_time': result.get('duration', 0) // 1000000,
-                                'tool': 'ffuf',
-                                'discovery_type': 'fuzzing'
-                            }))
+                            results.add(DiscoveryRecord(
+                                url=discovered_url,
+                                tool='ffuf',
+                                discovery_type='fuzzing',
+                                status_code=result.get('status', 0),
+                                content_length=result.get('length', 0),
+                                words=result.get('words', 0),
+                                lines=result.get('lines', 0),
+                                response_time=result.get('duration', 0) // 1000000
+                            ))
+        finally:
+            if os.path.exists(output_file):
                 os.unlink(output_file)
+        
+        return results
+    
+    def run_ffuf(self, base_url: Optional[str] = None) -> DiscoveryMerge:
+        if not self.check_tool_installed('ffuf'):
+            logger.warning("ffuf not installed, skipping...")
+            return DiscoveryMerge()
+        
+        target = (base_url or self.normalize_url(self.config.target_url)).rstrip('/')
+        logger.info(f"Running ffuf for {target}")
+        results = self._new_merge()
+        
+        try:
+            # Recursion passes stay single-run; the main pass is sharded when configured
+            if base_url is None and self._use_wordlist_shards():
+                results = self._run_sharded('ffuf', lambda wordlist, rate, tag: self._ffuf_pass(target, wordlist, rate, tag))
+            else:
+                results = self._ffuf_pass(target, self.config.wordlist, self._active_rate_limit(), 'main',
+                                          extensions=self.config.wordlist_extensions)
             
             logger.info(f"ffuf found {len(results)} paths")
             
@@ -162,25 +267,26 @@ class ContentDiscoveryScanner:
         
         return results
     
-    def run_feroxbuster(self) -> Set[Dict]:
-        if not self.check_tool_installed('feroxbuster'):
-            logger.warning("feroxbuster not installed, skipping...")
-            return set()
+    def _feroxbuster_pass(self, target: str, wordlist: str, rate: int, tag: str,
+                          extensions: Optional[List[str]] = None) -> DiscoveryMerge:
+        """One feroxbuster run over a wordlist; raises on timeout so callers can retry the work"""
+        results = self._new_merge()
+        output_file = f"/tmp/feroxbuster_{self.scan_id}_{tag}.json"
         
-        logger.info(f"Running feroxbuster for {self.config.target_url}")
-        results = set()
+        cmd = [
+            'feroxbuster', '-u', target, '-w', wordlist,
+            '-t', str(self.config.threads), '--rate-limit', str(rate),
+            '-o', output_file, '--json', '--silent', '--auto-bail', '--auto-tune',
+            '-k', '--timeout', '10'
+        ]
+        # With recursive_fuzzing the scheduler owns recursion and its budget
+        cmd += ['--no-recursion'] if self.config.recursive_fuzzing else ['-d', '2']
+        if extensions:
+            cmd += ['-x'] + [ext.lstrip('.') for ext in extensions]
+        if self.calibration:
+            cmd += self.calibration.feroxbuster_args()
         
         try:
-            target = self.normalize_url(self.config.target_url)
-            output_file = f"/tmp/feroxbuster_{self.scan_id}.json"
-            
-            cmd = [
-                'feroxbuster', '-u', target, '-w', self.config.wordlist,
-                '-t', str(self.config.threads), '--rate-limit', str(self.config.rate_limit),
-                '-o', output_file, '--json', '--silent', '--auto-bail', '--auto-tune',
-                '-d', '2', '-k', '--timeout', '10'
-            ]
-            
             subprocess.run(cmd, capture_output=True, timeout=self.config.timeout)
             
             if os.path.exists(output_file):
@@ -189,18 +295,39 @@ class ContentDiscoveryScanner:
                         try:
                             data = json.loads(line.strip())
                             if data.get('type') == 'response':
-                                results.add(json.dumps({
-                                    'url': data.get('url', ''),
-                                    'status_code': data.get('status', 0),
-                                    'content_length': data.get('content_length', 0),
-                                    'words': data.get('word_count', 0),
-                                    'lines': data.get('line_count', 0),
-                                    'tool': 'feroxbuster',
-                                    'discovery_type': 'fuzzing'
-                                }))
+                                results.add(DiscoveryRecord(
+                                    url=data.get('url', ''),
+                                    tool='feroxbuster',
+                                    discovery_type='fuzzing',
+                                    status_code=data.get('status', 0),
+                                    content_length=data.get('content_length', 0),
+                                    words=data.get('word_count', 0),
+                                    lines=data.get('line_count', 0)
+                                ))
                         except json.JSONDecodeError:
                             continue
+        finally:
+            if os.path.exists(output_file):
                 os.unlink(output_file)
+        
+        return results
+    
+    def run_feroxbuster(self) -> DiscoveryMerge:
+        if not self.check_tool_installed('feroxbuster'):
+            logger.warning("feroxbuster not installed, skipping...")
+            return DiscoveryMerge()
+        
+        logger.info(f"Running feroxbuster for {self.config.target_url}")
+        results = self._new_merge()
+        
+        try:
+            target = self.normalize_url(self.config.target_url)
+            
+            if self._use_wordlist_shards():
+                results = self._run_sharded('feroxbuster', lambda wordlist, rate, tag: self._feroxbuster_pass(target, wordlist, rate, tag))
+            else:
+                results = self._feroxbuster_pass(target, self.config.wordlist, self._active_rate_limit(), 'main',
+                                                 extensions=self.config.wordlist_extensions)
             
             logger.info(f"feroxbuster found {len(results)} paths")
             
@@ -211,35 +338,195 @@ class ContentDiscoveryScanner:
         
         return results
     
+    def _use_wordlist_shards(self) -> bool:
+        return self.config.wordlist_shards > 1 or self.config.fuzz_workers > 1
+    
+    def _run_sharded(self, tool: str, run_pass: Callable[[str, int, str], DiscoveryMerge]) -> DiscoveryMerge:
+        """
+        Run a fuzzer over the indexed wordlist shard by shard
+        
+        Workers claim shards from a checkpoint keyed by tool, workspace, target,
+        wordlist and extensions. Each finished shard is saved before it is
+        marked done, so a rerun after a crash (on this or another node sharing
+        the checkpoint directory) only fuzzes the remaining shards.
+        
+        With use_uro, each shard is reduced by URL pattern before it is saved,
+        against the patterns every earlier shard of this run already saved, so
+        the database gets the same one-record-per-pattern result as the
+        unsharded path (run_uro keeps those saved records as their patterns'
+        representatives). Shards finished by an earlier, interrupted run aren't
+        known here and their patterns may be saved again.
+        """
+        results = self._new_merge()
+        workers = max(1, self.config.fuzz_workers)
+        total_shards = max(self.config.wordlist_shards, workers)
+        extensions = self.config.wordlist_extensions or []
+        target = self.normalize_url(self.config.target_url)
+        # Workers share the tool's slice of the target's rate limit
+        rate = split_rate_limit(self._active_rate_limit(), workers)
+        
+        with WordlistIndex(self.config.wordlist, extensions) as index:
+            # The fingerprint keeps a rebuilt (e.g. adaptive) wordlist from resuming stale shards
+            job_key = '|'.join([tool, self.config.workspace_id or '', target, index.fingerprint, ','.join(extensions)])
+            checkpoint = ShardCheckpoint(job_key, total_shards)
+            resumed = len(checkpoint.done_shards())
+            shard_dir = tempfile.mkdtemp(prefix=f"{tool}_shards_")
+            saved = 0
+            
+            def worker() -> Tuple[DiscoveryMerge, int]:
+                found = self._new_merge()
+                worker_saved = 0
+                while True:
+                    shard = checkpoint.claim_next()
+                    if shard is None:
+                        return found, worker_saved
+                    shard_file = os.path.join(shard_dir, f"shard_{shard}.txt")
+                    try:
+                        index.write_shard(shard, total_shards, shard_file)
+                        records = run_pass(shard_file, rate, f"shard{shard}")
+                        if self.calibration:
+                            records = self.calibration.filter_records(records)
+                        if self.config.use_uro:
+                            with self._shard_patterns_lock:
+                                records = reduce_records(records, self._shard_patterns)
+                                self._shard_saved_urls.extend(records.urls())
+                        worker_saved += bulk_ingest_discoveries(
+                            records,
+                            target_url=self.config.target_url,
+                            scan_id=self.scan_id,
+                            workspace_id=self.config.workspace_id,
+                            subdomain_id=self.config.subdomain_id
+                        )
+                        checkpoint.mark_done(shard)
+                        found.update(records)
+                    except Exception as e:
+                        # Leave the shard for a later run instead of retrying it in a loop
+                        logger.error(f"{tool} shard {shard}/{total_shards} failed: {e}")
+                        checkpoint.release(shard)
+                        return found, worker_saved
+                    finally:
+                        if os.path.exists(shard_file):
+                            os.unlink(shard_file)
+            
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    for future in [executor.submit(worker) for _ in range(workers)]:
+                        found, worker_saved = future.result()
+                        results.update(found)
+                        saved += worker_saved
+            finally:
+                shutil.rmtree(shard_dir, ignore_errors=True)
+            
+            done = len(checkpoint.done_shards())
+            if checkpoint.complete:
+                checkpoint.clear()
+            
+            self.sharding[tool] = {
+                'words': len(index),
+                'unique_words': index.unique_words,
+                'total_shards': total_shards,
+                'resumed_shards': resumed,
+                'done_shards': done,
+                'workers': workers,
+                'saved': saved,
+            }
+        
+        logger.info(f"{tool} sharded run: {self.sharding[tool]}")
+        return results
+    
+    def _wordlist_size(self) -> Optional[int]:
+        """Words one fuzzing pass sends, or None if the wordlist can't be indexed"""
+        try:
+            with WordlistIndex(self.config.wordlist, self.config.wordlist_extensions) as index:
+                return len(index)
+        except OSError as e:
+            logger.error(f"Could not index wordlist {self.config.wordlist}: {e}")
+            return None
+    
+    def run_recursive_fuzzing(self, records: DiscoveryMerge) -> DiscoveryMerge:
+        """Fuzz the most promising discovered directories until the request budget runs out"""
+        results = self._new_merge()
+        if not self.check_tool_installed('ffuf'):
+            return results
+        
+        # Without a job cost the request budget would turn into that many jobs
+        wordlist_size = self._wordlist_size()
+        if not wordlist_size:
+            logger.warning(f"Skipping recursive fuzzing: wordlist {self.config.wordlist} unreadable or empty")
+            return results
+        
+        scheduler = RecursionScheduler(
+            self.normalize_url(self.config.target_url),
+            request_budget=self.config.recursion_request_budget,
+            cost_per_job=wordlist_size,
+            max_depth=self.config.recursion_max_depth
+        )
+        scheduler.add_records(records)
+        
+        while True:
+            job = scheduler.next_job()
+            if job is None:
+                break
+            base_url, depth = job
+            found = self.run_ffuf(base_url=base_url)
+            if self.calibration:
+                found = self.calibration.filter_records(found)
+            # Re-found URLs aren't new work; only fresh directories are queued
+            fresh = [record for record in found if record.url not in records and record.url not in results]
+            results.update(found)
+            scheduler.add_records(fresh)
+        
+        self.recursion = scheduler.stats()
+        logger.info(f"Recursive fuzzing found {len(results)} URLs: {self.recursion}")
+        return results
+    
     # ==================== PASSIVE DISCOVERY ====================
     
-    def run_waymore(self) -> Set[Dict]:
-        if not self.check_tool_installed('waymore'):
-            logger.warning("waymore not installed, skipping...")
-            return set()
+    def _passive_lines(self, tool: str, domain: str, fetch) -> Iterator[str]:
+        """
+        Output lines of a passive tool, from the on-disk cache unless a refresh is forced
         
+        fetch() returns a ToolStream/FileStream; its lines are cached while they stream
+        through, and only a complete (exit code 0), non-empty run replaces the cache entry.
+        """
+        if not self.config.refresh_passive_cache:
+            cached = iter_cached_lines(tool, domain, ttl=self.config.passive_cache_ttl)
+            if cached is not None:
+                yield from cached
+                return
+        
+        if not self.check_tool_installed(tool):
+            logger.warning(f"{tool} not installed, skipping...")
+            return
+        
+        stream = fetch()
+        with CacheWriter(tool, domain) as writer:
+            for line in stream:
+                writer.write(line)
+                yield line
+            # Empty output is usually a rate limit or outage, not a real answer; a
+            # non-zero exit (e.g. cut off by a source's rate limit) may be partial
+            if writer.count and not stream.timed_out and stream.returncode == 0:
+                writer.commit()
+    
+    def run_waymore(self) -> DiscoveryMerge:
         logger.info(f"Running waymore for {self.config.target_url}")
-        results = set()
+        results = self._new_merge()
         
         try:
             parsed = urlparse(self.normalize_url(self.config.target_url))
             domain = parsed.netloc
-            output_dir = f"/tmp/waymore_{self.scan_id}"
-            os.makedirs(output_dir, exist_ok=True)
             
-            cmd = ['waymore', '-i', domain, '-mode', 'U', '-oU', f"{output_dir}/urls.txt", '-xcc']
-            subprocess.run(cmd, capture_output=True, timeout=self.config.timeout)
+            def fetch() -> FileStream:
+                output_dir = f"/tmp/waymore_{self.scan_id}"
+                os.makedirs(output_dir, exist_ok=True)
+                cmd = ['waymore', '-i', domain, '-mode', 'U', '-oU', f"{output_dir}/urls.txt", '-xcc']
+                return FileStream(cmd, f"{output_dir}/urls.txt", self.config.timeout, cleanup_dir=output_dir)
             
-            urls_file = f"{output_dir}/urls.txt"
-            if os.path.exists(urls_file):
-                with open(urls_file, 'r') as f:
-                    for line in f:
-                        url = line.strip()
-                        if url and parsed.netloc in url:
-                            results.add(json.dumps({'url': url, 'tool': 'waymore', 'discovery_type': 'passive'}))
+            for url in self._passive_lines('waymore', domain, fetch):
+                if url and parsed.netloc in url:
+                    results.add(DiscoveryRecord(url=url, tool='waymore', discovery_type='passive'))
             
-            import shutil
-            shutil.rmtree(output_dir, ignore_errors=True)
             logger.info(f"waymore found {len(results)} URLs")
             
         except subprocess.TimeoutExpired:
@@ -249,26 +536,21 @@ class ContentDiscoveryScanner:
         
         return results
     
-    def run_gau(self) -> Set[Dict]:
-        if not self.check_tool_installed('gau'):
-            logger.warning("gau not installed, skipping...")
-            return set()
-        
+    def run_gau(self) -> DiscoveryMerge:
         logger.info(f"Running gau for {self.config.target_url}")
-        results = set()
+        results = self._new_merge()
         
         try:
             parsed = urlparse(self.normalize_url(self.config.target_url))
             domain = parsed.netloc
             
-            cmd = ['gau', '--threads', str(self.config.threads), '--blacklist', 'ttf,woff,svg,png,jpg,jpeg,gif,css', domain]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=self.config.timeout)
+            def fetch() -> ToolStream:
+                cmd = ['gau', '--threads', str(self.config.threads), '--blacklist', 'ttf,woff,svg,png,jpg,jpeg,gif,css', domain]
+                return ToolStream(cmd, self.config.timeout)
             
-            if result.returncode == 0:
-                for line in result.stdout.strip().split('\n'):
-                    url = line.strip()
-                    if url and parsed.netloc in url:
-                        results.add(json.dumps({'url': url, 'tool': 'gau', 'discovery_type': 'passive'}))
+            for url in self._passive_lines('gau', domain, fetch):
+                if url and parsed.netloc in url:
+                    results.add(DiscoveryRecord(url=url, tool='gau', discovery_type='passive'))
             
             logger.info(f"gau found {len(results)} URLs")
             
@@ -281,19 +563,20 @@ class ContentDiscoveryScanner:
     
     # ==================== CRAWLING ====================
     
-    def run_katana(self) -> Set[Dict]:
+    def run_katana(self) -> DiscoveryMerge:
         if not self.check_tool_installed('katana'):
             logger.warning("katana not installed, skipping...")
-            return set()
+            return DiscoveryMerge()
         
         logger.info(f"Running katana for {self.config.target_url}")
-        results = set()
+        results = self._new_merge()
         
         try:
             target = self.normalize_url(self.config.target_url)
             output_file = f"/tmp/katana_{self.scan_id}.json"
             
             cmd = ['katana', '-u', target, '-d', str(self.config.crawl_depth), '-c', str(self.config.threads),
+                   '-rl', str(self._active_rate_limit()),
                    '-jc', '-jsonl', '-o', output_file, '-silent', '-timeout', '10']
             subprocess.run(cmd, capture_output=True, timeout=self.config.timeout)
             
@@ -304,10 +587,10 @@ class ContentDiscoveryScanner:
                             data = json.loads(line.strip())
                             url = data.get('url', data.get('endpoint', ''))
                             if url:
-                                results.add(json.dumps({
-                                    'url': url, 'status_code': data.get('status_code', 0),
-                                    'tool': 'katana', 'discovery_type': 'crawling'
-                                }))
+                                results.add(DiscoveryRecord(
+                                    url=url, tool='katana', discovery_type='crawling',
+                                    status_code=data.get('status_code', 0)
+                                ))
                         except json.JSONDecodeError:
                             continue
                 os.unlink(output_file)
@@ -321,29 +604,26 @@ class ContentDiscoveryScanner:
         
         return results
     
-    def run_gospider(self) -> Set[Dict]:
+    def run_gospider(self) -> DiscoveryMerge:
         if not self.check_tool_installed('gospider'):
             logger.warning("gospider not installed, skipping...")
-            return set()
+            return DiscoveryMerge()
         
         logger.info(f"Running gospider for {self.config.target_url}")
-        results = set()
+        results = self._new_merge()
         
         try:
             target = self.normalize_url(self.config.target_url)
             cmd = ['gospider', '-s', target, '-d', str(self.config.crawl_depth), '-c', str(self.config.threads),
                    '-t', '10', '--json', '--no-redirect']
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=self.config.timeout)
-            
-            if result.returncode == 0:
-                for line in result.stdout.strip().split('\n'):
-                    try:
-                        data = json.loads(line)
-                        url = data.get('output', '')
-                        if url and url.startswith('http'):
-                            results.add(json.dumps({'url': url, 'tool': 'gospider', 'discovery_type': 'crawling'}))
-                    except json.JSONDecodeError:
-                        continue
+            for line in ToolStream(cmd, self.config.timeout):
+                try:
+                    data = json.loads(line)
+                    url = data.get('output', '')
+                    if url and url.startswith('http'):
+                        results.add(DiscoveryRecord(url=url, tool='gospider', discovery_type='crawling'))
+                except json.JSONDecodeError:
+                    continue
             
             logger.info(f"gospider found {len(results)} URLs")
             
@@ -354,24 +634,20 @@ class ContentDiscoveryScanner:
         
         return results
     
-    def run_hakrawler(self) -> Set[Dict]:
+    def run_hakrawler(self) -> DiscoveryMerge:
         if not self.check_tool_installed('hakrawler'):
             logger.warning("hakrawler not installed, skipping...")
-            return set()
+            return DiscoveryMerge()
         
         logger.info(f"Running hakrawler for {self.config.target_url}")
-        results = set()
+        results = self._new_merge()
         
         try:
             target = self.normalize_url(self.config.target_url)
             cmd = ['hakrawler', '-url', target, '-depth', str(self.config.crawl_depth), '-plain']
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=self.config.timeout)
-            
-            if result.returncode == 0:
-                for line in result.stdout.strip().split('\n'):
-                    url = line.strip()
-                    if url and url.startswith('http'):
-                        results.add(json.dumps({'url': url, 'tool': 'hakrawler', 'discovery_type': 'crawling'}))
+            for url in ToolStream(cmd, self.config.timeout):
+                if url.startswith('http'):
+                    results.add(DiscoveryRecord(url=url, tool='hakrawler', discovery_type='crawling'))
             
             logger.info(f"hakrawler found {len(results)} URLs")
             
@@ -382,113 +658,45 @@ class ContentDiscoveryScanner:
         
         return results
     
-    def run_zap_spider(self) -> Set[Dict]:
+    def run_zap_spider(self) -> DiscoveryMerge:
         logger.info(f"Running ZAP Spider for {self.config.target_url}")
-        results = set()
+        results = self._new_merge()
         
         try:
             target = self.normalize_url(self.config.target_url)
-            zap_base = self.config.zap_proxy
-            api_key = self.config.zap_api_key
-            
-            start_url = f"{zap_base}/JSON/spider/action/scan/"
-            params = {'apikey': api_key, 'url': target, 'maxChildren': '100', 'recurse': 'true', 'subtreeOnly': 'true'}
-            
-            response = requests.get(start_url, params=params, timeout=30)
-            if response.status_code != 200:
-                logger.error(f"ZAP Spider failed to start: {response.text}")
-                return results
-            
-            scan_id = response.json().get('scan')
-            logger.info(f"ZAP Spider started with scan ID: {scan_id}")
-            
-            status_url = f"{zap_base}/JSON/spider/view/status/"
-            max_wait = self.config.timeout
-            waited = 0
+            client = zap_service.client(self.config.zap_proxy, self.config.zap_api_key)
+            urls = zap_service.run(client.spider(target, timeout=self.config.timeout))
             
-            while waited < max_wait:
-                status_response = requests.get(status_url, params={'apikey': api_key, 'scanId': scan_id}, timeout=10)
-                status = int(status_response.json().get('status', '0'))
-                if status >= 100:
-                    break
-                import time
-                time.sleep(5)
-                waited += 5
-            
-            results_url = f"{zap_base}/JSON/spider/view/results/"
-            results_response = requests.get(results_url, params={'apikey': api_key, 'scanId': scan_id}, timeout=30)
-            
-            if results_response.status_code == 200:
-                urls = results_response.json().get('results', [])
-                for url in urls:
-                    if url:
-                        results.add(json.dumps({'url': url, 'tool': 'zap_spider', 'discovery_type': 'crawling'}))
+            for url in urls:
+                results.add(DiscoveryRecord(url=url, tool='zap_spider', discovery_type='crawling'))
             
             logger.info(f"ZAP Spider found {len(results)} URLs")
             
-        except requests.exceptions.ConnectionError:
-            logger.error("ZAP is not running or not accessible")
         except Exception as e:
             logger.error(f"ZAP Spider error: {e}")
         
         return results
     
-    def run_zap_ajax_spider(self) -> Set[Dict]:
+    def run_zap_ajax_spider(self) -> DiscoveryMerge:
         logger.info(f"Running ZAP Ajax Spider for {self.config.target_url}")
-        results = set()
+        results = self._new_merge()
         
         try:
             target = self.normalize_url(self.config.target_url)
-            zap_base = self.config.zap_proxy
-            api_key = self.config.zap_api_key
-            
-            start_url = f"{zap_base}/JSON/ajaxSpider/action/scan/"
-            params = {'apikey': api_key, 'url': target, 'inScope': 'true', 'subtreeOnly': 'true'}
-            
-            response = requests.get(start_url, params=params, timeout=30)
-            if response.status_code != 200:
-                logger.error(f"ZAP Ajax Spider failed to start: {response.text}")
-                return results
-            
-            status_url = f"{zap_base}/JSON/ajaxSpider/view/status/"
-            max_wait = self.config.timeout
-            waited = 0
+            parsed = urlparse(target)
+            client = zap_service.client(self.config.zap_proxy, self.config.zap_api_key)
             
-            while waited < max_wait:
-                status_response = requests.get(status_url, params={'apikey': api_key}, timeout=10)
-                status = status_response.json().get('status', '')
-                if status == 'stopped':
-                    break
-                import time
-                time.sleep(5)
-                waited += 5
+            for url in zap_service.run(client.ajax_spider(target, timeout=self.config.timeout)):
+                if url.startswith('/'):
+                    url = f"{parsed.scheme}://{parsed.netloc}{url}"
+                if url.startswith('http'):
+                    results.add(DiscoveryRecord(url=url, tool='zap_ajax_spider', discovery_type='crawling'))
             
-            results_url = f"{zap_base}/JSON/ajaxSpider/view/results/"
-            results_response = requests.get(results_url, params={'apikey': api_key, 'start': '0', 'count': '10000'}, timeout=30)
-            
-            if results_response.status_code == 200:
-                items = results_response.json().get('results', [])
-                for item in items:
-                    url = item.get('requestHeader', '').split(' ')[1] if 'requestHeader' in item else ''
-                    if url and url.startswith('/'):
-                        parsed = urlparse(target)
-                        url = f"{parsed.scheme}://{parsed.netloc}{url}"
-                    if url and url.startswith('http'):
-                        results.add(json.dumps({'url': url, 'tool': 'zap_ajax_spider', 'discovery_type': 'crawling'}))
-            
-            sites_url = f"{zap_base}/JSON/core/view/urls/"
-            sites_response = requests.get(sites_url, params={'apikey': api_key, 'baseurl': target}, timeout=30)
-            
-            if sites_response.status_code == 200:
-                urls = sites_response.json().get('urls', [])
-                for url in urls:
-                    if url:
-                        results.add(json.dumps({'url': url, 'tool': 'zap_ajax_spider', 'discovery_type': 'crawling'}))
+            for url in zap_service.run(client.site_urls(target)):
+                results.add(DiscoveryRecord(url=url, tool='zap_ajax_spider', discovery_type='crawling'))
             
             logger.info(f"ZAP Ajax Spider found {len(results)} URLs")
             
-        except requests.exceptions.ConnectionError:
-            logger.error("ZAP is not running or not accessible")
         except Exception as e:
             logger.error(f"ZAP Ajax Spider error: {e}")
         
@@ -496,13 +704,13 @@ class ContentDiscoveryScanner:
     
     # ==================== JS ANALYSIS ====================
     
-    def run_linkfinder(self) -> Set[Dict]:
+    def run_linkfinder(self) -> DiscoveryMerge:
         if not self.check_tool_installed('python3'):
             logger.warning("Python3 not installed, skipping LinkFinder...")
-            return set()
+            return DiscoveryMerge()
         
         logger.info(f"Running LinkFinder for {self.config.target_url}")
-        results = set()
+        results = self._new_merge()
         js_endpoints = []
         
         try:
@@ -516,7 +724,7 @@ class ContentDiscoveryScanner:
                     endpoint = match.group(1)
                     if endpoint and len(endpoint) > 1:
                         full_url = urljoin(target, endpoint)
-                        results.add(json.dumps({'url': full_url, 'tool': 'linkfinder', 'discovery_type': 'js_analysis'}))
+                        results.add(DiscoveryRecord(url=full_url, tool='linkfinder', discovery_type='js_analysis'))
                         js_endpoints.append({'endpoint': endpoint, 'source_url': target, 'tool': 'linkfinder'})
             
             logger.info(f"LinkFinder found {len(results)} endpoints")
@@ -529,13 +737,13 @@ class ContentDiscoveryScanner:
         
         return results
     
-    def run_jsluice(self) -> Set[Dict]:
+    def run_jsluice(self) -> DiscoveryMerge:
         if not self.check_tool_installed('jsluice'):
             logger.warning("jsluice not installed, skipping...")
-            return set()
+            return DiscoveryMerge()
         
         logger.info(f"Running jsluice for {self.config.target_url}")
-        results = set()
+        results = self._new_merge()
         
         try:
             target = self.normalize_url(self.config.target_url)
@@ -558,7 +766,7 @@ class ContentDiscoveryScanner:
                                 if url.startswith('/'):
                                     parsed = urlparse(target)
                                     url = f"{parsed.scheme}://{parsed.netloc}{url}"
-                                results.add(json.dumps({'url': url, 'tool': 'jsluice', 'discovery_type': 'js_analysis'}))
+                                results.add(DiscoveryRecord(url=url, tool='jsluice', discovery_type='js_analysis'))
                         except json.JSONDecodeError:
                             continue
                 
@@ -571,47 +779,78 @@ class ContentDiscoveryScanner:
         
         return results
     
+    def run_js_analysis(self, records: DiscoveryMerge) -> DiscoveryMerge:
+        """
+        Fetch every .js file the other tools found and mine it for endpoints
+        
+        Run as an active tool: it takes a target slot and one tool's share of rate_limit.
+        """
+        results = self._new_merge()
+        js_urls = collect_js_urls(records.urls(), limit=self.config.js_fetch_limit)
+        if not js_urls:
+            return results
+        
+        logger.info(f"Analyzing {len(js_urls)} JS files for {self.config.target_url}")
+        
+        try:
+            analysis = analyze_js_urls(js_urls, concurrency=self.config.js_fetch_concurrency,
+                                       rate_limit=self._active_rate_limit())
+            self.js_analysis = analysis.to_dict()
+            
+            target_host = urlparse(self.normalize_url(self.config.target_url)).netloc.lower()
+            js_endpoints = []
+            for source_url, endpoint, resolved in analysis.endpoints:
+                endpoint_type, confidence = classify_endpoint(endpoint)
+                js_endpoints.append({
+                    'endpoint': endpoint,
+                    'source_url': source_url,
+                    'endpoint_type': endpoint_type,
+                    'confidence': confidence
+                })
+                parsed = urlparse(resolved)
+                if parsed.scheme in ('http', 'https') and parsed.netloc.lower() == target_host:
+                    results.add(DiscoveryRecord(url=resolved, tool='js_fetch', discovery_type='js_analysis'))
+            
+            self.save_js_endpoints(js_endpoints)
+            logger.info(f"JS analysis found {len(analysis.endpoints)} endpoints, {len(results)} on target")
+            
+        except Exception as e:
+            logger.error(f"JS analysis error: {e}")
+        
+        return results
+    
     # ==================== PARAMETER DISCOVERY ====================
     
-    def run_paramspider(self) -> Set[Dict]:
-        if not self.check_tool_installed('paramspider'):
-            logger.warning("paramspider not installed, skipping...")
-            return set()
-        
+    def run_paramspider(self) -> DiscoveryMerge:
         logger.info(f"Running ParamSpider for {self.config.target_url}")
-        results = set()
+        results = self._new_merge()
         parameters = []
         
         try:
             parsed = urlparse(self.normalize_url(self.config.target_url))
             domain = parsed.netloc
-            output_dir = f"/tmp/paramspider_{self.scan_id}"
-            os.makedirs(output_dir, exist_ok=True)
-            
-            cmd = ['paramspider', '-d', domain, '-o', f"{output_dir}/params.txt"]
-            subprocess.run(cmd, capture_output=True, timeout=self.config.timeout)
             
-            output_file = f"{output_dir}/params.txt"
-            if os.path.exists(output_file):
-                with open(output_file, 'r') as f:
-                    for line in f:
-                        url = line.strip()
-                        if url:
-                            results.add(json.dumps({'url': url, 'tool': 'paramspider', 'discovery_type': 'api'}))
-                            parsed_url = urlparse(url)
-                            if parsed_url.query:
-                                for param in parsed_url.query.split('&'):
-                                    param_name = param.split('=')[0]
-                                    if param_name:
-                                        parameters.append({
-                                            'target_url': url.split('?')[0],
-                                            'parameter_name': param_name,
-                                            'parameter_type': 'query',
-                                            'tool': 'paramspider'
-                                        })
+            def fetch() -> FileStream:
+                output_dir = f"/tmp/paramspider_{self.scan_id}"
+                os.makedirs(output_dir, exist_ok=True)
+                cmd = ['paramspider', '-d', domain, '-o', f"{output_dir}/params.txt"]
+                return FileStream(cmd, f"{output_dir}/params.txt", self.config.timeout, cleanup_dir=output_dir)
+            
+            for url in self._passive_lines('paramspider', domain, fetch):
+                if url:
+                    results.add(DiscoveryRecord(url=url, tool='paramspider', discovery_type='api'))
+                    parsed_url = urlparse(url)
+                    if parsed_url.query:
+                        for param in parsed_url.query.split('&'):
+                            param_name = param.split('=')[0]
+                            if param_name:
+                                parameters.append({
+                                    'target_url': url.split('?')[0],
+                                    'parameter_name': param_name,
+                                    'parameter_type': 'query',
+                                    'tool': 'paramspider'
+                                })
             
-            import shutil
-            shutil.rmtree(output_dir, ignore_errors=True)
             logger.info(f"ParamSpider found {len(results)} URLs with parameters")
             
             if parameters:
@@ -626,79 +865,36 @@ class ContentDiscoveryScanner:
     
     # ==================== SPECIALIZED TOOLS ====================
     
-    def run_unfurl(self, urls: Set[str]) -> Set[Dict]:
-        if not self.check_tool_installed('unfurl'):
-            logger.warning("unfurl not installed, skipping...")
-            return urls
-        
-        logger.info(f"Running unfurl for URL processing")
-        results = set()
-        
-        try:
-            input_urls = '\n'.join([json.loads(u).get('url', '') for u in urls if 'url' in json.loads(u)])
-            cmd = ['unfurl', '--unique', 'format', '%s://%d%p']
-            result = subprocess.run(cmd, input=input_urls, capture_output=True, text=True, timeout=60)
-            
-            if result.returncode == 0:
-                for line in result.stdout.strip().split('\n'):
-                    url = line.strip()
-                    if url:
-                        results.add(json.dumps({'url': url, 'tool': 'unfurl', 'discovery_type': 'specialized'}))
-            
-            logger.info(f"unfurl processed {len(results)} URLs")
-            
-        except Exception as e:
-            logger.error(f"unfurl error: {e}")
-            return urls
-        
-        return results if results else urls
-    
-    def run_uro(self, urls: Set[str]) -> Set[Dict]:
-        if not self.check_tool_installed('uro'):
-            logger.warning("uro not installed, skipping...")
-            return urls
-        
-        logger.info(f"Running uro for URL filtering")
-        results = set()
+    def run_uro(self, records: DiscoveryMerge) -> DiscoveryMerge:
+        # In-process uro equivalent: one pass, no subprocess or re-matching of its output
+        logger.info(f"Reducing {len(records)} URLs by pattern")
         
         try:
-            input_urls = '\n'.join([json.loads(u).get('url', '') for u in urls if 'url' in json.loads(u)])
-            cmd = ['uro']
-            result = subprocess.run(cmd, input=input_urls, capture_output=True, text=True, timeout=60)
-            
-            if result.returncode == 0:
-                for line in result.stdout.strip().split('\n'):
-                    url = line.strip()
-                    if url:
-                        for orig_url in urls:
-                            orig_data = json.loads(orig_url)
-                            if orig_data.get('url') == url:
-                                results.add(orig_url)
-                                break
-            
-            logger.info(f"uro filtered to {len(results)} unique URLs")
-            
+            ordered = records
+            if self._shard_saved_urls:
+                # Records sharded fuzzing already saved go first, so no other record of their pattern is saved
+                ordered = itertools.chain(records.retain(self._shard_saved_urls), records)
+            results = reduce_records(ordered)
         except Exception as e:
-            logger.error(f"uro error: {e}")
-            return urls
+            logger.error(f"URL reducer error: {e}")
+            return records
         
-        return results if results else urls
+        return results if results else records
     
-    def run_nuclei(self, urls: Set[str]) -> Set[Dict]:
+    def run_nuclei(self, records: DiscoveryMerge) -> DiscoveryMerge:
         if not self.check_tool_installed('nuclei'):
             logger.warning("nuclei not installed, skipping...")
-            return set()
+            return DiscoveryMerge()
         
         logger.info(f"Running nuclei for vulnerability detection")
-        results = set()
+        results = self._new_merge()
         
         try:
-            unique_urls = set([json.loads(u).get('url', '') for u in urls if 'url' in json.loads(u)])
-            if not unique_urls:
-                return set()
+            if not records:
+                return DiscoveryMerge()
             
             with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as tmp:
-                tmp.write('\n'.join(unique_urls))
+                tmp.write('\n'.join(records.urls()))
                 tmp_file = tmp.name
             
             output_file = f"/tmp/nuclei_{self.scan_id}.json"
@@ -714,12 +910,12 @@ class ContentDiscoveryScanner:
                     for line in f:
                         try:
                             data = json.loads(line.strip())
-                            results.add(json.dumps({
-                                'url': data.get('matched-at', data.get('host', '')),
-                                'tool': 'nuclei', 'discovery_type': 'specialized',
-                                'vulnerability': data.get('info', {}).get('name', ''),
-                                'severity': data.get('info', {}).get('severity', '')
-                            }))
+                            results.add(DiscoveryRecord(
+                                url=data.get('matched-at', data.get('host', '')),
+                                tool='nuclei', discovery_type='specialized',
+                                vulnerability=data.get('info', {}).get('name', ''),
+                                severity=data.get('info', {}).get('severity', '')
+                            ))
                         except json.JSONDecodeError:
                             continue
                 os.unlink(output_file)
@@ -736,141 +932,106 @@ class ContentDiscoveryScanner:
     
     # ==================== DATABASE OPERATIONS ====================
     
-    def save_to_database(self, results: Set[str]) -> int:
-        db = SessionLocal()
+    def save_to_database(self, records: DiscoveryMerge) -> int:
         saved_count = 0
         
         try:
-            for result_json in results:
-                try:
-                    result = json.loads(result_json)
-                    url = result.get('url', '')
-                    if not url:
-                        continue
-                    
-                    query = db.query(ContentDiscovery).filter(
-                        ContentDiscovery.discovered_url == url,
-                        ContentDiscovery.target_url == self.config.target_url
-                    )
-                    if self.config.workspace_id:
-                        query = query.filter(ContentDiscovery.workspace_id == self.config.workspace_id)
-                    
-                    existing = query.first()
-                    
-                    if not existing:
-                        new_discovery = ContentDiscovery(
-                            workspace_id=self.config.workspace_id,
-                            subdomain_id=self.config.subdomain_id,
-                            target_url=self.config.target_url,
-                            discovered_url=url,
-                            path=self.extract_path(url),
-                            status_code=result.get('status_code'),
-                            content_length=result.get('content_length'),
-                            method=result.get('method', 'GET'),
-                            discovery_type=result.get('discovery_type', 'unknown'),
-                            tool_name=result.get('tool', 'unknown'),
-                            response_time=result.get('response_time'),
-                            words_count=result.get('words'),
-                            lines_count=result.get('lines'),
-                            scan_id=self.scan_id,
-                            is_interesting=self._is_interesting(result)
-                        )
-                        db.add(new_discovery)
-                        saved_count += 1
-                        
-                except json.JSONDecodeError:
-                    continue
-                except Exception as e:
-                    logger.error(f"Error saving result: {e}")
-                    continue
-            
-            db.commit()
-            _touch_workspace(db, self.config.workspace_id)
+            saved_count = bulk_ingest_discoveries(
+                records,
+                target_url=self.config.target_url,
+                scan_id=self.scan_id,
+                workspace_id=self.config.workspace_id,
+                subdomain_id=self.config.subdomain_id
+            )
             logger.info(f"Saved {saved_count} new discoveries to database")
-            
         except Exception as e:
             logger.error(f"Database error: {e}")
-            db.rollback()
-        finally:
-            db.close()
+            return saved_count
         
-        return saved_count
-    
-    def save_js_endpoints(self, endpoints: List[Dict]) -> int:
         db = SessionLocal()
-        saved_count = 0
-        
         try:
-            for endpoint in endpoints:
-                try:
-                    new_endpoint = JSEndpoint(
-                        workspace_id=self.config.workspace_id,
-                        source_url=endpoint.get('source_url', ''),
-                        endpoint=endpoint.get('endpoint', ''),
-                        endpoint_type='path',
-                        confidence='medium',
-                        scan_id=self.scan_id
-                    )
-                    db.add(new_endpoint)
-                    saved_count += 1
-                except Exception as e:
-                    logger.error(f"Error saving JS endpoint: {e}")
-                    continue
-            
-            db.commit()
-            logger.info(f"Saved {saved_count} JS endpoints to database")
-            
-        except Exception as e:
-            logger.error(f"Database error: {e}")
-            db.rollback()
+            _touch_workspace(db, self.config.workspace_id)
         finally:
             db.close()
         
         return saved_count
     
+    def save_js_endpoints(self, endpoints: List[Dict]) -> int:
+        rows = []
+        for endpoint in endpoints:
+            value = endpoint.get('endpoint', '')
+            if not value:
+                continue
+            rows.append({
+                'workspace_id': self.config.workspace_id,
+                'source_url': endpoint.get('source_url', '')[:2048],
+                'endpoint': value[:2048],
+                'endpoint_hash': url_hash(value[:2048]),
+                'endpoint_type': endpoint.get('endpoint_type', 'path'),
+                'confidence': endpoint.get('confidence', 'medium'),
+                'scan_id': self.scan_id
+            })
+        
+        return self._insert_ignoring_duplicates(JSEndpoint, rows, ['workspace_id', 'endpoint_hash'], 'JS endpoints')
+    
     def save_api_parameters(self, parameters: List[Dict]) -> int:
+        rows = []
+        for param in parameters:
+            name = param.get('parameter_name', '')
+            if not name:
+                continue
+            target_url = param.get('target_url', '')[:2048]
+            name = name[:255]
+            parameter_type = param.get('parameter_type', 'query')
+            rows.append({
+                'workspace_id': self.config.workspace_id,
+                'target_url': target_url,
+                'parameter_name': name,
+                'parameter_type': parameter_type,
+                'param_hash': url_hash(param_key(target_url, name, parameter_type)),
+                'scan_id': self.scan_id
+            })
+        
+        return self._insert_ignoring_duplicates(APIParameter, rows, ['workspace_id', 'param_hash'], 'API parameters')
+    
+    def _insert_ignoring_duplicates(self, model, rows: List[Dict], key_columns: List[str], label: str,
+                                    batch_size: int = 1000) -> int:
+        """Multi-row INSERT ... ON CONFLICT DO NOTHING on the model's hash key"""
+        if not rows:
+            return 0
+        
         db = SessionLocal()
         saved_count = 0
         
         try:
-            for param in parameters:
-                try:
-                    new_param = APIParameter(
-                        workspace_id=self.config.workspace_id,
-                        target_url=param.get('target_url', ''),
-                        parameter_name=param.get('parameter_name', ''),
-                        parameter_type=param.get('parameter_type', 'query'),
-                        scan_id=self.scan_id
-                    )
-                    db.add(new_param)
-                    saved_count += 1
-                except Exception as e:
-                    logger.error(f"Error saving parameter: {e}")
-                    continue
+            for i in range(0, len(rows), batch_size):
+                stmt = pg_insert(model).values(rows[i:i + batch_size]).on_conflict_do_nothing(
+                    index_elements=key_columns
+                )
+                saved_count += db.execute(stmt).rowcount
             
             db.commit()
-            logger.info(f"Saved {saved_count} API parameters to database")
+            logger.info(f"Saved {saved_count} new {label} to database")
             
         except Exception as e:
             logger.error(f"Database error: {e}")
             db.rollback()
+            saved_count = 0
         finally:
             db.close()
         
         return saved_count
     
-    def _is_interesting(self, result: Dict) -> bool:
-        status_code = result.get('status_code', 0)
-        content_length = result.get('content_length', 0)
-        interesting_codes = [200, 201, 301, 302, 307, 401, 403, 500, 503]
-        interesting_keywords = ['admin', 'api', 'backup', 'config', 'debug', 'dev', 'test', 'staging', 'internal', 'private']
-        url = result.get('url', '').lower()
-        
-        if status_code in interesting_codes:
+    def _is_interesting(self, record: DiscoveryRecord) -> bool:
+        status_code = record.status_code or 0
+        content_length = record.content_length or 0
+        url = record.url.lower()
+        
+        if status_code in INTERESTING_STATUS_CODES:
             return True
-        if any(keyword in url for keyword in interesting_keywords):
+        if any(keyword in url for keyword in INTERESTING_KEYWORDS):
             return True
-        if content_length > 1000000:
+        if content_length > INTERESTING_CONTENT_LENGTH:
             return True
         return False
     
@@ -879,71 +1040,74 @@ class ContentDiscoveryScanner:
     def run_scan(self) -> Dict:
         logger.info(f"Starting content discovery for {self.config.target_url} (scan_id: {self.scan_id})")
         
-        all_results = set()
+        all_results = self._new_merge()
         tool_results = {}
         scan_type = self.config.scan_type.lower()
         
+        # Passive sources report no responses, so there is nothing to calibrate against
+        if self.config.calibrate and scan_type != 'passive':
+            self.calibration = self.calibrate()
+        
+        if self.config.adaptive_wordlist and scan_type in ['full', 'fuzzing']:
+            self.use_adaptive_wordlist()
+        
+        tasks = []
         if scan_type in ['full', 'fuzzing']:
             if self.config.use_ffuf:
-                r = self.run_ffuf()
-                all_results.update(r)
-                tool_results['ffuf'] = len(r)
+                tasks.append(ToolTask('ffuf', self.run_ffuf))
             if self.config.use_feroxbuster:
-                r = self.run_feroxbuster()
-                all_results.update(r)
-                tool_results['feroxbuster'] = len(r)
+                tasks.append(ToolTask('feroxbuster', self.run_feroxbuster))
         
         if scan_type in ['full', 'passive']:
             if self.config.use_waymore:
-                r = self.run_waymore()
-                all_results.update(r)
-                tool_results['waymore'] = len(r)
+                tasks.append(ToolTask('waymore', self.run_waymore, active=False))
             if self.config.use_gau:
-                r = self.run_gau()
-                all_results.update(r)
-                tool_results['gau'] = len(r)
+                tasks.append(ToolTask('gau', self.run_gau, active=False))
         
         if scan_type in ['full', 'crawling', 'api']:
             if self.config.use_katana:
-                r = self.run_katana()
-                all_results.update(r)
-                tool_results['katana'] = len(r)
+                tasks.append(ToolTask('katana', self.run_katana))
             if self.config.use_gospider:
-                r = self.run_gospider()
-                all_results.update(r)
-                tool_results['gospider'] = len(r)
+                tasks.append(ToolTask('gospider', self.run_gospider))
             if self.config.use_hakrawler:
-                r = self.run_hakrawler()
-                all_results.update(r)
-                tool_results['hakrawler'] = len(r)
+                tasks.append(ToolTask('hakrawler', self.run_hakrawler))
             if self.config.use_zap_spider:
-                r = self.run_zap_spider()
-                all_results.update(r)
-                tool_results['zap_spider'] = len(r)
+                tasks.append(ToolTask('zap_spider', self.run_zap_spider))
             if self.config.use_zap_ajax:
-                r = self.run_zap_ajax_spider()
-                all_results.update(r)
-                tool_results['zap_ajax_spider'] = len(r)
+                tasks.append(ToolTask('zap_ajax_spider', self.run_zap_ajax_spider))
         
         if scan_type in ['full', 'js_analysis', 'javascript']:
             if self.config.use_linkfinder:
-                r = self.run_linkfinder()
-                all_results.update(r)
-                tool_results['linkfinder'] = len(r)
+                tasks.append(ToolTask('linkfinder', self.run_linkfinder))
             if self.config.use_jsluice:
-                r = self.run_jsluice()
-                all_results.update(r)
-                tool_results['jsluice'] = len(r)
+                tasks.append(ToolTask('jsluice', self.run_jsluice))
         
         if scan_type in ['full', 'api']:
             if self.config.use_paramspider:
-                r = self.run_paramspider()
+                tasks.append(ToolTask('paramspider', self.run_paramspider, active=False))
+        
+        for name, r in self._tool_scheduler().run(tasks):
+            if r is None:
+                tool_results[name] = 0
+                continue
+            all_results.update(r)
+            tool_results[name] = len(r)
+        
+        if all_results and self.calibration:
+            all_results = self.calibration.filter_records(all_results)
+        
+        if all_results and self.config.recursive_fuzzing and scan_type in ['full', 'fuzzing']:
+            r = self.run_recursive_fuzzing(all_results)
+            all_results.update(r)
+            tool_results['recursive_ffuf'] = len(r)
+        
+        if all_results and self.config.use_js_fetch and scan_type in ['full', 'crawling', 'js_analysis', 'javascript']:
+            for name, r in self._tool_scheduler().run([ToolTask('js_fetch', lambda: self.run_js_analysis(all_results))]):
+                r = r or self._new_merge()
                 all_results.update(r)
-                tool_results['paramspider'] = len(r)
+                tool_results[name] = len(r)
         
         if all_results:
-            if self.config.use_unfurl:
-                all_results = self.run_unfurl(all_results)
             if self.config.use_uro:
                 all_results = self.run_uro(all_results)
             if self.config.use_nuclei and scan_type == 'full':
@@ -952,6 +1116,15 @@ class ContentDiscoveryScanner:
                 tool_results['nuclei'] = len(r)
         
         saved_count = self.save_to_database(all_results)
+        # Sharded fuzzing saves each shard as it finishes
+        saved_count += sum(stats['saved'] for stats in self.sharding.values())
+        
+        parameters_mined = 0
+        if self.config.mine_parameters and saved_count:
+            try:
+                parameters_mined = mine_parameters(self.config.workspace_id, self.config.target_url, self.scan_id)
+            except Exception as e:
+                logger.error(f"Parameter mining error: {e}")
         
         db = SessionLocal()
         try:
@@ -964,7 +1137,13 @@ class ContentDiscoveryScanner:
                 'scan_type': self.config.scan_type,
                 'total_unique_urls': len(all_results),
                 'new_urls_saved': saved_count,
+                'parameters_mined': parameters_mined,
                 'tool_results': tool_results,
+                'calibration': self.calibration.to_dict() if self.calibration else None,
+                'js_analysis': self.js_analysis,
+                'recursion': self.recursion,
+                'sharding': self.sharding or None,
+                'adaptive_wordlist': self.adaptive_wordlist,
                 'timestamp': datetime.utcnow().isoformat(),
                 'discovered_urls': [
                     {
@@ -1035,5 +1214,5 @@ def get_api_parameters(target_url: str, db: Session, workspace_id: Optional[str]
     query = db.query(APIParameter).filter(APIParameter.target_url == target_url)
     if workspace_id:
         query = query.filter(APIParameter.workspace_id == workspace_id)
-    parameters = query.all()
+    parameters = query.order_by(APIParameter.occurrence_count.desc()).all()
     return [param.to_dict() for param in parameters]
\ No newline at end of file
@@ -0,0 +1,193 @@
+"""
+Content Discovery Bulk Ingestion
+COPYs discovery records into a temp staging table and inserts only the new
+rows in a single INSERT ... SELECT, computing path and is_interesting in SQL
+
+Replaces the per-URL SELECT + ORM insert loop, which took hours for the
+500k+ URL result sets that gau/waymore return for large domains.
+"""
+
+import csv
+import io
+import logging
+from typing import Iterable, Optional
+
+from src.config.database import engine
+from src.controllers.discovery_records import DiscoveryRecord
+from src.models.ContentDiscovery import url_hash_sql
+
+logger = logging.getLogger(__name__)
+
+# Shared with ContentDiscoveryScanner._is_interesting so SQL and Python agree
+INTERESTING_STATUS_CODES = (200, 201, 301, 302, 307, 401, 403, 500, 503)
+INTERESTING_KEYWORDS = ('admin', 'api', 'backup', 'config', 'debug', 'dev', 'test', 'staging', 'internal', 'private')
+INTERESTING_CONTENT_LENGTH = 1000000
+
+# Rows buffered in memory per COPY round trip
+COPY_CHUNK_SIZE = 50000
+
+STAGING_COLUMNS = (
+    'discovered_url', 'status_code', 'content_length', 'method', 'response_time',
+    'words_count', 'lines_count', 'discovery_type', 'tool_name'
+)
+
+CREATE_STAGING_SQL = """
+    CREATE TEMP TABLE content_discovery_staging (
+        discovered_url TEXT NOT NULL,
+        status_code INTEGER,
+        content_length INTEGER,
+        method VARCHAR(10),
+        response_time DOUBLE PRECISION,
+        words_count INTEGER,
+        lines_count INTEGER,
+        discovery_type VARCHAR(50),
+        tool_name VARCHAR(100)
+    ) ON COMMIT DROP
+"""
+
+COPY_SQL = f"COPY content_discovery_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+# path = everything after the authority, minus the fragment ('/' when empty),
+# matching ContentDiscoveryScanner.extract_path. Dedupe is on (workspace_id, url_hash).
+INSERT_NEW_SQL = f"""
+    WITH staged AS (
+        SELECT DISTINCT ON (url_hash) *
+        FROM (
+            SELECT *,
+                   {url_hash_sql('left(discovered_url, 2048)')} AS url_hash,
+                   regexp_replace(
+                       regexp_replace(discovered_url, '#.*$', ''),
+                       '^[a-zA-Z][a-zA-Z0-9+.-]*://[^/?]*', ''
+                   ) AS raw_path
+            FROM content_discovery_staging
+        ) hashed
+        ORDER BY url_hash, status_code IS NULL, status_code
+    )
+    INSERT INTO content_discovery (
+        workspace_id, subdomain_id, target_url, discovered_url, url_hash, path,
+        status_code, content_length, method, response_time, words_count, lines_count,
+        discovery_type, tool_name, is_interesting, scan_id
+    )
+    SELECT
+        %(workspace_id)s, %(subdomain_id)s, %(target_url)s, left(s.discovered_url, 2048), s.url_hash,
+        left(CASE
+            WHEN s.raw_path = '' THEN '/'
+            WHEN s.raw_path LIKE '?%%' THEN '/' || s.raw_path
+            ELSE s.raw_path
+        END, 1024),
+        s.status_code, s.content_length, COALESCE(s.method, 'GET'), s.response_time,
+        s.words_count, s.lines_count,
+        COALESCE(s.discovery_type, 'unknown'), COALESCE(s.tool_name, 'unknown'),
+        (
+            s.status_code = ANY(%(interesting_codes)s)
+            OR lower(s.discovered_url) ~ %(interesting_pattern)s
+            OR COALESCE(s.content_length, 0) > %(interesting_length)s
+        ),
+        %(scan_id)s
+    FROM staged s
+    ON CONFLICT (workspace_id, url_hash) DO NOTHING
+"""
+
+
+def _as_int(value) -> Optional[int]:
+    try:
+        return int(value) if value is not None and value != '' else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_float(value) -> Optional[float]:
+    try:
+        return float(value) if value is not None and value != '' else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _staging_row(record: DiscoveryRecord) -> Optional[tuple]:
+    if not record.url:
+        return None
+
+    return (
+        record.url,
+        _as_int(record.status_code),
+        _as_int(record.content_length),
+        (record.method or 'GET')[:10],
+        _as_float(record.response_time),
+        _as_int(record.words),
+        _as_int(record.lines),
+        (record.discovery_type or 'unknown')[:50],
+        (record.tool or 'unknown')[:100],
+    )
+
+
+def bulk_ingest_discoveries(
+    records: Iterable[DiscoveryRecord],
+    target_url: str,
+    scan_id: str,
+    workspace_id: Optional[str] = None,
+    subdomain_id: Optional[int] = None
+) -> int:
+    """
+    Insert discovery results that are not in content_discovery yet
+
+    Args:
+        records: Iterable of DiscoveryRecord (e.g. a DiscoveryMerge)
+        target_url: Target the discoveries belong to
+        scan_id: Scan ID stamped on new rows
+        workspace_id: Optional workspace isolation
+        subdomain_id: Optional subdomain link
+
+    Returns:
+        Number of new rows inserted
+    """
+    conn = engine.raw_connection()
+    staged = 0
+
+    try:
+        cursor = conn.cursor()
+        cursor.execute(CREATE_STAGING_SQL)
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        pending = 0
+
+        for record in records:
+            row = _staging_row(record)
+            if row is None:
+                continue
+            writer.writerow(row)
+            pending += 1
+
+            if pending >= COPY_CHUNK_SIZE:
+                buffer.seek(0)
+                cursor.copy_expert(COPY_SQL, buffer)
+                staged += pending
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                pending = 0
+
+        if pending:
+            buffer.seek(0)
+            cursor.copy_expert(COPY_SQL, buffer)
+            staged += pending
+
+        cursor.execute(INSERT_NEW_SQL, {
+            'workspace_id': workspace_id,
+            'subdomain_id': subdomain_id,
+            'target_url': target_url,
+            'scan_id': scan_id,
+            'interesting_codes': list(INTERESTING_STATUS_CODES),
+            'interesting_pattern': '|'.join(INTERESTING_KEYWORDS),
+            'interesting_length': INTERESTING_CONTENT_LENGTH,
+        })
+        inserted = cursor.rowcount
+
+        conn.commit()
+        logger.info(f"Bulk ingested {staged} staged discoveries, {inserted} new")
+        return inserted
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
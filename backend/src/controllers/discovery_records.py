@@ -0,0 +1,136 @@
+"""
+Discovery Records
+Typed, slotted records passed between content discovery stages
+
+Tools used to return sets of json.dumps() strings that every later stage
+re-parsed. Records are now plain attribute objects held in a DiscoveryMerge,
+keyed by URL, which also tracks which tools found each URL.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from src.controllers.url_canonical import canonicalize_batch, canonicalize_url
+
+
+@dataclass(slots=True)
+class DiscoveryRecord:
+    """One discovered URL and whatever response metadata the tool reported"""
+    url: str
+    tool: str
+    discovery_type: str
+    status_code: Optional[int] = None
+    content_length: Optional[int] = None
+    words: Optional[int] = None
+    lines: Optional[int] = None
+    response_time: Optional[float] = None
+    method: str = 'GET'
+    vulnerability: Optional[str] = None
+    severity: Optional[str] = None
+    tools: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        if not self.tools:
+            self.tools = [self.tool]
+
+    def merge(self, other: 'DiscoveryRecord'):
+        """Fold another sighting of the same URL into this record"""
+        for tool in other.tools:
+            if tool not in self.tools:
+                self.tools.append(tool)
+
+        # Keep the first value reported for each field, fill in the gaps
+        if self.status_code is None:
+            self.status_code = other.status_code
+        if self.content_length is None:
+            self.content_length = other.content_length
+        if self.words is None:
+            self.words = other.words
+        if self.lines is None:
+            self.lines = other.lines
+        if self.response_time is None:
+            self.response_time = other.response_time
+        if self.vulnerability is None:
+            self.vulnerability = other.vulnerability
+            self.severity = other.severity
+
+
+class DiscoveryMerge:
+    """URL -> DiscoveryRecord map; adding a known URL merges provenance
+
+    With canonical=True every URL is canonicalized on add, so equivalent
+    spellings reported by different tools collapse into one record immediately.
+    """
+
+    __slots__ = ('_records', '_canonical')
+
+    def __init__(self, records: Iterable[DiscoveryRecord] = (), canonical: bool = False):
+        self._records: Dict[str, DiscoveryRecord] = {}
+        self._canonical = canonical
+        for record in records:
+            self.add(record)
+
+    def add(self, record: DiscoveryRecord) -> bool:
+        """Add a record, returns True if the URL was new"""
+        if self._canonical and record.url:
+            record.url = canonicalize_url(record.url)
+        return self._add(record)
+
+    def _add(self, record: DiscoveryRecord) -> bool:
+        if not record.url:
+            return False
+
+        existing = self._records.get(record.url)
+        if existing is None:
+            self._records[record.url] = record
+            return True
+
+        existing.merge(record)
+        return False
+
+    def update(self, other: 'DiscoveryMerge'):
+        if other._canonical or not self._canonical:
+            # Already in the form we key on
+            for record in other:
+                self._add(record)
+            return
+
+        records = list(other)
+        for record, url in zip(records, canonicalize_batch(record.url for record in records)):
+            record.url = url
+            self._add(record)
+
+    def retain(self, urls: Iterable[str]) -> 'DiscoveryMerge':
+        """New merge with only the records whose URL is in urls"""
+        kept = DiscoveryMerge(canonical=self._canonical)
+        for url in urls:
+            record = self._records.get(url)
+            if record is not None:
+                kept._records[url] = record
+        return kept
+
+    def get(self, url: str) -> Optional[DiscoveryRecord]:
+        return self._records.get(url)
+
+    def urls(self) -> List[str]:
+        return list(self._records)
+
+    def tool_counts(self) -> Dict[str, int]:
+        """Number of URLs each tool contributed (a URL counts for every tool that found it)"""
+        counts: Dict[str, int] = {}
+        for record in self._records.values():
+            for tool in record.tools:
+                counts[tool] = counts.get(tool, 0) + 1
+        return counts
+
+    def __iter__(self) -> Iterator[DiscoveryRecord]:
+        return iter(self._records.values())
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._records
+
+    def __bool__(self) -> bool:
+        return bool(self._records)
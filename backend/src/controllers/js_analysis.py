@@ -0,0 +1,223 @@
+"""
+JavaScript Analysis
+Fetches the .js files found by crawlers and extracts endpoints from them
+
+Files are fetched concurrently through one shared httpx client, paced by a
+token bucket when the scan has a rate limit, and deduplicated by SHA-256 of
+their content. Endpoint extraction is cached per
+content hash, so a vendor bundle served by hundreds of hosts is parsed once
+per process.
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+
+from src.controllers.validation_scheduler import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Files larger than this are truncated (endpoints past 5MB of a bundle are rare)
+MAX_JS_BYTES = 5 * 1024 * 1024
+
+# Content hashes whose extracted endpoints are kept in memory
+ENDPOINT_CACHE_SIZE = 10000
+
+# LinkFinder's endpoint regex: absolute URLs, relative paths, paths with extensions, bare filenames
+ENDPOINT_PATTERN = re.compile(r"""
+    (?:"|'|`)
+    (
+        ((?:[a-zA-Z]{1,10}://|//)[^"'`/]{1,}\.[a-zA-Z]{2,}[^"'`]{0,})
+        |
+        ((?:/|\.\./|\./)[^"'`><,;|*()(%$^/\\\[\]][^"'`><,;|()]{1,})
+        |
+        ([a-zA-Z0-9_\-/]{1,}/[a-zA-Z0-9_\-/.]{1,}\.(?:[a-zA-Z]{1,4}|action)(?:[\?|#][^"'`]{0,}|))
+        |
+        ([a-zA-Z0-9_\-/]{1,}/[a-zA-Z0-9_\-/]{3,}(?:[\?|#][^"'`]{0,}|))
+        |
+        ([a-zA-Z0-9_\-]{1,}\.(?:php|asp|aspx|jsp|json|action|html|js|txt|xml)(?:[\?|#][^"'`]{0,}|))
+    )
+    (?:"|'|`)
+""", re.VERBOSE)
+
+API_HINT = re.compile(r'(?:^|/)(?:api|graphql|rest|v\d+)(?:/|$)', re.IGNORECASE)
+RESOURCE_EXTENSIONS = ('.js', '.css', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.woff', '.woff2', '.ttf', '.ico', '.map')
+
+_endpoint_cache: 'OrderedDict[str, List[str]]' = OrderedDict()
+_endpoint_cache_lock = threading.Lock()
+
+
+@dataclass
+class JSFile:
+    url: str
+    content_hash: str
+    size: int
+
+
+@dataclass
+class JSAnalysisResult:
+    files: List[JSFile] = field(default_factory=list)
+    unique_hashes: int = 0
+    analyzed: int = 0
+    cache_hits: int = 0
+    failed: int = 0
+    # (source_url, endpoint as written, endpoint resolved against the source)
+    endpoints: List[Tuple[str, str, str]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return {
+            'js_files': len(self.files),
+            'unique_contents': self.unique_hashes,
+            'analyzed': self.analyzed,
+            'cache_hits': self.cache_hits,
+            'failed': self.failed,
+            'endpoints': len(self.endpoints),
+        }
+
+
+def is_js_url(url: str) -> bool:
+    return urlsplit(url).path.lower().endswith(('.js', '.mjs'))
+
+
+def collect_js_urls(urls: Iterable[str], limit: Optional[int] = None) -> List[str]:
+    """Unique .js/.mjs URLs, in discovery order"""
+    found = list(dict.fromkeys(url for url in urls if is_js_url(url)))
+    return found[:limit] if limit else found
+
+
+def extract_endpoints(content: str) -> List[str]:
+    """Unique endpoint strings found in JavaScript source"""
+    endpoints = []
+    seen = set()
+    for match in ENDPOINT_PATTERN.finditer(content):
+        endpoint = match.group(1).strip()
+        if len(endpoint) > 1 and endpoint not in seen:
+            seen.add(endpoint)
+            endpoints.append(endpoint)
+    return endpoints
+
+
+def endpoints_for_content(content_hash: str, content: bytes) -> Tuple[List[str], bool]:
+    """Endpoints for a file, from the per-hash cache when possible. Returns (endpoints, cache_hit)."""
+    with _endpoint_cache_lock:
+        cached = _endpoint_cache.get(content_hash)
+        if cached is not None:
+            _endpoint_cache.move_to_end(content_hash)
+            return cached, True
+
+    endpoints = extract_endpoints(content.decode('utf-8', errors='ignore'))
+
+    with _endpoint_cache_lock:
+        _endpoint_cache[content_hash] = endpoints
+        while len(_endpoint_cache) > ENDPOINT_CACHE_SIZE:
+            _endpoint_cache.popitem(last=False)
+
+    return endpoints, False
+
+
+def classify_endpoint(endpoint: str) -> Tuple[str, str]:
+    """(endpoint_type, confidence) for a JSEndpoint row"""
+    path = urlsplit(endpoint).path.lower() if '://' in endpoint or endpoint.startswith('//') else endpoint.lower()
+    if API_HINT.search(path):
+        return 'api', 'high'
+    if path.split('?')[0].endswith(RESOURCE_EXTENSIONS):
+        return 'resource', 'low'
+    return 'path', 'medium'
+
+
+async def _fetch(client: httpx.AsyncClient, semaphore: asyncio.Semaphore, bucket: Optional[TokenBucket],
+                 url: str) -> Optional[bytes]:
+    async with semaphore:
+        if bucket is not None:
+            delay = bucket.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        try:
+            async with client.stream('GET', url) as response:
+                if response.status_code != 200:
+                    return None
+                chunks = []
+                size = 0
+                async for chunk in response.aiter_bytes():
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= MAX_JS_BYTES:
+                        break
+                return b''.join(chunks)[:MAX_JS_BYTES]
+        except httpx.HTTPError as e:
+            logger.debug(f"JS fetch failed for {url}: {e}")
+            return None
+
+
+async def _analyze(urls: List[str], concurrency: int, timeout: int, rate_limit: Optional[int]) -> JSAnalysisResult:
+    result = JSAnalysisResult()
+    semaphore = asyncio.Semaphore(concurrency)
+    bucket = TokenBucket(rate_limit, burst=min(concurrency, rate_limit)) if rate_limit else None
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    seen_hashes = set()
+
+    async def fetch_and_extract(client: httpx.AsyncClient, url: str):
+        body = await _fetch(client, semaphore, bucket, url)
+        if body is None:
+            result.failed += 1
+            return
+
+        # Hash and extract as each file arrives so bodies are never all held at once
+        content_hash = hashlib.sha256(body).hexdigest()
+        result.files.append(JSFile(url=url, content_hash=content_hash, size=len(body)))
+
+        endpoints, cache_hit = endpoints_for_content(content_hash, body)
+        if content_hash not in seen_hashes:
+            seen_hashes.add(content_hash)
+            if cache_hit:
+                result.cache_hits += 1
+            else:
+                result.analyzed += 1
+
+        for endpoint in endpoints:
+            result.endpoints.append((url, endpoint, urljoin(url, endpoint)))
+
+    async with httpx.AsyncClient(timeout=timeout, verify=False, follow_redirects=True, limits=limits) as client:
+        await asyncio.gather(*(fetch_and_extract(client, url) for url in urls))
+
+    result.unique_hashes = len(seen_hashes)
+    return result
+
+
+def analyze_js_urls(urls: List[str], concurrency: int = 20, timeout: int = 15,
+                    rate_limit: Optional[int] = None) -> JSAnalysisResult:
+    """
+    Fetch and analyze JS files (blocking; safe to call from inside a running event loop)
+
+    Args:
+        urls: JS file URLs
+        concurrency: Simultaneous fetches
+        timeout: Per-request timeout in seconds
+        rate_limit: Requests per second across all fetches (None for no limit)
+
+    Returns:
+        JSAnalysisResult with per-file hashes and (source, endpoint, resolved) tuples
+    """
+    if not urls:
+        return JSAnalysisResult()
+
+    coro = _analyze(urls, max(1, concurrency), timeout, rate_limit)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        result = asyncio.run(coro)
+    else:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            result = executor.submit(asyncio.run, coro).result()
+
+    logger.info(f"JS analysis: {result.to_dict()}")
+    return result
@@ -0,0 +1,422 @@
+"""
+Nuclei Template Index
+Picks the nuclei templates worth running against each target
+
+The local template tree is indexed once (id, tags, severity, protocol and the
+vendor/product a template targets) by reading only each file's header, and
+the index is cached on disk under a signature of the tree, so it is rebuilt
+after `nuclei -update-templates`. Templates bound to a product run only
+against targets where that technology was seen - in the server header
+stored on Subdomain.technologies, in PortScan service/product, or in
+content discovery paths. Product-agnostic templates (exposures,
+misconfigurations, generic checks) always run.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set
+from urllib.parse import urlsplit
+
+from sqlalchemy import func
+
+from src.config.database import SessionLocal
+from src.models.ContentDiscovery import ContentDiscovery
+from src.models.PortScan import PortScan
+from src.models.Subdomain import Subdomain
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = os.getenv('NUCLEI_TEMPLATES_DIR', os.path.expanduser('~/nuclei-templates'))
+INDEX_CACHE_DIR = os.getenv('NUCLEI_INDEX_DIR', os.path.join(tempfile.gettempdir(), 'nuclei_index'))
+
+# How often the template tree is re-checked for updates within one process
+INDEX_RECHECK_SECONDS = 300
+
+# Bumped when TemplateInfo changes, so older cache files aren't reused
+INDEX_FORMAT = 2
+
+# Top-level request blocks; old templates use `requests` for http and `tcp` for network
+PROTOCOL_KEYS = {
+    'http': 'http', 'requests': 'http', 'dns': 'dns', 'network': 'network', 'tcp': 'network',
+    'ssl': 'ssl', 'file': 'file', 'headless': 'headless', 'code': 'code',
+    'javascript': 'javascript', 'workflows': 'workflow', 'websocket': 'websocket', 'whois': 'whois',
+}
+# Protocols whose product-agnostic templates apply to any web target
+WEB_PROTOCOLS = frozenset(('http', 'ssl', 'dns'))
+# Protocols that run only when a matching service was seen on the host
+SERVICE_PROTOCOLS = frozenset(('network', 'javascript'))
+
+# Vendor/product values too generic to bind a template to a technology
+GENERIC_PRODUCTS = frozenset(('', 'n/a', 'http', 'https', 'web', 'generic', 'tech'))
+
+TECH_ALIASES = {
+    'microsoft-iis': 'iis', 'httpd': 'apache', 'apache-httpd': 'apache', 'http_server': 'apache',
+    'openresty': 'nginx', 'tengine': 'nginx', 'wp': 'wordpress', 'spring-boot': 'springboot',
+    'apache-tomcat': 'tomcat', 'coyote': 'tomcat', 'microsoft-httpapi': 'iis', 'asp.net': 'asp',
+    'openssh': 'ssh', 'mysqld': 'mysql', 'postgres': 'postgresql', 'ms-sql-s': 'mssql',
+}
+
+# Content discovery paths that reveal a technology
+PATH_HINTS = [
+    (re.compile(r'/wp-(?:content|includes|admin|json)\b', re.IGNORECASE), 'wordpress'),
+    (re.compile(r'/(?:sites/default|core/misc)/', re.IGNORECASE), 'drupal'),
+    (re.compile(r'/administrator/|/components/com_', re.IGNORECASE), 'joomla'),
+    (re.compile(r'/actuator\b', re.IGNORECASE), 'springboot'),
+    (re.compile(r'/phpmyadmin\b', re.IGNORECASE), 'phpmyadmin'),
+    (re.compile(r'/jenkins\b|/job/[^/]+/', re.IGNORECASE), 'jenkins'),
+    (re.compile(r'/grafana\b|/api/dashboards/', re.IGNORECASE), 'grafana'),
+    (re.compile(r'/\.git/', re.IGNORECASE), 'git'),
+    (re.compile(r'/graphql\b', re.IGNORECASE), 'graphql'),
+    (re.compile(r'/swagger|/api-docs|/openapi', re.IGNORECASE), 'swagger'),
+    (re.compile(r'/manager/html|/host-manager/', re.IGNORECASE), 'tomcat'),
+    (re.compile(r'/typo3\b', re.IGNORECASE), 'typo3'),
+    (re.compile(r'/(?:static|skin)/frontend/|/magento\b', re.IGNORECASE), 'magento'),
+    (re.compile(r'\.php\b', re.IGNORECASE), 'php'),
+    (re.compile(r'\.aspx?\b', re.IGNORECASE), 'asp'),
+    (re.compile(r'\.(?:jsp|do|action)\b', re.IGNORECASE), 'java'),
+]
+# The same hints as one Postgres regex (\y is its word boundary), so only matching paths leave the database
+PATH_HINT_SQL = '|'.join(pattern.pattern.replace(r'\b', r'\y') for pattern, _ in PATH_HINTS)
+
+_HEADER_FIELD = re.compile(r'^\s*(id|severity|tags|vendor|product):\s*(.*?)\s*$')
+_TOP_LEVEL_KEY = re.compile(r'^([a-z]+):')
+_TECH_SPLIT = re.compile(r'[\s/(),;]+')
+
+
+def normalize_tech(name: str) -> str:
+    name = name.strip().strip('"\'').lower().replace(' ', '-')
+    return TECH_ALIASES.get(name, name)
+
+
+def technologies_from_text(value: Optional[str]) -> Set[str]:
+    """Technology names from a server header / technologies column (plain text or JSON list/dict)"""
+    if not value:
+        return set()
+    try:
+        parsed = json.loads(value)
+    except (TypeError, ValueError):
+        parsed = value
+
+    if isinstance(parsed, dict):
+        parsed = list(parsed.keys())
+    if isinstance(parsed, list):
+        parsed = ' '.join(str(item).split(':')[0] for item in parsed)
+
+    techs = set()
+    for token in _TECH_SPLIT.split(str(parsed)):
+        # Skip version numbers like "1.18.0"
+        if token and not token[0].isdigit():
+            techs.add(normalize_tech(token))
+    return techs
+
+
+@dataclass(slots=True)
+class TemplateInfo:
+    path: str
+    id: str
+    severity: str = 'unknown'
+    protocol: str = 'http'
+    tags: List[str] = field(default_factory=list)
+    products: List[str] = field(default_factory=list)
+    hash: str = ''  # content hash, to find templates changed between index versions
+
+
+def parse_template_header(path: str) -> Optional[TemplateInfo]:
+    """Hash a template and read its id/info block without a YAML parser (stops at the first request block)"""
+    info = TemplateInfo(path=path, id='')
+    products = []
+    try:
+        with open(path, 'rb') as f:
+            content = f.read()
+    except OSError:
+        return None
+
+    info.hash = hashlib.sha1(content).hexdigest()[:16]
+    for line in content.decode('utf-8', errors='replace').splitlines():
+        top = _TOP_LEVEL_KEY.match(line)
+        if top and top.group(1) in PROTOCOL_KEYS:
+            info.protocol = PROTOCOL_KEYS[top.group(1)]
+            break
+        match = _HEADER_FIELD.match(line)
+        if not match:
+            continue
+        key, value = match.group(1), match.group(2).strip('"\'')
+        if key == 'id' and not info.id:
+            info.id = value
+        elif key == 'severity':
+            info.severity = value.lower()
+        elif key == 'tags':
+            info.tags = [tag.strip().lower() for tag in value.split(',') if tag.strip()]
+        elif key in ('vendor', 'product'):
+            products.append(normalize_tech(value))
+
+    if not info.id:
+        return None
+    info.products = sorted({p for p in products if p not in GENERIC_PRODUCTS})
+    return info
+
+
+def _tree_signature(templates_dir: str) -> str:
+    """Changes whenever a template file is added, removed or modified"""
+    digest = hashlib.sha1(os.path.abspath(templates_dir).encode())
+    count = 0
+    newest = 0
+    for root, dirs, files in os.walk(templates_dir):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for name in files:
+            if name.endswith(('.yaml', '.yml')):
+                count += 1
+                newest = max(newest, os.stat(os.path.join(root, name)).st_mtime_ns)
+    digest.update(f"{INDEX_FORMAT}:{count}:{newest}".encode())
+    return digest.hexdigest()[:16]
+
+
+class TemplateIndex:
+    def __init__(self, templates: List[TemplateInfo], version: str):
+        self.templates = templates
+        self.version = version
+        # Product names known to the template set; a tag in here binds a template to that product
+        self.vocabulary: Set[str] = {product for t in templates for product in t.products}
+        self._bindings: List[Set[str]] = [
+            set(t.products) | (set(t.tags) & self.vocabulary) for t in templates
+        ]
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    def select(self, technologies: Set[str], severities: Optional[Iterable[str]] = None) -> List[TemplateInfo]:
+        """Templates applicable to a target with the given technologies"""
+        wanted_severities = set(severities) if severities else None
+        selected = []
+        for template, bound_to in zip(self.templates, self._bindings):
+            if wanted_severities and template.severity not in wanted_severities:
+                continue
+            if bound_to:
+                if bound_to & technologies and template.protocol in WEB_PROTOCOLS | SERVICE_PROTOCOLS:
+                    selected.append(template)
+            elif template.protocol in WEB_PROTOCOLS:
+                selected.append(template)
+        return selected
+
+    def changed_since(self, version: str) -> Optional[Set[str]]:
+        """
+        Paths of templates added or modified since an earlier index version
+
+        Returns:
+            Set of template paths, or None if that version's cache is gone
+        """
+        if version == self.version:
+            return set()
+        previous = load_cached_hashes(version)
+        if previous is None:
+            return None
+        return {t.path for t in self.templates if previous.get(t.path) != t.hash}
+
+    def to_cache(self) -> Dict:
+        return {'version': self.version, 'templates': [asdict(t) for t in self.templates]}
+
+    @classmethod
+    def from_cache(cls, data: Dict) -> 'TemplateIndex':
+        return cls([TemplateInfo(**t) for t in data['templates']], data['version'])
+
+
+@lru_cache(maxsize=8)
+def load_cached_hashes(version: str) -> Optional[Dict[str, str]]:
+    """{template path: content hash} of an earlier index version, from its cache file"""
+    try:
+        with open(os.path.join(INDEX_CACHE_DIR, f"{version}.json"), 'r') as f:
+            return {t['path']: t.get('hash', '') for t in json.load(f)['templates']}
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def build_template_index(templates_dir: str = TEMPLATES_DIR) -> TemplateIndex:
+    """Index a template tree, reusing the on-disk cache when the tree hasn't changed"""
+    if not os.path.isdir(templates_dir):
+        logger.warning(f"Nuclei templates directory {templates_dir} not found")
+        return TemplateIndex([], '')
+
+    version = _tree_signature(templates_dir)
+    cache_path = os.path.join(INDEX_CACHE_DIR, f"{version}.json")
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r') as f:
+                return TemplateIndex.from_cache(json.load(f))
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable template index cache {cache_path}: {e}")
+
+    started = time.time()
+    templates = []
+    for root, dirs, files in os.walk(templates_dir):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for name in files:
+            if name.endswith(('.yaml', '.yml')):
+                info = parse_template_header(os.path.join(root, name))
+                if info:
+                    templates.append(info)
+    templates.sort(key=lambda t: t.path)
+    index = TemplateIndex(templates, version)
+
+    os.makedirs(INDEX_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(index.to_cache(), f)
+    os.replace(tmp_path, cache_path)
+
+    logger.info(f"Indexed {len(templates)} nuclei templates in {time.time() - started:.1f}s (version {version})")
+    return index
+
+
+_index_lock = threading.Lock()
+_index: Optional[TemplateIndex] = None
+_index_checked_at = 0.0
+
+
+def get_template_index(templates_dir: str = TEMPLATES_DIR) -> TemplateIndex:
+    """Process-wide index, re-checked against the template tree every INDEX_RECHECK_SECONDS"""
+    global _index, _index_checked_at
+    with _index_lock:
+        if _index is None or time.time() - _index_checked_at > INDEX_RECHECK_SECONDS:
+            _index = build_template_index(templates_dir)
+            _index_checked_at = time.time()
+        return _index
+
+
+# ==================== TARGET PROFILES ====================
+
+@dataclass
+class TargetProfile:
+    target: str
+    technologies: Set[str] = field(default_factory=set)
+    sources: Dict[str, List[str]] = field(default_factory=dict)
+
+    def add(self, source: str, techs: Iterable[str]):
+        techs = {t for t in techs if t}
+        if techs:
+            self.technologies |= techs
+            self.sources.setdefault(source, [])
+            self.sources[source] = sorted(set(self.sources[source]) | techs)
+
+
+def _hostname(target: str) -> str:
+    return (urlsplit(target if '://' in target else f"//{target}").hostname or '').lower()
+
+
+def build_target_profiles(targets: List[str], workspace_id: Optional[str] = None) -> Dict[str, TargetProfile]:
+    """What the workspace already knows about each target's stack (three queries for any number of targets)"""
+    profiles = {target: TargetProfile(target) for target in targets}
+    by_host: Dict[str, List[TargetProfile]] = {}
+    for target, profile in profiles.items():
+        by_host.setdefault(_hostname(target), []).append(profile)
+    hosts = [host for host in by_host if host]
+    if not hosts:
+        return profiles
+
+    db = SessionLocal()
+    try:
+        query = db.query(Subdomain.full_domain, Subdomain.technologies, Subdomain.ip_address).filter(
+            Subdomain.full_domain.in_(hosts)
+        )
+        if workspace_id:
+            query = query.filter(Subdomain.workspace_id == workspace_id)
+        ip_hosts: Dict[str, str] = {}
+        for full_domain, technologies, ip_address in query.all():
+            for profile in by_host.get(full_domain.lower(), []):
+                profile.add('server', technologies_from_text(technologies))
+            if ip_address:
+                ip_hosts[ip_address] = full_domain.lower()
+
+        query = db.query(PortScan.target, PortScan.service, PortScan.product, PortScan.version).filter(
+            PortScan.target.in_(hosts + list(ip_hosts)),
+            PortScan.state == 'open'
+        )
+        if workspace_id:
+            query = query.filter(PortScan.workspace_id == workspace_id)
+        for target, service, product, version in query.all():
+            host = ip_hosts.get(target, target.lower())
+            techs = {normalize_tech(service)} if service else set()
+            techs |= technologies_from_text(product)
+            for profile in by_host.get(host, []):
+                profile.add('ports', techs)
+
+        host_expr = func.lower(func.substring(ContentDiscovery.discovered_url, '^[a-zA-Z]+://([^/:?#]+)'))
+        query = db.query(host_expr, ContentDiscovery.path).filter(
+            host_expr.in_(hosts),
+            ContentDiscovery.path.op('~*')(PATH_HINT_SQL)
+        )
+        if workspace_id:
+            query = query.filter(ContentDiscovery.workspace_id == workspace_id)
+        for host, path in query.limit(50000).all():
+            techs = {tech for pattern, tech in PATH_HINTS if pattern.search(path or '')}
+            for profile in by_host.get(host, []):
+                profile.add('paths', techs)
+    finally:
+        db.close()
+
+    return profiles
+
+
+@dataclass
+class TemplateSelection:
+    templates: List[TemplateInfo]
+    total: int
+    version: str
+    technologies: List[str] = field(default_factory=list)
+    sources: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return hashlib.sha1('\n'.join(t.path for t in self.templates).encode()).hexdigest()
+
+    def write(self, directory: str) -> str:
+        """Write the selected template paths as a list file for `nuclei -t`"""
+        path = os.path.join(directory, f"templates_{self.key[:12]}.txt")
+        with open(path, 'w') as f:
+            f.write('\n'.join(t.path for t in self.templates))
+        return path
+
+    def to_dict(self) -> Dict:
+        selected = len(self.templates)
+        return {
+            'index_version': self.version,
+            'total_templates': self.total,
+            'selected_templates': selected,
+            'reduction_pct': round(100 * (1 - selected / self.total), 1) if self.total else 0.0,
+            'technologies': self.technologies,
+            'technology_sources': self.sources,
+        }
+
+
+def select_templates(targets: List[str], workspace_id: Optional[str] = None,
+                     severities: Optional[Iterable[str]] = None) -> Dict[str, TemplateSelection]:
+    """
+    Minimal template set per target
+
+    Returns:
+        TemplateSelection per target; empty if no template index is available
+    """
+    index = get_template_index()
+    if not len(index):
+        return {}
+
+    profiles = build_target_profiles(targets, workspace_id)
+    selections = {}
+    for target, profile in profiles.items():
+        templates = index.select(profile.technologies, severities)
+        selections[target] = TemplateSelection(
+            templates=templates,
+            total=len(index),
+            version=index.version,
+            technologies=sorted(profile.technologies),
+            sources=profile.sources
+        )
+        logger.info(f"{target}: {len(templates)}/{len(index)} templates for {sorted(profile.technologies) or 'no known technologies'}")
+    return selections
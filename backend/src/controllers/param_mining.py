@@ -0,0 +1,85 @@
+"""
+Parameter Mining
+Builds the query-parameter inventory from URLs already in content_discovery
+
+One INSERT ... SELECT splits every stored query string in Postgres, groups by
+(endpoint, parameter name) and upserts api_parameters with the number of
+discovered URLs that use each parameter. No URLs leave the database and no
+extra tool run is needed.
+"""
+
+import logging
+from typing import Optional
+
+from sqlalchemy import text
+
+from src.config.database import engine
+from src.models.ContentDiscovery import url_hash_sql
+
+logger = logging.getLogger(__name__)
+
+# target_url / parameter_name are truncated like save_api_parameters so
+# param_hash matches url_hash(param_key(...)) computed in Python
+MINE_PARAMETERS_SQL = """
+    WITH pairs AS (
+        SELECT cd.id,
+               left(split_part(split_part(cd.discovered_url, '#', 1), '?', 1), 2048) AS target_url,
+               left(split_part(pair, '=', 1), 255) AS parameter_name
+        FROM content_discovery cd
+        CROSS JOIN LATERAL regexp_split_to_table(
+            split_part(split_part(cd.discovered_url, '#', 1), '?', 2), '&'
+        ) AS pair
+        WHERE cd.workspace_id IS NOT DISTINCT FROM :workspace_id
+          AND strpos(cd.discovered_url, '?') > 0
+          {scope}
+    ),
+    counted AS (
+        SELECT target_url, parameter_name, count(DISTINCT id) AS occurrences
+        FROM pairs
+        WHERE parameter_name <> ''
+        GROUP BY target_url, parameter_name
+    )
+    INSERT INTO api_parameters (
+        workspace_id, target_url, parameter_name, parameter_type, param_hash,
+        occurrence_count, scan_id, created_at, last_seen_at
+    )
+    SELECT :workspace_id, target_url, parameter_name, 'query',
+           {param_hash}, occurrences, :scan_id, now(), now()
+    FROM counted
+    ON CONFLICT (workspace_id, param_hash) DO UPDATE
+    SET occurrence_count = GREATEST(api_parameters.occurrence_count, EXCLUDED.occurrence_count),
+        last_seen_at = EXCLUDED.last_seen_at
+"""
+
+PARAM_HASH_SQL = url_hash_sql("target_url || chr(10) || parameter_name || chr(10) || 'query'")
+
+
+def mine_parameters(
+    workspace_id: Optional[str] = None,
+    target_url: Optional[str] = None,
+    scan_id: Optional[str] = None
+) -> int:
+    """
+    Upsert query parameters found in stored discovery URLs
+
+    Args:
+        workspace_id: Workspace whose content_discovery rows are mined
+        target_url: Only mine rows of this scan target (whole workspace if omitted)
+        scan_id: Scan ID stamped on newly created parameter rows
+
+    Returns:
+        Number of parameter rows inserted or updated
+    """
+    scope = "AND cd.target_url = :target_url" if target_url else ""
+    sql = MINE_PARAMETERS_SQL.format(scope=scope, param_hash=PARAM_HASH_SQL)
+
+    with engine.begin() as conn:
+        result = conn.execute(text(sql), {
+            'workspace_id': workspace_id,
+            'target_url': target_url,
+            'scan_id': scan_id,
+        })
+        upserted = result.rowcount
+
+    logger.info(f"Parameter mining upserted {upserted} parameters (workspace={workspace_id}, target={target_url})")
+    return upserted
@@ -0,0 +1,184 @@
+"""
+Passive Source Cache
+On-disk, gzip-compressed TTL cache of archive tool output (gau, waymore, paramspider)
+
+Archive results change slowly while fetching them takes minutes and gets rate
+limited, so raw output lines are cached per (tool, domain). Entries expire by
+file age; a scan can bypass the cache with refresh_passive_cache.
+"""
+
+import gzip
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv('PASSIVE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'passive_cache'))
+DEFAULT_TTL = int(os.getenv('PASSIVE_CACHE_TTL', str(7 * 24 * 3600)))
+
+CACHED_TOOLS = ('gau', 'waymore', 'paramspider')
+
+_UNSAFE_CHARS = re.compile(r'[^a-z0-9.\-_]')
+
+_counters = {'hits': 0, 'misses': 0, 'expired': 0, 'writes': 0}
+_counters_lock = threading.Lock()
+
+
+def _count(name: str):
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def _entry_path(tool: str, domain: str) -> str:
+    safe_domain = _UNSAFE_CHARS.sub('_', domain.lower().strip())
+    return os.path.join(CACHE_DIR, tool, f"{safe_domain}.txt.gz")
+
+
+def iter_cached_lines(tool: str, domain: str, ttl: int = DEFAULT_TTL) -> Optional[Iterator[str]]:
+    """
+    Cached output lines for a tool/domain, read lazily
+
+    Returns:
+        Line iterator, or None on a miss or an expired entry
+    """
+    path = _entry_path(tool, domain)
+    try:
+        age = time.time() - os.path.getmtime(path)
+    except OSError:
+        _count('misses')
+        return None
+
+    if age > ttl:
+        _count('expired')
+        return None
+
+    _count('hits')
+    logger.info(f"Passive cache hit for {tool} {domain} ({int(age)}s old)")
+    return _read_lines(path)
+
+
+def _read_lines(path: str) -> Iterator[str]:
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                line = line.rstrip('\n')
+                if line:
+                    yield line
+    except (OSError, EOFError) as e:
+        logger.warning(f"Corrupt passive cache entry {path}: {e}")
+
+
+class CacheWriter:
+    """Streams lines into a new cache entry; the entry only replaces the old one on commit()"""
+
+    def __init__(self, tool: str, domain: str):
+        self.path = _entry_path(tool, domain)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix='.tmp')
+        self._raw = os.fdopen(fd, 'wb')
+        self._gzip = gzip.GzipFile(fileobj=self._raw, mode='wb', compresslevel=6)
+        self.count = 0
+        self._closed = False
+
+    def write(self, line: str):
+        self._gzip.write(line.encode('utf-8') + b'\n')
+        self.count += 1
+
+    def _close(self):
+        if not self._closed:
+            self._closed = True
+            self._gzip.close()
+            self._raw.close()
+
+    def commit(self):
+        self._close()
+        os.replace(self.tmp_path, self.path)
+        _count('writes')
+
+    def abort(self):
+        self._close()
+        if os.path.exists(self.tmp_path):
+            os.unlink(self.tmp_path)
+
+    def __enter__(self) -> 'CacheWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Anything not explicitly committed is discarded
+        self.abort()
+        return False
+
+
+def store_lines(tool: str, domain: str, lines: Iterable[str]):
+    """Write tool output for a domain (atomic replace, so readers never see partial files)"""
+    with CacheWriter(tool, domain) as writer:
+        for line in lines:
+            writer.write(line)
+        writer.commit()
+
+
+def clear_cache(tool: Optional[str] = None, domain: Optional[str] = None) -> int:
+    """Delete cache entries, optionally limited to a tool and/or domain. Returns files removed."""
+    removed = 0
+    for cached_tool in ([tool] if tool else CACHED_TOOLS):
+        if domain:
+            paths = [_entry_path(cached_tool, domain)]
+        else:
+            tool_dir = os.path.join(CACHE_DIR, cached_tool)
+            # Skip the .tmp files of CacheWriters still writing; their commit() would fail
+            paths = [
+                entry.path for entry in os.scandir(tool_dir) if not entry.name.endswith('.tmp')
+            ] if os.path.isdir(tool_dir) else []
+        for path in paths:
+            try:
+                os.unlink(path)
+                removed += 1
+            except OSError:
+                continue
+    return removed
+
+
+def get_cache_stats(ttl: int = DEFAULT_TTL) -> Dict:
+    """Entry counts, compressed size and age per tool, plus hit/miss counters since startup"""
+    now = time.time()
+    tools = {}
+
+    for tool in CACHED_TOOLS:
+        tool_dir = os.path.join(CACHE_DIR, tool)
+        stats = {'entries': 0, 'expired': 0, 'bytes': 0, 'oldest_age_seconds': None, 'newest_age_seconds': None}
+
+        if os.path.isdir(tool_dir):
+            for entry in os.scandir(tool_dir):
+                if not entry.name.endswith('.txt.gz'):
+                    continue
+                info = entry.stat()
+                age = int(now - info.st_mtime)
+                stats['entries'] += 1
+                stats['bytes'] += info.st_size
+                if age > ttl:
+                    stats['expired'] += 1
+                if stats['oldest_age_seconds'] is None or age > stats['oldest_age_seconds']:
+                    stats['oldest_age_seconds'] = age
+                if stats['newest_age_seconds'] is None or age < stats['newest_age_seconds']:
+                    stats['newest_age_seconds'] = age
+
+        tools[tool] = stats
+
+    with _counters_lock:
+        counters = dict(_counters)
+
+    lookups = counters['hits'] + counters['misses'] + counters['expired']
+    return {
+        'cache_dir': CACHE_DIR,
+        'ttl_seconds': ttl,
+        'tools': tools,
+        'total_entries': sum(t['entries'] for t in tools.values()),
+        'total_bytes': sum(t['bytes'] for t in tools.values()),
+        **counters,
+        'hit_rate': round(counters['hits'] / lookups, 3) if lookups else None,
+    }
@@ -0,0 +1,122 @@
+"""
+Recursion Scheduler
+Decides which discovered directories get a follow-up fuzzing pass
+
+Directories reported by any tool (and the parent directories of discovered
+files) go into a priority queue scored by status code, interesting keywords
+and depth. Each follow-up fuzz costs one wordlist's worth of requests against
+the target's budget, so the budget goes to the most promising directories first
+instead of exhausting a fixed recursion depth everywhere.
+"""
+
+import heapq
+import itertools
+import logging
+from typing import Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from src.controllers.content_ingest import INTERESTING_KEYWORDS
+from src.controllers.discovery_records import DiscoveryRecord
+
+logger = logging.getLogger(__name__)
+
+# Protected and redirecting directories are the likeliest to hide content
+STATUS_SCORES = {
+    401: 4.0, 403: 4.0,
+    301: 3.0, 302: 2.5, 307: 2.5, 308: 3.0,
+    200: 2.0, 204: 1.5,
+    500: 1.0, 503: 0.5,
+}
+# Parent directories inferred from a deeper URL have no response of their own
+INFERRED_SCORE = 1.5
+KEYWORD_SCORE = 3.0
+DEPTH_PENALTY = 1.5
+
+
+def directory_of(url: str) -> Tuple[str, str]:
+    """(origin, directory path ending in '/') for a URL"""
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    last = path.rsplit('/', 1)[-1]
+    if last and '.' not in last:
+        path += '/'
+    elif last:
+        path = path[:-len(last)]
+    return f"{parts.scheme}://{parts.netloc}", path
+
+
+def score_directory(path: str, status_code: Optional[int], depth: int) -> float:
+    score = STATUS_SCORES.get(status_code, 0.0) if status_code else INFERRED_SCORE
+    lowered = path.lower()
+    if any(keyword in lowered for keyword in INTERESTING_KEYWORDS):
+        score += KEYWORD_SCORE
+    return score - DEPTH_PENALTY * depth
+
+
+class RecursionScheduler:
+    def __init__(self, target_url: str, request_budget: int, cost_per_job: int, max_depth: int = 3):
+        parts = urlsplit(target_url)
+        self.origin = f"{parts.scheme}://{parts.netloc}"
+        self.host = parts.netloc.lower()
+        self.remaining = request_budget
+        self.cost_per_job = max(1, cost_per_job)
+        self.max_depth = max_depth
+        self._queue: List[Tuple[float, int, str, int]] = []
+        self._counter = itertools.count()
+        # The root was already fuzzed by the main pass
+        self._seen = {'/'}
+        self.jobs_run = 0
+
+    @staticmethod
+    def _depth(path: str) -> int:
+        return len([segment for segment in path.split('/') if segment])
+
+    def _push(self, path: str, status_code: Optional[int]):
+        depth = self._depth(path)
+        if path in self._seen or depth > self.max_depth:
+            return
+        self._seen.add(path)
+        score = score_directory(path, status_code, depth)
+        heapq.heappush(self._queue, (-score, next(self._counter), path, depth))
+
+    def add_records(self, records: Iterable[DiscoveryRecord]):
+        """Queue directories (and parent directories) of records on the target host"""
+        inferred = []
+        for record in records:
+            if record.status_code == 404:
+                continue
+            if urlsplit(record.url).netloc.lower() != self.host:
+                continue
+
+            _, path = directory_of(record.url)
+            url_path = urlsplit(record.url).path or '/'
+            # The record's own status only describes the directory if the record is the directory
+            is_directory = url_path.rstrip('/') + '/' == path
+            self._push(path, record.status_code if is_directory else None)
+
+            segments = [segment for segment in path.split('/') if segment]
+            for i in range(1, len(segments)):
+                inferred.append('/' + '/'.join(segments[:i]) + '/')
+
+        # After the directories that have their own response, so those keep their status score
+        for path in inferred:
+            self._push(path, None)
+
+    def next_job(self) -> Optional[Tuple[str, int]]:
+        """Highest-scoring directory URL and its depth, or None when out of work or budget"""
+        if not self._queue or self.remaining < self.cost_per_job:
+            return None
+
+        negative_score, _, path, depth = heapq.heappop(self._queue)
+        self.remaining -= self.cost_per_job
+        self.jobs_run += 1
+        logger.debug(f"Recursing into {path} (score {-negative_score:.1f}, depth {depth})")
+        return self.origin + path, depth
+
+    def stats(self) -> dict:
+        return {
+            'jobs_run': self.jobs_run,
+            'queued': len(self._queue),
+            'remaining_budget': self.remaining,
+            'cost_per_job': self.cost_per_job,
+        }
@@ -0,0 +1,194 @@
+"""
+Response Calibration
+Soft-404 / wildcard detection for content discovery targets
+
+Before fuzzing, a handful of random paths are requested and their responses
+fingerprinted (status, size, word and line counts, body hash). For every status
+the probes agree on, the most stable dimension becomes a filter: passed to
+ffuf/feroxbuster as -fs/-fw/-fl and applied to results before they are saved.
+"""
+
+import hashlib
+import logging
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import requests
+
+from src.controllers.discovery_records import DiscoveryMerge, DiscoveryRecord
+
+logger = logging.getLogger(__name__)
+
+# Random path shapes - catch-alls often differ per extension or trailing slash
+PROBE_TEMPLATES = ('/{token}', '/{token}/', '/{token}.php', '/{token}.html', '/.{token}')
+
+# Dimensions in order of preference; size is only used when bodies are identical
+FILTER_DIMENSIONS = ('size', 'words', 'lines')
+
+
+@dataclass(slots=True)
+class ResponseFingerprint:
+    status: int
+    size: int
+    words: int
+    lines: int
+    ferox_words: int
+    ferox_lines: int
+    body_hash: str
+
+    @classmethod
+    def from_body(cls, status: int, body: bytes) -> 'ResponseFingerprint':
+        text = body.decode('utf-8', errors='ignore')
+        return cls(
+            status=status,
+            size=len(body),
+            # ffuf counts split(' ') / split('\n'), feroxbuster counts whitespace words / lines()
+            words=len(text.split(' ')),
+            lines=len(text.split('\n')),
+            ferox_words=len(text.split()),
+            ferox_lines=len(text.splitlines()),
+            body_hash=hashlib.md5(body).hexdigest()
+        )
+
+
+@dataclass
+class StatusFilter:
+    """Wildcard filter for one status code"""
+    status: int
+    dimension: str
+    value: int
+    ferox_value: int
+
+    def matches(self, record: DiscoveryRecord) -> bool:
+        if record.status_code != self.status:
+            return False
+
+        if self.dimension == 'size':
+            return record.content_length == self.value
+
+        expected = self.ferox_value if record.tool == 'feroxbuster' else self.value
+        actual = record.words if self.dimension == 'words' else record.lines
+        return actual == expected
+
+
+@dataclass
+class Calibration:
+    target_url: str
+    fingerprints: List[ResponseFingerprint] = field(default_factory=list)
+    filters: List[StatusFilter] = field(default_factory=list)
+
+    def _values(self, dimension: str, ferox: bool = False) -> List[str]:
+        values = []
+        for status_filter in self.filters:
+            if status_filter.dimension == dimension:
+                value = status_filter.ferox_value if ferox else status_filter.value
+                if str(value) not in values:
+                    values.append(str(value))
+        return values
+
+    def ffuf_args(self) -> List[str]:
+        args = []
+        for dimension, flag in (('size', '-fs'), ('words', '-fw'), ('lines', '-fl')):
+            values = self._values(dimension)
+            if values:
+                args += [flag, ','.join(values)]
+        return args
+
+    def feroxbuster_args(self) -> List[str]:
+        args = []
+        for dimension, flag in (('size', '--filter-size'), ('words', '--filter-words'), ('lines', '--filter-lines')):
+            for value in self._values(dimension, ferox=True):
+                args += [flag, value]
+        return args
+
+    def is_wildcard(self, record: DiscoveryRecord) -> bool:
+        return any(status_filter.matches(record) for status_filter in self.filters)
+
+    def filter_records(self, records: DiscoveryMerge) -> DiscoveryMerge:
+        """Drop records that look like the calibrated catch-all response"""
+        if not self.filters:
+            return records
+
+        kept = DiscoveryMerge(record for record in records if not self.is_wildcard(record))
+        dropped = len(records) - len(kept)
+        if dropped:
+            logger.info(f"Calibration dropped {dropped} wildcard responses for {self.target_url}")
+        return kept
+
+    def to_dict(self) -> Dict:
+        return {
+            'target_url': self.target_url,
+            'probes': len(self.fingerprints),
+            'filters': [
+                {'status': f.status, 'dimension': f.dimension, 'value': f.value}
+                for f in self.filters
+            ]
+        }
+
+
+def _stable_value(fingerprints: List[ResponseFingerprint], dimension: str) -> Optional[int]:
+    values = {getattr(fp, dimension) for fp in fingerprints}
+    return values.pop() if len(values) == 1 else None
+
+
+def build_filters(fingerprints: List[ResponseFingerprint], min_probes: int = 2) -> List[StatusFilter]:
+    """Pick one filter dimension per status that every probe with that status agrees on"""
+    by_status: Dict[int, List[ResponseFingerprint]] = {}
+    for fp in fingerprints:
+        by_status.setdefault(fp.status, []).append(fp)
+
+    filters = []
+    for status, group in by_status.items():
+        # Real 404s are already filtered by status; one-off statuses are not a pattern
+        if status == 404 or len(group) < min_probes:
+            continue
+
+        identical_bodies = len({fp.body_hash for fp in group}) == 1
+        for dimension in FILTER_DIMENSIONS:
+            if dimension == 'size' and not identical_bodies:
+                continue
+            value = _stable_value(group, dimension)
+            if value is None:
+                continue
+            ferox_value = value
+            if dimension != 'size':
+                ferox_value = _stable_value(group, f"ferox_{dimension}")
+                if ferox_value is None:
+                    continue
+            filters.append(StatusFilter(status, dimension, value, ferox_value))
+            break
+
+    return filters
+
+
+def calibrate_target(target_url: str, timeout: int = 10, verify: bool = False) -> Calibration:
+    """
+    Fingerprint the target's response to random, non-existent paths
+
+    Args:
+        target_url: Base URL (scheme://host[:port])
+        timeout: Per-request timeout
+        verify: Verify TLS certificates
+
+    Returns:
+        Calibration (with no filters if the target returns real 404s)
+    """
+    calibration = Calibration(target_url=target_url)
+    base = target_url.rstrip('/')
+
+    with requests.Session() as session:
+        for template in PROBE_TEMPLATES:
+            url = base + template.format(token=uuid.uuid4().hex[:16])
+            try:
+                # Tools don't follow redirects, so neither do the probes
+                response = session.get(url, timeout=timeout, verify=verify, allow_redirects=False)
+                calibration.fingerprints.append(ResponseFingerprint.from_body(response.status_code, response.content))
+            except requests.RequestException as e:
+                logger.debug(f"Calibration probe failed for {url}: {e}")
+
+    calibration.filters = build_filters(calibration.fingerprints)
+    if calibration.filters:
+        logger.info(f"Wildcard responses detected for {target_url}: {calibration.to_dict()['filters']}")
+
+    return calibration
@@ -0,0 +1,164 @@
+"""
+Scan Event Broker
+In-process pub/sub for AutoScan job progress, consumed by the SSE stream endpoint
+
+The background scan task publishes the job state after every change; the broker
+diffs it against the last published state and fans out only what changed
+(status, phase, progress, counters, new log entries) to every subscriber.
+Subscribers never touch the database.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Statuses after which a job produces no more events
+TERMINAL_STATUSES = ('completed', 'failed', 'cancelled')
+
+# Per-subscriber queue bound - slow clients drop events instead of growing memory
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+
+class ScanEventBroker:
+    """Fans out job events to async subscribers (thread-safe publish)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._last_state: Dict[str, Dict] = {}
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        """Register a subscriber for a job. Must be called from a running event loop."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+        with self._lock:
+            self._subscribers.setdefault(job_id, []).append((loop, queue))
+
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue):
+        """Remove a subscriber"""
+        with self._lock:
+            subscribers = self._subscribers.get(job_id, [])
+            self._subscribers[job_id] = [(l, q) for l, q in subscribers if q is not queue]
+            if not self._subscribers[job_id]:
+                del self._subscribers[job_id]
+
+    def subscriber_count(self, job_id: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(job_id, []))
+
+    def publish(self, job_id: str, event: str, data: Dict):
+        """Publish a single event to all subscribers of a job"""
+        message = {'event': event, 'data': data}
+
+        with self._lock:
+            subscribers = list(self._subscribers.get(job_id, []))
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._enqueue, queue, message)
+            except RuntimeError:
+                # Subscriber's loop is closed - it will be unsubscribed by its stream
+                continue
+
+    @staticmethod
+    def _enqueue(queue: asyncio.Queue, message: Dict):
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning(f"Scan event queue full, dropping {message['event']} event")
+
+    def publish_job_state(self, job) -> int:
+        """
+        Diff a ScanJob against the last published state and emit the changes
+
+        Args:
+            job: ScanJob instance (after the change has been applied)
+
+        Returns:
+            Number of events emitted
+        """
+        state = {
+            'status': job.status,
+            'current_phase': job.current_phase,
+            'completed_phases': list(job.completed_phases or []),
+            'failed_phases': list(job.failed_phases or []),
+            'phase_progress': dict(job.phase_progress or {}),
+            'results': dict(job.results or {}),
+            'error_message': job.error_message,
+            'log_count': len(job.logs or []),
+            'last_log': (job.logs or [None])[-1],
+        }
+
+        with self._lock:
+            previous = self._last_state.get(job.id, {})
+            if state['status'] in TERMINAL_STATUSES:
+                self._last_state.pop(job.id, None)
+            else:
+                self._last_state[job.id] = state
+
+        events = []
+
+        if state['status'] != previous.get('status'):
+            events.append(('status', {
+                'status': state['status'],
+                'error_message': state['error_message'],
+                'started_at': job.started_at.isoformat() if job.started_at else None,
+                'completed_at': job.completed_at.isoformat() if job.completed_at else None,
+            }))
+
+        if (state['current_phase'] != previous.get('current_phase')
+                or state['completed_phases'] != previous.get('completed_phases')
+                or state['failed_phases'] != previous.get('failed_phases')):
+            events.append(('phase', {
+                'current_phase': state['current_phase'],
+                'completed_phases': state['completed_phases'],
+                'failed_phases': state['failed_phases'],
+            }))
+
+        if state['phase_progress'] != previous.get('phase_progress'):
+            events.append(('progress', {'phase_progress': state['phase_progress']}))
+
+        if state['results'] != previous.get('results'):
+            events.append(('counters', {'results': state['results']}))
+
+        for entry in _new_log_entries(job.logs or [], previous.get('last_log')):
+            events.append(('log', entry))
+
+        for event, data in events:
+            self.publish(job.id, event, data)
+
+        return len(events)
+
+    def forget(self, job_id: str):
+        """Drop cached state for a job (e.g. after deletion)"""
+        with self._lock:
+            self._last_state.pop(job_id, None)
+
+
+def _new_log_entries(logs: List[Dict], last_seen: Optional[Dict]) -> List[Dict]:
+    """Return log entries appended after last_seen (logs are a capped ring of 100)"""
+    if last_seen is None:
+        return list(logs)
+
+    for index in range(len(logs) - 1, -1, -1):
+        if logs[index] == last_seen:
+            return logs[index + 1:]
+
+    # last_seen rotated out of the ring - everything we have is new
+    return list(logs)
+
+
+def format_sse(event: str, data: Dict) -> str:
+    """Encode one Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+# Shared broker for the API process
+scan_event_broker = ScanEventBroker()
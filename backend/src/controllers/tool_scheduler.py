@@ -0,0 +1,88 @@
+"""
+Discovery Tool Scheduler
+Runs content discovery tools concurrently under per-target and global budgets
+
+Active tools (fuzzers, crawlers) send traffic to the target, so at most
+max_active tools hit the same host at once across every scan in the process,
+and each one gets an equal share of the scan's rate_limit. Passive tools
+(archive lookups) only count against the global budget.
+"""
+
+import logging
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Tool processes allowed at once across all scans in this process
+GLOBAL_TOOL_SLOTS = int(os.getenv('CONTENT_DISCOVERY_TOOL_SLOTS', '8'))
+
+_global_slots = threading.BoundedSemaphore(GLOBAL_TOOL_SLOTS)
+_target_slots: 'weakref.WeakValueDictionary[str, threading.BoundedSemaphore]' = weakref.WeakValueDictionary()
+_target_slots_lock = threading.Lock()
+
+
+def _slots_for_target(target: str, size: int) -> threading.BoundedSemaphore:
+    """Shared per-target semaphore (sized by whichever scan creates it first)"""
+    with _target_slots_lock:
+        slots = _target_slots.get(target)
+        if slots is None:
+            slots = threading.BoundedSemaphore(max(1, size))
+            _target_slots[target] = slots
+        return slots
+
+
+def split_rate_limit(rate_limit: int, max_active: int) -> int:
+    """Per-tool request rate so concurrent active tools stay within rate_limit together"""
+    return max(1, rate_limit // max(1, max_active))
+
+
+@dataclass
+class ToolTask:
+    name: str
+    run: Callable
+    active: bool = True
+
+
+class ToolScheduler:
+    def __init__(self, target: str, max_active: int = 2, max_parallel: int = 4):
+        self.target = target
+        self.max_active = max(1, max_active)
+        self.max_parallel = max(1, max_parallel)
+        self._target_slots = _slots_for_target(target, self.max_active)
+
+    def _run_task(self, task: ToolTask):
+        # Target slot first so a waiting task never holds a global slot
+        if task.active:
+            self._target_slots.acquire()
+        try:
+            with _global_slots:
+                logger.info(f"Starting {task.name} for {self.target}")
+                return task.run()
+        finally:
+            if task.active:
+                self._target_slots.release()
+
+    def run(self, tasks) -> Iterator[Tuple[str, Optional[object]]]:
+        """
+        Run tasks concurrently, yielding (name, result) as each finishes
+
+        A task that raises yields (name, None) so the others still complete.
+        """
+        tasks = list(tasks)
+        if not tasks:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.max_parallel, len(tasks))) as executor:
+            futures = {executor.submit(self._run_task, task): task for task in tasks}
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    yield task.name, future.result()
+                except Exception as e:
+                    logger.error(f"{task.name} failed: {e}")
+                    yield task.name, None
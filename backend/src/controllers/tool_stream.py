@@ -0,0 +1,114 @@
+"""
+Tool Output Streaming
+Line-by-line stdout reader for long-running discovery tools
+
+subprocess.run(capture_output=True) holds a tool's whole output in memory and
+discards it when the timeout fires. ToolStream yields stdout lines as they are
+written and, on timeout, kills the process but keeps everything read so far.
+FileStream does the same for tools that can only write to an output file.
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import threading
+from typing import Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Lines longer than this are skipped (minified blobs, binary noise) to bound memory
+MAX_LINE_LENGTH = 8192
+
+
+class ToolStream:
+    """Iterate over a command's stdout lines with a wall-clock timeout"""
+
+    def __init__(self, cmd: List[str], timeout: int, max_line_length: int = MAX_LINE_LENGTH):
+        self.cmd = cmd
+        self.timeout = timeout
+        self.max_line_length = max_line_length
+        self.timed_out = False
+        self.returncode: Optional[int] = None
+        self.lines_read = 0
+
+    def _expire(self, process: subprocess.Popen):
+        self.timed_out = True
+        process.kill()
+
+    def __iter__(self) -> Iterator[str]:
+        process = subprocess.Popen(
+            self.cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL,
+            text=True,
+            errors='replace',
+            bufsize=1
+        )
+        timer = threading.Timer(self.timeout, self._expire, args=(process,))
+        timer.daemon = True
+        timer.start()
+
+        try:
+            for raw in process.stdout:
+                line = raw.strip()
+                if not line or len(line) > self.max_line_length:
+                    continue
+                self.lines_read += 1
+                yield line
+        finally:
+            timer.cancel()
+            if process.poll() is None:
+                # Consumer stopped early
+                process.kill()
+            process.stdout.close()
+            self.returncode = process.wait()
+
+            if self.timed_out:
+                logger.warning(f"{self.cmd[0]} timed out after {self.timeout}s, keeping {self.lines_read} lines read so far")
+
+
+class FileStream:
+    """
+    Run a tool that writes its results to a file, then iterate the file's lines
+
+    Same interface as ToolStream: on timeout the process is killed and whatever
+    it wrote is still read. cleanup_dir is removed once iteration finishes.
+    """
+
+    def __init__(self, cmd: List[str], output_file: str, timeout: int,
+                 cleanup_dir: Optional[str] = None, max_line_length: int = MAX_LINE_LENGTH):
+        self.cmd = cmd
+        self.output_file = output_file
+        self.timeout = timeout
+        self.cleanup_dir = cleanup_dir
+        self.max_line_length = max_line_length
+        self.timed_out = False
+        self.returncode: Optional[int] = None
+        self.lines_read = 0
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            try:
+                result = subprocess.run(self.cmd, capture_output=True, timeout=self.timeout)
+                self.returncode = result.returncode
+            except subprocess.TimeoutExpired:
+                self.timed_out = True
+
+            if not os.path.exists(self.output_file):
+                return
+
+            with open(self.output_file, 'r', errors='replace') as f:
+                for raw in f:
+                    line = raw.strip()
+                    if not line or len(line) > self.max_line_length:
+                        continue
+                    self.lines_read += 1
+                    yield line
+
+            if self.timed_out:
+                logger.warning(f"{self.cmd[0]} timed out after {self.timeout}s, keeping {self.lines_read} lines written so far")
+        finally:
+            if self.cleanup_dir:
+                shutil.rmtree(self.cleanup_dir, ignore_errors=True)
@@ -0,0 +1,119 @@
+"""
+URL Canonicalization
+In-process replacement for piping discovery results through unfurl
+
+Every URL added to a canonical DiscoveryMerge goes through canonicalize_url,
+so equivalent spellings of a URL (case, default port, dot-segments, query
+order, fragments, tracking parameters) collapse as soon as a tool reports them.
+"""
+
+import logging
+from functools import lru_cache
+from typing import Iterable, List
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+TRACKING_PARAMS = frozenset((
+    'gclid', 'dclid', 'fbclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', '_hsenc', '_hsmi', 'mkt_tok', 'spm'
+))
+TRACKING_PREFIXES = ('utm_',)
+
+
+@lru_cache(maxsize=4096)
+def _canonical_netloc(scheme: str, netloc: str) -> str:
+    """Lowercase host, strip trailing dot and default port (hosts repeat, so cached)"""
+    userinfo, _, hostport = netloc.rpartition('@')
+
+    if hostport.startswith('['):
+        # IPv6 literal: [addr]:port
+        host, _, port = hostport.partition(']')
+        host += ']'
+        port = port[1:]
+    else:
+        host, _, port = hostport.partition(':')
+
+    host = host.lower().rstrip('.')
+    if port == DEFAULT_PORTS.get(scheme) or (port and not port.isdigit()):
+        port = ''
+    elif port:
+        port = str(int(port))
+
+    netloc = f"{host}:{port}" if port else host
+    return f"{userinfo}@{netloc}" if userinfo else netloc
+
+
+def remove_dot_segments(path: str) -> str:
+    """Resolve '.' and '..' segments (RFC 3986 section 5.2.4)"""
+    if '.' not in path:
+        return path
+
+    output: List[str] = []
+    segments = path.split('/')
+    for segment in segments[1:] if path.startswith('/') else segments:
+        if segment == '..':
+            if output:
+                output.pop()
+        elif segment != '.':
+            output.append(segment)
+
+    resolved = '/' + '/'.join(output)
+    # A trailing '.' or '..' still names a directory
+    if segments[-1] in ('.', '..') and not resolved.endswith('/'):
+        resolved += '/'
+    return resolved
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_query(query: str) -> str:
+    """Drop tracking params and sort by key, keeping value order for repeated keys"""
+    if not query:
+        return ''
+
+    pairs = [pair for pair in query.split('&') if pair]
+    pairs = [pair for pair in pairs if not _is_tracking_param(pair.split('=', 1)[0])]
+    pairs.sort(key=lambda pair: pair.split('=', 1)[0])
+    return '&'.join(pairs)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical form of an absolute URL
+
+    Args:
+        url: URL as reported by a discovery tool
+
+    Returns:
+        Canonical URL, or the stripped input if it is not an absolute http(s) URL
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.netloc:
+        return url
+
+    try:
+        netloc = _canonical_netloc(scheme, parts.netloc)
+    except ValueError:
+        return url
+
+    path = remove_dot_segments(parts.path) or '/'
+    query = canonicalize_query(parts.query)
+
+    return f"{scheme}://{netloc}{path}?{query}" if query else f"{scheme}://{netloc}{path}"
+
+
+def canonicalize_batch(urls: Iterable[str]) -> List[str]:
+    """Canonicalize a batch of URLs (output aligned with input)"""
+    return [canonicalize_url(url) for url in urls]
@@ -0,0 +1,107 @@
+"""
+URL Pattern Reducer
+In-process, single-pass equivalent of uro for content discovery results
+
+Two URLs are considered the same pattern when they share scheme, host, path
+shape (numeric / UUID / hash segments collapsed) and the set of query parameter
+names. The first URL seen for each pattern is kept; static assets are dropped.
+"""
+
+import logging
+import re
+from typing import Iterable, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from src.controllers.discovery_records import DiscoveryMerge, DiscoveryRecord
+
+logger = logging.getLogger(__name__)
+
+# Same defaults as uro's extension blacklist (JS is kept for later analysis)
+STATIC_EXTENSIONS = frozenset((
+    'css', 'scss', 'png', 'jpg', 'jpeg', 'gif', 'svg', 'ico', 'webp', 'bmp',
+    'tif', 'tiff', 'ttf', 'otf', 'woff', 'woff2', 'eot', 'mp3', 'mp4', 'avi',
+    'webm', 'pdf'
+))
+
+NUMERIC_SEGMENT = re.compile(r'^\d+$')
+UUID_SEGMENT = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
+HASH_SEGMENT = re.compile(r'^[0-9a-f]{16,}$', re.IGNORECASE)
+
+
+def _segment_shape(segment: str) -> str:
+    if NUMERIC_SEGMENT.match(segment):
+        return '{int}'
+    if UUID_SEGMENT.match(segment):
+        return '{uuid}'
+    if HASH_SEGMENT.match(segment):
+        return '{hash}'
+    return segment
+
+
+def url_pattern(url: str) -> Optional[Tuple]:
+    """
+    Pattern key for a URL, or None if it should be dropped
+
+    Args:
+        url: Absolute URL
+
+    Returns:
+        (scheme, host, path shape, parameter names) tuple, or None for static assets
+    """
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+
+    segments = parts.path.split('/')
+    last = segments[-1]
+    if '.' in last and last.rsplit('.', 1)[1].lower() in STATIC_EXTENSIONS:
+        return None
+
+    shape = tuple(_segment_shape(segment) for segment in segments)
+    params = frozenset(pair.split('=', 1)[0] for pair in parts.query.split('&') if pair)
+
+    return (parts.scheme.lower(), parts.netloc.lower(), shape, params)
+
+
+def reduce_urls(urls: Iterable[str]) -> list:
+    """Keep the first URL of every pattern, in input order"""
+    seen = set()
+    kept = []
+
+    for url in urls:
+        pattern = url_pattern(url)
+        if pattern is None or pattern in seen:
+            continue
+        seen.add(pattern)
+        kept.append(url)
+
+    return kept
+
+
+def reduce_records(records: Iterable[DiscoveryRecord], seen: Optional[Set[Tuple]] = None) -> DiscoveryMerge:
+    """
+    Reduce discovery records to one per URL pattern
+
+    Args:
+        records: DiscoveryRecords (e.g. a DiscoveryMerge)
+        seen: Patterns already kept by earlier calls; updated in place, so
+            batches reduced one after another keep one record per pattern overall
+
+    Returns:
+        New DiscoveryMerge holding the first record of every pattern
+    """
+    seen = set() if seen is None else seen
+    kept = DiscoveryMerge()
+    total = 0
+
+    for record in records:
+        total += 1
+        pattern = url_pattern(record.url)
+        if pattern is None or pattern in seen:
+            continue
+        seen.add(pattern)
+        kept.add(record)
+
+    logger.info(f"URL reducer kept {len(kept)} of {total} URLs")
+    return kept
@@ -9,13 +9,14 @@ Only test targets you have explicit permission to test!
 
 import logging
 import json
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 
 from src.models.Subdomain import Subdomain
 from src.models.ContentDiscovery import ContentDiscovery
+from src.controllers.validation_scheduler import ValidationScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -45,7 +46,8 @@ def validate_single_target(
     target_url: str,
     discovered_paths: List[str] = None,
     db: Session = None,
-    workspace_id: Optional[str] = None
+    workspace_id: Optional[str] = None,
+    session=None
 ) -> Dict:
     """
     Validate a single target
@@ -55,6 +57,7 @@ def validate_single_target(
         discovered_paths: Optional list of discovered paths
         db: Database session
         workspace_id: Optional workspace filter
+        session: Optional shared (rate-limited) requests session for the validators
     
     Returns:
         Validation results
@@ -73,7 +76,7 @@ def validate_single_target(
         # Import validators
         try:
             from src.validators.browser_validator import validate_high_value_target
-            result = validate_high_value_target(target_url, discovered_paths)
+            result = validate_high_value_target(target_url, discovered_paths, session=session)
         except ImportError:
             # Fallback if validators not available
             result = {
@@ -106,7 +109,8 @@ def validate_high_value_targets_for_domain(
     db: Session,
     workspace_id: Optional[str] = None,
     limit: int = 10,
-    min_risk_score: int = 30
+    min_risk_score: int = 30,
+    max_concurrent: int = 10
 ) -> List[Dict]:
     """
     Validate high-value targets for a domain
@@ -117,6 +121,7 @@ def validate_high_value_targets_for_domain(
         workspace_id: Optional workspace filter
         limit: Max number of targets to validate
         min_risk_score: Minimum risk score to validate
+        max_concurrent: Targets validated at once
     
     Returns:
         List of validation results
@@ -141,38 +146,14 @@ def validate_high_value_targets_for_domain(
     
     results = []
     
-    for target in high_value_targets:
-        target_url = f"https://{target.full_domain}"
-        
-        # Check if recently validated
-        if _was_recently_validated(target):
-            logger.info(f"⏭️  Skipping {target_url} - recently validated")
-            continue
-        
-        logger.info(f"🔍 Validating: {target_url} (Risk Score: {target.risk_score})")
-        
-        # Get discovered paths
-        discovered_paths = _get_discovered_paths(target.id, db, workspace_id)
-        
-        # Validate
-        validation_result = validate_single_target(
-            target_url,
-            discovered_paths=discovered_paths,
-            db=db,
-            workspace_id=workspace_id
-        )
-        
+    for target, validation_result in _validate_subdomains(high_value_targets, db, workspace_id, max_concurrent):
         results.append({
-            'target': target_url,
+            'target': f"https://{target.full_domain}",
             'original_risk_score': target.risk_score,
             'vulns_found': validation_result.get('total_vulns', 0),
             'critical_vulns': validation_result.get('critical_vulns', 0),
             'validation_complete': 'error' not in validation_result
         })
-        
-        # Rate limiting
-        import time
-        time.sleep(3)
     
     logger.info(f"✅ Validation batch complete: {len(results)} targets processed")
     
@@ -183,7 +164,8 @@ def validate_workspace_targets(
     workspace_id: str,
     db: Session,
     limit: int = 10,
-    min_risk_score: int = 30
+    min_risk_score: int = 30,
+    max_concurrent: int = 10
 ) -> List[Dict]:
     """
     Validate high-value targets across an entire workspace
@@ -193,6 +175,7 @@ def validate_workspace_targets(
         db: Database session
         limit: Max number of targets to validate
         min_risk_score: Minimum risk score to validate
+        max_concurrent: Targets validated at once
     
     Returns:
         List of validation results
@@ -213,35 +196,15 @@ def validate_workspace_targets(
     
     results = []
     
-    for target in high_value_targets:
-        target_url = f"https://{target.full_domain}"
-        
-        if _was_recently_validated(target):
-            logger.info(f"⏭️  Skipping {target_url} - recently validated")
-            continue
-        
-        logger.info(f"🔍 Validating: {target_url} (Risk Score: {target.risk_score})")
-        
-        discovered_paths = _get_discovered_paths(target.id, db, workspace_id)
-        
-        validation_result = validate_single_target(
-            target_url,
-            discovered_paths=discovered_paths,
-            db=db,
-            workspace_id=workspace_id
-        )
-        
+    for target, validation_result in _validate_subdomains(high_value_targets, db, workspace_id, max_concurrent):
         results.append({
-            'target': target_url,
+            'target': f"https://{target.full_domain}",
             'domain': target.domain,
             'original_risk_score': target.risk_score,
             'vulns_found': validation_result.get('total_vulns', 0),
             'critical_vulns': validation_result.get('critical_vulns', 0),
             'validation_complete': 'error' not in validation_result
         })
-        
-        import time
-        time.sleep(3)
     
     logger.info(f"✅ Workspace validation batch complete: {len(results)} targets processed")
     
@@ -274,26 +237,20 @@ def quick_validate_target(
         from src.validators.webapp_validator import WebAppValidator
         validator = WebAppValidator()
         
-        auth_proofs = validator.test_auth_bypass(target_url)
-        file_proofs = validator.test_sensitive_files(target_url)
-        
-        all_proofs = auth_proofs + file_proofs
-        
-        if discovered_paths:
-            sqli_proofs = validator.test_sqli(target_url, discovered_paths[:3])
-            all_proofs.extend(sqli_proofs)
+        checks = ('auth_bypass', 'sensitive_files', 'sqli')
+        validation = validator.validate_target(target_url, (discovered_paths or [])[:3], checks=checks)
         
         results['vulns'] = [
             {
-                'type': p.vuln_type,
-                'severity': p.severity,
-                'url': p.url,
-                'payload': p.payload,
-                'evidence': p.evidence
+                'type': p['type'],
+                'severity': p['severity'],
+                'url': p['url'],
+                'payload': p['payload'],
+                'evidence': p['evidence']
             }
-            for p in all_proofs
+            for p in validation['proofs']
         ]
-        results['total_vulns'] = len(all_proofs)
+        results['total_vulns'] = validation['total_vulns']
     except ImportError:
         results['message'] = 'Validation module not available'
     
@@ -302,6 +259,38 @@ def quick_validate_target(
 
 # ==================== HELPER FUNCTIONS ====================
 
+def _validate_subdomains(
+    subdomains: List[Subdomain],
+    db: Session,
+    workspace_id: Optional[str] = None,
+    max_concurrent: int = 10
+) -> Iterator[Tuple[Subdomain, Dict]]:
+    """
+    Validate subdomains concurrently, yielding (subdomain, result) as each finishes
+    
+    Database reads and writes stay on the calling thread; workers only do HTTP.
+    """
+    tasks = {}
+    for target in subdomains:
+        target_url = f"https://{target.full_domain}"
+        
+        if _was_recently_validated(target):
+            logger.info(f"⏭️  Skipping {target_url} - recently validated")
+            continue
+        
+        logger.info(f"🔍 Validating: {target_url} (Risk Score: {target.risk_score})")
+        tasks[target_url] = (target, _get_discovered_paths(target.id, db, workspace_id))
+    
+    scheduler = ValidationScheduler(max_concurrent=max_concurrent)
+    for target_url, result in scheduler.run(
+        ((target_url, paths) for target_url, (_, paths) in tasks.items()),
+        lambda target_url, paths, session: validate_single_target(target_url, paths, session=session)
+    ):
+        if 'error' not in result:
+            _update_validation_results(target_url, result, db, workspace_id)
+        yield tasks[target_url][0], result
+
+
 def _update_validation_results(
     target_url: str, 
     validation_result: Dict, 
@@ -0,0 +1,143 @@
+"""
+Validation Scheduler
+Validates several targets at once under per-host request rate limits
+
+Targets run on a thread pool and results are yielded as each one finishes.
+Every validator request goes through one shared RateLimitedSession, which
+keeps a connection pool per host and takes a token from that host's bucket
+before sending, so a host sees at most VALIDATION_HOST_RATE requests per
+second (after an initial burst) no matter how many targets or checks hit it.
+Buckets are shared process-wide, so concurrent validation runs against the
+same host also share its budget.
+"""
+
+import logging
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Requests per second allowed to a single host, and how many may go out back to back
+VALIDATION_HOST_RATE = float(os.getenv('VALIDATION_HOST_RATE', '5'))
+VALIDATION_HOST_BURST = int(os.getenv('VALIDATION_HOST_BURST', '10'))
+
+# Pooled keep-alive connections kept per host
+CONNECTIONS_PER_HOST = 10
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = max(rate, 0.001)
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token, possibly one that refills later. Returns seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            # A negative balance queues callers behind each other in reservation order
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+_host_buckets: 'weakref.WeakValueDictionary[str, TokenBucket]' = weakref.WeakValueDictionary()
+_host_buckets_lock = threading.Lock()
+
+
+def bucket_for_host(host: str, rate: float = VALIDATION_HOST_RATE, burst: int = VALIDATION_HOST_BURST) -> TokenBucket:
+    """Shared per-host bucket (sized by whichever run creates it first)"""
+    with _host_buckets_lock:
+        bucket = _host_buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(rate, burst)
+            _host_buckets[host] = bucket
+        return bucket
+
+
+class RateLimitedSession(requests.Session):
+    """requests.Session that waits for the target host's token bucket before every request"""
+
+    def __init__(self, rate: float = VALIDATION_HOST_RATE, burst: int = VALIDATION_HOST_BURST,
+                 hosts: int = 10):
+        super().__init__()
+        self.verify = False
+        self.rate = rate
+        self.burst = burst
+        adapter = HTTPAdapter(pool_connections=max(10, hosts), pool_maxsize=CONNECTIONS_PER_HOST)
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+        # Strong references keep the shared buckets alive while this session uses them
+        self._buckets: Dict[str, TokenBucket] = {}
+        requests.packages.urllib3.disable_warnings()
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = (urlsplit(url).hostname or '').lower()
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = bucket_for_host(host, self.rate, self.burst)
+        return bucket
+
+    def send(self, request, **kwargs):
+        self.bucket(request.url).acquire()
+        return super().send(request, **kwargs)
+
+
+class ValidationScheduler:
+    def __init__(self, max_concurrent: int = 10, host_rate: float = VALIDATION_HOST_RATE,
+                 host_burst: int = VALIDATION_HOST_BURST):
+        self.max_concurrent = max(1, max_concurrent)
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+
+    def run(
+        self,
+        tasks: Iterable[Tuple[str, Optional[List[str]]]],
+        validate: Callable[[str, Optional[List[str]], requests.Session], Dict]
+    ) -> Iterator[Tuple[str, Dict]]:
+        """
+        Validate targets concurrently, yielding (target_url, result) as each finishes
+
+        Args:
+            tasks: (target_url, discovered_paths) pairs
+            validate: Called as validate(target_url, discovered_paths, session) on a worker thread
+
+        A validation that raises yields an error result so the others still complete.
+        """
+        tasks = list(tasks)
+        if not tasks:
+            return
+
+        started = time.time()
+        with RateLimitedSession(self.host_rate, self.host_burst, hosts=len(tasks)) as session:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrent, len(tasks))) as executor:
+                futures = {
+                    executor.submit(validate, target_url, paths, session): target_url
+                    for target_url, paths in tasks
+                }
+                for future in as_completed(futures):
+                    target_url = futures[future]
+                    try:
+                        yield target_url, future.result()
+                    except Exception as e:
+                        logger.error(f"Validation failed for {target_url}: {e}")
+                        yield target_url, {'error': str(e), 'target': target_url, 'validated': False}
+
+        logger.info(f"Validated {len(tasks)} targets in {time.time() - started:.1f}s "
+                    f"({min(self.max_concurrent, len(tasks))} at a time)")
@@ -0,0 +1,193 @@
+"""
+Incremental Vulnerability Scanning
+Decides how much of a nuclei run a previously scanned target still needs
+
+Each completed nuclei scan records the template index version it ran with
+and a fingerprint of the target: a hash of a probe response (status, stable
+headers, title and digit-stripped body), its open ports and its known
+technologies. When the fingerprint is unchanged on the next run only the
+templates added or modified since that version are executed, and the
+previous findings of every template that didn't re-run are carried over.
+A changed fingerprint, a missing baseline or an unknown old index version
+falls back to a full scan.
+"""
+
+import hashlib
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.packages.urllib3.exceptions import InsecureRequestWarning
+from sqlalchemy.orm import Session
+
+from src.config.database import SessionLocal
+from src.models.PortScan import PortScan
+from src.models.VulnScan import VulnScan
+from src.controllers.nuclei_templates import TemplateInfo, TemplateSelection, get_template_index
+
+requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
+
+logger = logging.getLogger(__name__)
+
+PROBE_HEADERS = ('server', 'x-powered-by', 'content-type', 'location', 'www-authenticate')
+PROBE_MAX_BYTES = 512 * 1024
+PROBE_CONCURRENCY = 20
+
+# Numbers and long random-looking tokens (CSRF tokens, nonces, timestamps) change on every request
+_VOLATILE = re.compile(rb'\d+|[A-Za-z0-9+/_=-]{24,}')
+_TITLE = re.compile(rb'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+
+
+def _hostname(target: str) -> str:
+    return (urlsplit(target if '://' in target else f"//{target}").hostname or '').lower()
+
+
+def probe_hash(session: requests.Session, target: str, timeout: int = 10) -> str:
+    """Hash of the parts of a target's response that change when the application changes"""
+    url = target if '://' in target else f"https://{target}"
+    try:
+        response = session.get(url, timeout=timeout, verify=False, allow_redirects=False, stream=True)
+        body = response.raw.read(PROBE_MAX_BYTES, decode_content=True) or b''
+        response.close()
+    except requests.RequestException as e:
+        logger.debug(f"Fingerprint probe failed for {target}: {e}")
+        return 'unreachable'
+
+    digest = hashlib.sha256(str(response.status_code).encode())
+    for header in PROBE_HEADERS:
+        digest.update(f"\n{header}:{response.headers.get(header, '')}".encode())
+    title = _TITLE.search(body)
+    digest.update(b'\n' + (title.group(1).strip() if title else b''))
+    digest.update(b'\n' + _VOLATILE.sub(b'', body))
+    return digest.hexdigest()
+
+
+def target_fingerprints(selections: Dict[str, TemplateSelection], workspace_id: Optional[str] = None,
+                        timeout: int = 10) -> Dict[str, str]:
+    """Fingerprint per target: probe response + open ports + technologies the selection was built from"""
+    targets = list(selections)
+    hosts = {target: _hostname(target) for target in targets}
+
+    ports: Dict[str, List[int]] = {}
+    db = SessionLocal()
+    try:
+        query = db.query(PortScan.target, PortScan.port).filter(
+            PortScan.target.in_(set(hosts.values())),
+            PortScan.state == 'open'
+        )
+        if workspace_id:
+            query = query.filter(PortScan.workspace_id == workspace_id)
+        for host, port in query.all():
+            ports.setdefault(host.lower(), []).append(port)
+    finally:
+        db.close()
+
+    with requests.Session() as session:
+        with ThreadPoolExecutor(max_workers=min(PROBE_CONCURRENCY, max(1, len(targets)))) as executor:
+            probes = dict(zip(targets, executor.map(lambda t: probe_hash(session, t, timeout), targets)))
+
+    fingerprints = {}
+    for target in targets:
+        digest = hashlib.sha256(probes[target].encode())
+        digest.update(','.join(str(p) for p in sorted(set(ports.get(hosts[target], [])))).encode())
+        digest.update(','.join(selections[target].technologies).encode())
+        fingerprints[target] = digest.hexdigest()
+    return fingerprints
+
+
+@dataclass
+class PreviousScan:
+    vuln_scan_id: int
+    template_version: str
+    fingerprint: str
+
+
+def previous_scans(db: Session, targets: List[str], scanner: str,
+                   workspace_id: Optional[str] = None) -> Dict[str, PreviousScan]:
+    """Latest clean (completed, no error) scan with a recorded baseline, per target"""
+    query = db.query(
+        VulnScan.target, VulnScan.id, VulnScan.template_version, VulnScan.target_fingerprint
+    ).filter(
+        VulnScan.target.in_(targets),
+        VulnScan.scanner == scanner,
+        VulnScan.status == 'completed',
+        VulnScan.error_message.is_(None),
+        VulnScan.template_version.isnot(None),
+        VulnScan.target_fingerprint.isnot(None)
+    )
+    query = query.filter(VulnScan.workspace_id == workspace_id) if workspace_id else query.filter(VulnScan.workspace_id.is_(None))
+    rows = query.order_by(VulnScan.target, VulnScan.completed_at.desc()).distinct(VulnScan.target).all()
+    return {target: PreviousScan(scan_id, version, fingerprint) for target, scan_id, version, fingerprint in rows}
+
+
+@dataclass
+class IncrementalPlan:
+    mode: str  # full, incremental, unchanged
+    fingerprint: str
+    template_version: str
+    templates: List[TemplateInfo] = field(default_factory=list)
+    previous: Optional[PreviousScan] = None
+    reason: str = ''
+
+    @property
+    def rerun_template_ids(self) -> List[str]:
+        return sorted({t.id for t in self.templates})
+
+    def to_dict(self) -> Dict:
+        return {
+            'mode': self.mode,
+            'reason': self.reason,
+            'fingerprint': self.fingerprint,
+            'template_version': self.template_version,
+            'previous_template_version': self.previous.template_version if self.previous else None,
+            'templates_run': len(self.templates),
+        }
+
+
+def plan_incremental(selections: Dict[str, TemplateSelection], scanner: str,
+                     workspace_id: Optional[str] = None) -> Dict[str, IncrementalPlan]:
+    """
+    Work left for each target given its last clean scan
+
+    Args:
+        selections: Template selection per target (from select_templates)
+        scanner: Scanner name the baselines were recorded for
+        workspace_id: Workspace of the previous scans
+
+    Returns:
+        IncrementalPlan per target; its templates are what nuclei still has to run
+    """
+    if not selections:
+        return {}
+
+    index = get_template_index()
+    fingerprints = target_fingerprints(selections, workspace_id)
+    db = SessionLocal()
+    try:
+        previous = previous_scans(db, list(selections), scanner, workspace_id)
+    finally:
+        db.close()
+
+    plans = {}
+    for target, selection in selections.items():
+        plan = IncrementalPlan(mode='full', fingerprint=fingerprints[target], template_version=index.version,
+                               templates=selection.templates, previous=previous.get(target))
+        if plan.previous is None:
+            plan.reason = 'no previous scan'
+        elif plan.previous.fingerprint != plan.fingerprint:
+            plan.reason = 'target changed'
+        else:
+            changed = index.changed_since(plan.previous.template_version)
+            if changed is None:
+                plan.reason = 'previous template index unavailable'
+            else:
+                plan.templates = [t for t in selection.templates if t.path in changed]
+                plan.mode = 'incremental' if plan.templates else 'unchanged'
+                plan.reason = f"{len(changed)} templates new or changed"
+        plans[target] = plan
+        logger.info(f"{target}: {plan.mode} scan ({plan.reason}), {len(plan.templates)}/{len(selection.templates)} templates")
+    return plans
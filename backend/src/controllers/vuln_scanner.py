@@ -14,22 +14,75 @@ Supported Scanners:
 
 import subprocess
 import json
+import math
 import uuid
 import logging
 import os
 import asyncio
 import random
+import tempfile
 from typing import List, Dict, Optional
+from urllib.parse import urlsplit
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
 from src.config.database import SessionLocal
-from src.models.Subdomain import Subdomain
+from src.models.VulnScan import VulnScan
+from src.controllers.tool_stream import ToolStream
+from src.controllers.vuln_store import SEVERITIES, VulnScanStore
+from src.controllers.nuclei_templates import TemplateSelection, select_templates
+from src.controllers.vuln_incremental import IncrementalPlan, plan_incremental
 
 logger = logging.getLogger(__name__)
 
+# Hosts nuclei scans in parallel in list mode (-bs); also scales the batch timeout
+NUCLEI_BULK_SIZE = 25
+
+
+def _target_keys(value: str) -> List[str]:
+    """Routing keys for a target or nuclei host/url field, most specific first"""
+    value = value.strip().rstrip('/')
+    parts = urlsplit(value if '://' in value else f"//{value}")
+    hostname = (parts.hostname or '').lower()
+    keys = [value.lower()]
+    if parts.port:
+        keys.append(f"{hostname}:{parts.port}")
+    elif parts.scheme:
+        keys.append(f"{hostname}:{443 if parts.scheme == 'https' else 80}")
+    keys.append(hostname)
+    return keys
+
+
+class TargetRouter:
+    """Maps nuclei findings from a list-mode run back to the input target they came from"""
+
+    def __init__(self, targets: List[str]):
+        self._index: Dict[str, str] = {}
+        for target in targets:
+            for key in _target_keys(target):
+                # The first target claiming a key wins, so exact inputs beat bare hostnames
+                self._index.setdefault(key, target)
+
+    def route(self, finding: Dict) -> Optional[str]:
+        candidates = [finding.get(field) for field in ('url', 'host', 'matched-at')]
+        candidates = [c for c in candidates if isinstance(c, str) and c]
+        # Exact input first, then host:port, then hostname, across all fields
+        for depth in range(3):
+            for candidate in candidates:
+                keys = _target_keys(candidate)
+                if depth < len(keys) and keys[depth] in self._index:
+                    return self._index[keys[depth]]
+        return None
+
+
+def _severity_counts(vulnerabilities: List[Dict]) -> Dict[str, int]:
+    counts = {'total_vulns': len(vulnerabilities)}
+    for severity in SEVERITIES:
+        counts[f"{severity}_count"] = len([v for v in vulnerabilities if v.get('severity') == severity])
+    return counts
+
 
 @dataclass 
 class VulnScanConfig:
@@ -44,6 +97,9 @@ class VulnScanConfig:
     verify_ssl: bool = False
     scan_type: str = 'quick'
     batch_id: Optional[str] = None
+    save_to_db: bool = True
+    smart_templates: bool = True  # pick templates per target from known technologies (ignored when templates is set)
+    incremental: bool = True  # only run new/changed templates on unchanged targets (needs smart_templates and save_to_db)
 
 
 class VulnerabilityScanner:
@@ -54,6 +110,8 @@ class VulnerabilityScanner:
         self.scan_id = str(uuid.uuid4())
         self.started_at = None
         self.completed_at = None
+        self.store: Optional[VulnScanStore] = None
+        self.plans: Dict[str, IncrementalPlan] = {}
         
     def check_tool_installed(self, tool_name: str) -> bool:
         """Check if a tool is installed"""
@@ -66,7 +124,40 @@ class VulnerabilityScanner:
     
     # ==================== NUCLEI SCANNER ====================
     
-    def run_nuclei(self) -> Dict:
+    def _nuclei_cmd(self, template_file: Optional[str] = None) -> List[str]:
+        """Options shared by single-target and list-mode nuclei runs"""
+        cmd = [
+            "nuclei",
+            "-c", str(self.config.concurrency),
+            "-rl", str(self.config.rate_limit),
+            "-timeout", str(self.config.timeout // 10),
+            "-jsonl",
+            "-silent"
+        ]
+        
+        if self.config.templates:
+            for template in self.config.templates:
+                cmd.extend(["-tags", template])
+        elif template_file:
+            cmd.extend(["-t", template_file])
+        return cmd
+    
+    def _parse_nuclei_finding(self, finding: Dict, target: str) -> Dict:
+        return {
+            'name': finding.get('template-id', 'Unknown'),
+            'type': finding.get('type', 'unknown'),
+            'severity': finding.get('info', {}).get('severity', 'info'),
+            'description': finding.get('info', {}).get('description', ''),
+            'url': finding.get('matched-at', target),
+            'evidence': finding.get('matcher-name', ''),
+            'template_id': finding.get('template-id'),
+            'cve_id': self._extract_cve(finding),
+            'reference_urls': finding.get('info', {}).get('reference', []),
+            'scanner': 'nuclei',
+            'found_at': datetime.utcnow().isoformat()
+        }
+    
+    def run_nuclei(self, template_file: Optional[str] = None) -> Dict:
         """Run Nuclei vulnerability scanner"""
         logger.info(f"Running Nuclei scan for: {self.config.target_url}")
         
@@ -76,20 +167,7 @@ class VulnerabilityScanner:
         try:
             output_file = f"/tmp/nuclei_{self.scan_id}.json"
             
-            cmd = [
-                "nuclei",
-                "-u", self.config.target_url,
-                "-c", str(self.config.concurrency),
-                "-rl", str(self.config.rate_limit),
-                "-timeout", str(self.config.timeout // 10),
-                "-jsonl",
-                "-o", output_file,
-                "-silent"
-            ]
-            
-            if self.config.templates:
-                for template in self.config.templates:
-                    cmd.extend(["-tags", template])
+            cmd = self._nuclei_cmd(template_file) + ["-u", self.config.target_url, "-o", output_file]
             
             result = subprocess.run(
                 cmd,
@@ -106,19 +184,9 @@ class VulnerabilityScanner:
                         if line.strip():
                             try:
                                 finding = json.loads(line)
-                                vulnerabilities.append({
-                                    'name': finding.get('template-id', 'Unknown'),
-                                    'type': finding.get('type', 'unknown'),
-                                    'severity': finding.get('info', {}).get('severity', 'info'),
-                                    'description': finding.get('info', {}).get('description', ''),
-                                    'url': finding.get('matched-at', self.config.target_url),
-                                    'evidence': finding.get('matcher-name', ''),
-                                    'template_id': finding.get('template-id'),
-                                    'cve_id': self._extract_cve(finding),
-                                    'reference_urls': finding.get('info', {}).get('reference', []),
-                                    'scanner': 'nuclei',
-                                    'found_at': datetime.utcnow().isoformat()
-                                })
+                                vulnerabilities.append(self._record_finding(
+                                    self.config.target_url, self._parse_nuclei_finding(finding, self.config.target_url)
+                                ))
                             except json.JSONDecodeError:
                                 continue
                 os.unlink(output_file)
@@ -137,6 +205,173 @@ class VulnerabilityScanner:
         
         return self._build_result(vulnerabilities, scanner_output)
     
+    def run_nuclei_batch(self, targets: List[str], template_file: Optional[str] = None) -> Dict[str, Dict]:
+        """
+        Scan many targets with one nuclei process (templates are parsed once)
+        
+        Targets go to nuclei through a -l list file; JSONL findings are read
+        from stdout as they are printed and routed back to their input target.
+        On timeout the process is killed and findings read so far are kept.
+        
+        Returns:
+            Result dict per target, in the same shape as run_nuclei()
+        """
+        targets = list(dict.fromkeys(t for t in targets if t))
+        logger.info(f"Running Nuclei batch scan for {len(targets)} targets")
+        
+        findings: Dict[str, List[Dict]] = {target: [] for target in targets}
+        router = TargetRouter(targets)
+        unrouted = 0
+        
+        fd, list_file = tempfile.mkstemp(prefix=f"nuclei_targets_{self.scan_id}_", suffix='.txt')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write('\n'.join(targets))
+            
+            # Hosts are scanned NUCLEI_BULK_SIZE at a time, so the budget grows with the batch
+            timeout = self.config.timeout * max(1, math.ceil(len(targets) / NUCLEI_BULK_SIZE))
+            cmd = self._nuclei_cmd(template_file) + ["-l", list_file, "-bs", str(NUCLEI_BULK_SIZE)]
+            stream = ToolStream(cmd, timeout=timeout)
+            
+            for line in stream:
+                try:
+                    finding = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                target = router.route(finding)
+                if target is None:
+                    unrouted += 1
+                    continue
+                findings[target].append(self._record_finding(target, self._parse_nuclei_finding(finding, target)))
+        except FileNotFoundError:
+            logger.warning("Nuclei not installed, using simulation")
+            return {target: self._simulate_scan('nuclei', target) for target in targets}
+        except Exception as e:
+            logger.error(f"Nuclei batch scan error: {e}")
+            return {target: self._error_result(str(e), target) for target in targets}
+        finally:
+            if os.path.exists(list_file):
+                os.unlink(list_file)
+        
+        if unrouted:
+            logger.warning(f"Nuclei batch: {unrouted} findings could not be matched to a target")
+        logger.info(f"Nuclei batch found {sum(len(v) for v in findings.values())} vulnerabilities "
+                    f"across {len(targets)} targets")
+        
+        results = {}
+        for target, vulnerabilities in findings.items():
+            result = self._build_result(vulnerabilities, target=target)
+            if stream.timed_out:
+                result['error'] = f"Batch timed out after {timeout}s, results are partial"
+            results[target] = result
+        return results
+    
+    def _select_templates(self, targets: List[str]) -> Dict[str, TemplateSelection]:
+        """Per-target template selection, or {} to run nuclei's default template set"""
+        if self.config.templates or not self.config.smart_templates:
+            return {}
+        try:
+            return select_templates(targets, self.config.workspace_id)
+        except Exception as e:
+            logger.warning(f"Template selection failed, running all templates: {e}")
+            return {}
+    
+    def _plan_incremental(self, selections: Dict[str, TemplateSelection]) -> Dict[str, TemplateSelection]:
+        """Narrow each selection to the templates its target still needs (see vuln_incremental)"""
+        if not (self.config.incremental and self.store and selections):
+            return selections
+        try:
+            self.plans = plan_incremental(selections, self.config.scanner, self.config.workspace_id)
+        except Exception as e:
+            logger.warning(f"Incremental planning failed, running full scans: {e}")
+            self.plans = {}
+            return selections
+        return {
+            target: replace(selection, templates=self.plans[target].templates) if target in self.plans else selection
+            for target, selection in selections.items()
+        }
+    
+    def run_nuclei_selected(self, targets: List[str]) -> Dict[str, Dict]:
+        """
+        Run nuclei with each target's selected templates
+        
+        Targets whose selections are identical share one list-mode run.
+        With incremental scanning, unchanged targets only run the templates
+        added or modified since their last scan.
+        """
+        selections = self._select_templates(targets)
+        to_run = self._plan_incremental(selections)
+        groups: Dict[str, List[str]] = {}
+        for target in targets:
+            selection = to_run.get(target)
+            groups.setdefault(selection.key if selection else '', []).append(target)
+        
+        results = {}
+        with tempfile.TemporaryDirectory(prefix=f"nuclei_templates_{self.scan_id}_") as workdir:
+            for key, group in groups.items():
+                selection = to_run.get(group[0])
+                if selection and not selection.templates:
+                    # An empty -t list would make nuclei fall back to every template
+                    group_results = {target: self._build_result([], target=target) for target in group}
+                elif len(group) == 1 and len(targets) == 1:
+                    template_file = selection.write(workdir) if selection else None
+                    group_results = {group[0]: self.run_nuclei(template_file)}
+                else:
+                    template_file = selection.write(workdir) if selection else None
+                    group_results = self.run_nuclei_batch(group, template_file)
+                
+                for target, result in group_results.items():
+                    if selections.get(target):
+                        result['templates'] = selections[target].to_dict()
+                    if target in self.plans:
+                        result['incremental'] = self.plans[target].to_dict()
+                    results[target] = result
+        return results
+    
+    def _record_finding(self, target: str, vulnerability: Dict) -> Dict:
+        """Hand a parsed finding to the store (batched insert) and return it"""
+        if self.store:
+            self.store.add(target, vulnerability)
+        return vulnerability
+    
+    def _open_store(self, targets: List[str]):
+        if not self.config.save_to_db:
+            return
+        store = VulnScanStore(
+            scanner=self.config.scanner,
+            scan_id=self.scan_id,
+            workspace_id=self.config.workspace_id,
+            batch_id=self.config.batch_id,
+            scan_type=self.config.scan_type,
+            scan_config={
+                'concurrency': self.config.concurrency,
+                'rate_limit': self.config.rate_limit,
+                'timeout': self.config.timeout,
+            },
+            templates=self.config.templates
+        )
+        try:
+            store.open_scans(targets, self.started_at)
+            self.store = store
+        except Exception as e:
+            logger.error(f"Could not open vulnerability scan records, results won't be saved: {e}")
+    
+    def _close_store(self, results: List[Dict]):
+        if not self.store:
+            return
+        self.store.flush()
+        for result in results:
+            target = result.get('target')
+            result['vuln_scan_id'] = self.store.scan_ids.get(target)
+            plan = self.plans.get(target)
+            if plan and plan.mode != 'full' and not result.get('error'):
+                # Findings of templates that didn't re-run are still valid for an unchanged target
+                reused = self.store.carry_forward(target, plan.previous.vuln_scan_id, plan.rerun_template_ids)
+                result['vulnerabilities'].extend(reused)
+                result['incremental']['reused_findings'] = len(reused)
+                result.update(_severity_counts(result['vulnerabilities']))
+        self.store.close({result.get('target'): result for result in results}, self.completed_at)
+    
     def _extract_cve(self, finding: Dict) -> Optional[str]:
         """Extract CVE ID from nuclei finding"""
         template_id = finding.get('template-id', '')
@@ -151,8 +386,9 @@ class VulnerabilityScanner:
     
     # ==================== SIMULATED SCANNERS ====================
     
-    def _simulate_scan(self, scanner: str) -> Dict:
+    def _simulate_scan(self, scanner: str, target: Optional[str] = None) -> Dict:
         """Simulate scanner results for demo/development"""
+        target = target or self.config.target_url
         vulnerabilities = []
         
         if random.random() > 0.6:
@@ -193,42 +429,39 @@ class VulnerabilityScanner:
                     'type': vuln_type,
                     'severity': severity,
                     'description': desc,
-                    'url': self.config.target_url,
+                    'url': target,
                     'scanner': scanner,
                     'found_at': datetime.utcnow().isoformat()
                 })
         
-        return self._build_result(vulnerabilities, f"Simulated {scanner} scan")
+        return self._build_result(vulnerabilities, f"Simulated {scanner} scan", target=target)
     
     # ==================== RESULT BUILDERS ====================
     
-    def _build_result(self, vulnerabilities: List[Dict], scanner_output: str = "") -> Dict:
+    def _build_result(self, vulnerabilities: List[Dict], scanner_output: str = "", target: Optional[str] = None) -> Dict:
         """Build standardized result dictionary"""
         return {
             'scanner': self.config.scanner,
-            'target': self.config.target_url,
+            'target': target or self.config.target_url,
             'workspace_id': self.config.workspace_id,
             'scan_id': self.scan_id,
+            'batch_id': self.config.batch_id,
             'vulnerabilities': vulnerabilities,
-            'total_vulns': len(vulnerabilities),
-            'critical_count': len([v for v in vulnerabilities if v.get('severity') == 'critical']),
-            'high_count': len([v for v in vulnerabilities if v.get('severity') == 'high']),
-            'medium_count': len([v for v in vulnerabilities if v.get('severity') == 'medium']),
-            'low_count': len([v for v in vulnerabilities if v.get('severity') == 'low']),
-            'info_count': len([v for v in vulnerabilities if v.get('severity') == 'info']),
+            **_severity_counts(vulnerabilities),
             'scan_duration': f"{random.uniform(0.5, 5.0):.2f}s",
             'scanner_output': scanner_output[:5000] if scanner_output else None,
             'status': 'completed',
             'error': None
         }
     
-    def _error_result(self, error_message: str) -> Dict:
+    def _error_result(self, error_message: str, target: Optional[str] = None) -> Dict:
         """Build error result"""
         return {
             'scanner': self.config.scanner,
-            'target': self.config.target_url,
+            'target': target or self.config.target_url,
             'workspace_id': self.config.workspace_id,
             'scan_id': self.scan_id,
+            'batch_id': self.config.batch_id,
             'vulnerabilities': [],
             'total_vulns': 0,
             'critical_count': 0,
@@ -249,7 +482,7 @@ class VulnerabilityScanner:
         self.started_at = datetime.utcnow()
         
         scanner_methods = {
-            'nuclei': self.run_nuclei,
+            'nuclei': lambda: self.run_nuclei_selected([self.config.target_url])[self.config.target_url],
             'nikto': lambda: self._simulate_scan('nikto'),
             'sslyze': lambda: self._simulate_scan('sslyze'),
             'sqlmap': lambda: self._simulate_scan('sqlmap'),
@@ -261,11 +494,13 @@ class VulnerabilityScanner:
         if not scanner_method:
             return self._error_result(f"Unknown scanner: {self.config.scanner}")
         
+        self._open_store([self.config.target_url])
         result = scanner_method()
         
         self.completed_at = datetime.utcnow()
         result['started_at'] = self.started_at.isoformat()
         result['completed_at'] = self.completed_at.isoformat()
+        self._close_store([result])
         
         # Touch workspace to update timestamp
         if self.config.workspace_id:
@@ -273,11 +508,33 @@ class VulnerabilityScanner:
         
         return result
     
+    def run_batch_scan(self, targets: List[str]) -> List[Dict]:
+        """Run the configured scanner over many targets (nuclei in a single process)"""
+        if self.config.scanner != 'nuclei':
+            return [VulnerabilityScanner(replace(self.config, target_url=target)).run_scan() for target in targets]
+        
+        self.started_at = datetime.utcnow()
+        self._open_store(targets)
+        results = list(self.run_nuclei_selected(list(dict.fromkeys(t for t in targets if t))).values())
+        self.completed_at = datetime.utcnow()
+        
+        duration = f"{(self.completed_at - self.started_at).total_seconds():.2f}s"
+        for result in results:
+            result['started_at'] = self.started_at.isoformat()
+            result['completed_at'] = self.completed_at.isoformat()
+            result['scan_duration'] = duration
+        self._close_store(results)
+        
+        if self.config.workspace_id:
+            self._touch_workspace()
+        
+        return results
+    
     def _touch_workspace(self):
         """Update workspace timestamp"""
         db = SessionLocal()
         try:
-            from src.models.workspace import Workspace
+            from src.models.Workspace import Workspace
             workspace = db.query(Workspace).filter(Workspace.id == self.config.workspace_id).first()
             if workspace:
                 workspace.updated_at = datetime.utcnow()
@@ -300,7 +557,9 @@ def run_vulnerability_scan(
     rate_limit: int = 150,
     scan_type: str = 'quick',
     save_to_db: bool = True,
-    batch_id: str = None
+    batch_id: str = None,
+    smart_templates: bool = True,
+    incremental: bool = True
 ) -> Dict:
     """
     Run a vulnerability scan and optionally save to database
@@ -314,7 +573,10 @@ def run_vulnerability_scan(
         timeout=timeout,
         rate_limit=rate_limit,
         scan_type=scan_type,
-        batch_id=batch_id
+        batch_id=batch_id,
+        save_to_db=save_to_db,
+        smart_templates=smart_templates,
+        incremental=incremental
     )
     
     scanner_instance = VulnerabilityScanner(config)
@@ -323,44 +585,114 @@ def run_vulnerability_scan(
     return result
 
 
+def run_batch_vulnerability_scan(
+    targets: List[str],
+    workspace_id: Optional[str] = None,
+    scanners: List[str] = None,
+    templates: List[str] = None,
+    concurrency: int = 10,
+    timeout: int = 300,
+    rate_limit: int = 150,
+    scan_type: str = 'quick',
+    save_to_db: bool = True,
+    batch_id: Optional[str] = None,
+    smart_templates: bool = True,
+    incremental: bool = True
+) -> List[Dict]:
+    """
+    Scan many targets under one batch_id
+
+    Nuclei runs once over all targets; other scanners still run per target.
+    """
+    batch_id = batch_id or str(uuid.uuid4())
+    results = []
+
+    for scanner in scanners or ['nuclei']:
+        config = VulnScanConfig(
+            target_url=targets[0] if targets else '',
+            workspace_id=workspace_id,
+            scanner=scanner,
+            templates=templates,
+            concurrency=concurrency,
+            timeout=timeout,
+            rate_limit=rate_limit,
+            scan_type=scan_type,
+            batch_id=batch_id,
+            save_to_db=save_to_db,
+            smart_templates=smart_templates,
+            incremental=incremental
+        )
+        try:
+            results.extend(VulnerabilityScanner(config).run_batch_scan(targets))
+        except Exception as e:
+            logger.error(f"Batch scan failed with {scanner}: {e}")
+            results.extend({
+                'target': target,
+                'scanner': scanner,
+                'batch_id': batch_id,
+                'status': 'failed',
+                'error': str(e)
+            } for target in targets)
+
+    return results
+
+
+def _latest_scan_totals(db: Session, workspace_id: Optional[str] = None) -> List:
+    """
+    Severity counters per target, summed over each scanner's latest completed scan
+
+    Reads the counters kept on VulnScan, so no findings or subdomains are loaded.
+    """
+    query = db.query(
+        VulnScan.target, VulnScan.total_vulns,
+        *[getattr(VulnScan, f"{severity}_count") for severity in SEVERITIES]
+    ).filter(VulnScan.status == 'completed')
+    if workspace_id:
+        query = query.filter(VulnScan.workspace_id == workspace_id)
+    latest = query.order_by(
+        VulnScan.target, VulnScan.scanner, VulnScan.completed_at.desc()
+    ).distinct(VulnScan.target, VulnScan.scanner).subquery()
+
+    return db.query(
+        latest.c.target,
+        *[func.coalesce(func.sum(getattr(latest.c, f"{severity}_count")), 0).label(severity) for severity in SEVERITIES],
+        func.coalesce(func.sum(latest.c.total_vulns), 0).label('total')
+    ).group_by(latest.c.target).all()
+
+
 def get_vuln_stats_by_workspace(workspace_id: str, db: Session) -> Dict:
     """Get vulnerability statistics for a workspace"""
-    # Get all subdomains in workspace
-    subdomains = db.query(Subdomain).filter(
-        Subdomain.workspace_id == workspace_id
-    ).all()
+    targets = _latest_scan_totals(db, workspace_id)
     
-    total_high_risk = len([s for s in subdomains if (s.risk_score or 0) >= 70])
-    total_medium_risk = len([s for s in subdomains if 30 <= (s.risk_score or 0) < 70])
-    total_low_risk = len([s for s in subdomains if (s.risk_score or 0) < 30])
+    total_high_risk = len([t for t in targets if t.critical + t.high > 0])
+    total_medium_risk = len([t for t in targets if t.critical + t.high == 0 and t.medium > 0])
+    total_low_risk = len(targets) - total_high_risk - total_medium_risk
     
     return {
         'workspace_id': workspace_id,
-        'total_targets': len(subdomains),
+        'total_targets': len(targets),
         'high_risk': total_high_risk,
         'medium_risk': total_medium_risk,
-        'low_risk': total_low_risk
+        'low_risk': total_low_risk,
+        'total_vulns': sum(t.total for t in targets),
+        'severity_counts': {severity: sum(getattr(t, severity) for t in targets) for severity in SEVERITIES}
     }
 
 
 def get_vuln_summary(db: Session, workspace_id: Optional[str] = None) -> Dict:
     """Get overall vulnerability summary"""
-    query = db.query(Subdomain)
-    if workspace_id:
-        query = query.filter(Subdomain.workspace_id == workspace_id)
+    targets = _latest_scan_totals(db, workspace_id)
     
-    subdomains = query.all()
-    
-    risk_distribution = {
-        'critical': len([s for s in subdomains if (s.risk_score or 0) >= 90]),
-        'high': len([s for s in subdomains if 70 <= (s.risk_score or 0) < 90]),
-        'medium': len([s for s in subdomains if 40 <= (s.risk_score or 0) < 70]),
-        'low': len([s for s in subdomains if 1 <= (s.risk_score or 0) < 40]),
-        'info': len([s for s in subdomains if (s.risk_score or 0) == 0])
-    }
+    # Each target counts once, under its worst severity
+    risk_distribution = {severity: 0 for severity in SEVERITIES}
+    for t in targets:
+        worst = next((severity for severity in SEVERITIES if getattr(t, severity) > 0), 'info')
+        risk_distribution[worst] += 1
     
     return {
         'workspace_id': workspace_id,
-        'total_targets': len(subdomains),
-        'risk_distribution': risk_distribution
-    }
\ No newline at end of file
+        'total_targets': len(targets),
+        'total_vulns': sum(t.total for t in targets),
+        'risk_distribution': risk_distribution,
+        'severity_counts': {severity: sum(getattr(t, severity) for t in targets) for severity in SEVERITIES}
+    }
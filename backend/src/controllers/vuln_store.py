@@ -0,0 +1,302 @@
+"""
+Vulnerability Store
+Persists vulnerability scans and findings as they stream out of a scanner
+
+One VulnScan row is opened per target before the scanner starts. Findings
+are buffered and written with multi-row INSERT ... ON CONFLICT on
+(workspace_id, finding_hash), so a finding reported again by a later scan
+updates the existing row instead of duplicating it. Severity counters on
+VulnScan are incremented with every flush, so summaries read them directly
+instead of recounting findings. The hash doesn't include the target, so
+when two targets of one run report the same match (a shared IP, a
+redirect), the row ends up with the last one and only that scan counts it.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from sqlalchemy import or_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.sql import func
+
+from src.config.database import SessionLocal
+from src.models.ContentDiscovery import url_hash
+from src.models.Subdomain import Subdomain
+from src.models.VulnScan import VulnScan, VulnFinding, finding_key
+
+logger = logging.getLogger(__name__)
+
+FLUSH_SIZE = 500
+
+SEVERITIES = ('critical', 'high', 'medium', 'low', 'info')
+
+
+def _hostname(target: str) -> str:
+    return (urlsplit(target if '://' in target else f"//{target}").hostname or '').lower()
+
+
+def _parse_found_at(value: Optional[str]) -> datetime:
+    try:
+        return datetime.fromisoformat(value) if value else datetime.utcnow()
+    except ValueError:
+        return datetime.utcnow()
+
+
+class VulnScanStore:
+    def __init__(self, scanner: str, scan_id: str, workspace_id: Optional[str] = None,
+                 batch_id: Optional[str] = None, scan_type: Optional[str] = None,
+                 scan_config: Optional[Dict] = None, templates: Optional[List[str]] = None):
+        self.scanner = scanner
+        self.scan_id = scan_id
+        self.workspace_id = workspace_id
+        self.batch_id = batch_id
+        self.scan_type = scan_type
+        self.scan_config = scan_config
+        self.templates = templates
+        self.scan_ids: Dict[str, int] = {}
+        self.subdomain_ids: Dict[str, Optional[int]] = {}
+        self._buffer: Dict[int, Dict] = {}
+        self._seen = set()
+        self._pending_counts: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._flush_errors: Dict[int, str] = {}  # vuln_scan_id -> why some of its findings weren't saved
+        self.saved = 0
+
+    def open_scans(self, targets: Iterable[str], started_at: datetime) -> Dict[str, int]:
+        """Create a running VulnScan row per target, linked to its subdomain when known"""
+        targets = list(dict.fromkeys(targets))
+        db = SessionLocal()
+        try:
+            hostnames = {target: _hostname(target) for target in targets}
+            subdomains = {}
+            if self.workspace_id:
+                rows = db.query(Subdomain.id, Subdomain.full_domain).filter(
+                    Subdomain.workspace_id == self.workspace_id,
+                    Subdomain.full_domain.in_(set(hostnames.values()))
+                ).all()
+                subdomains = {full_domain.lower(): subdomain_id for subdomain_id, full_domain in rows}
+
+            scans = []
+            for target in targets:
+                self.subdomain_ids[target] = subdomains.get(hostnames[target])
+                scans.append(VulnScan(
+                    workspace_id=self.workspace_id,
+                    subdomain_id=self.subdomain_ids[target],
+                    target=target[:512],
+                    scanner=self.scanner,
+                    scan_type=self.scan_type,
+                    templates_used=self.templates,
+                    scan_config=self.scan_config,
+                    status='running',
+                    scan_id=self.scan_id,
+                    batch_id=self.batch_id,
+                    started_at=started_at
+                ))
+            db.add_all(scans)
+            db.commit()
+            self.scan_ids = {target: scan.id for target, scan in zip(targets, scans)}
+        finally:
+            db.close()
+        return self.scan_ids
+
+    def add(self, target: str, vulnerability: Dict):
+        """Buffer one finding for a target opened with open_scans()"""
+        vuln_scan_id = self.scan_ids.get(target)
+        if vuln_scan_id is None:
+            return
+
+        name = vulnerability.get('name') or 'Unknown'
+        matched_at = vulnerability.get('url') or target
+        finding_hash = url_hash(finding_key(vulnerability.get('template_id') or name, matched_at))
+        # A scanner can report the same match twice; count it once per scan
+        if (vuln_scan_id, finding_hash) in self._seen:
+            return
+        self._seen.add((vuln_scan_id, finding_hash))
+
+        severity = (vulnerability.get('severity') or 'info').lower()
+        if severity not in SEVERITIES:
+            severity = 'info'
+        self._pending_counts[vuln_scan_id][severity] += 1
+        # Another target already reported this match: the row moves to this scan, and so does the count
+        previous = self._buffer.get(finding_hash)
+        if previous is not None:
+            self._pending_counts[previous['vuln_scan_id']][previous['severity']] -= 1
+
+        evidence = vulnerability.get('evidence')
+        self._buffer[finding_hash] = {
+            'vuln_scan_id': vuln_scan_id,
+            'workspace_id': self.workspace_id,
+            'subdomain_id': self.subdomain_ids.get(target),
+            'name': name[:255],
+            'vuln_type': (vulnerability.get('type') or 'unknown')[:100],
+            'severity': severity,
+            'target_url': target,
+            'matched_at': matched_at,
+            'finding_hash': finding_hash,
+            'description': vulnerability.get('description'),
+            'evidence': evidence,
+            'matcher_name': evidence[:255] if evidence else None,
+            'scanner': vulnerability.get('scanner') or self.scanner,
+            'template_id': vulnerability.get('template_id'),
+            'cve_id': vulnerability.get('cve_id'),
+            'reference_urls': vulnerability.get('reference_urls'),
+            'found_at': _parse_found_at(vulnerability.get('found_at')),
+        }
+        if len(self._buffer) >= FLUSH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Write buffered findings and add their severities to the scan counters"""
+        if not self._buffer and not self._pending_counts:
+            return
+
+        rows = list(self._buffer.values())
+        counts = self._pending_counts
+        self._buffer = {}
+        self._pending_counts = defaultdict(lambda: defaultdict(int))
+
+        db = SessionLocal()
+        try:
+            if rows:
+                self._uncount_moved(db, rows, counts)
+                stmt = pg_insert(VulnFinding).values(rows)
+                # Re-found findings move to the latest scan; found_at and triage status are kept
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['workspace_id', 'finding_hash'],
+                    set_={
+                        'vuln_scan_id': stmt.excluded.vuln_scan_id,
+                        'severity': stmt.excluded.severity,
+                        'description': stmt.excluded.description,
+                        'evidence': stmt.excluded.evidence,
+                        'updated_at': func.now(),
+                    }
+                )
+                db.execute(stmt)
+
+            for vuln_scan_id, severities in counts.items():
+                values = {
+                    f"{severity}_count": getattr(VulnScan, f"{severity}_count") + count
+                    for severity, count in severities.items()
+                }
+                values['total_vulns'] = VulnScan.total_vulns + sum(severities.values())
+                db.execute(update(VulnScan).where(VulnScan.id == vuln_scan_id).values(**values))
+
+            db.commit()
+            self.saved += len(rows)
+        except Exception as e:
+            logger.error(f"Failed to save vulnerability findings: {e}")
+            db.rollback()
+            for vuln_scan_id in {row['vuln_scan_id'] for row in rows} | set(counts):
+                self._flush_errors.setdefault(vuln_scan_id, f"Failed to save findings: {e}")
+        finally:
+            db.close()
+
+    def _uncount_moved(self, db, rows: List[Dict], counts: Dict[int, Dict[str, int]]):
+        """Take back the counts of rows an earlier flush stored under another scan of this run"""
+        new_scan_ids = {row['finding_hash']: row['vuln_scan_id'] for row in rows}
+        query = db.query(VulnFinding.finding_hash, VulnFinding.vuln_scan_id, VulnFinding.severity).filter(
+            VulnFinding.finding_hash.in_(list(new_scan_ids)),
+            VulnFinding.vuln_scan_id.in_(list(self.scan_ids.values()))
+        )
+        if self.workspace_id:
+            query = query.filter(VulnFinding.workspace_id == self.workspace_id)
+        else:
+            query = query.filter(VulnFinding.workspace_id.is_(None))
+        for finding_hash, vuln_scan_id, severity in query.all():
+            if vuln_scan_id != new_scan_ids[finding_hash]:
+                counts[vuln_scan_id][severity if severity in SEVERITIES else 'info'] -= 1
+
+    def carry_forward(self, target: str, previous_scan_id: int, rerun_template_ids: Iterable[str]) -> List[Dict]:
+        """
+        Move a previous scan's findings to this scan, except those of templates that re-ran
+
+        Call after flush() so findings re-reported by this run already belong to it.
+
+        Returns:
+            The carried findings, shaped like parsed scanner findings
+        """
+        vuln_scan_id = self.scan_ids.get(target)
+        if vuln_scan_id is None:
+            return []
+
+        rerun_template_ids = list(rerun_template_ids)
+        db = SessionLocal()
+        try:
+            stmt = update(VulnFinding).where(VulnFinding.vuln_scan_id == previous_scan_id)
+            if rerun_template_ids:
+                stmt = stmt.where(or_(VulnFinding.template_id.is_(None),
+                                      VulnFinding.template_id.notin_(rerun_template_ids)))
+            stmt = stmt.values(vuln_scan_id=vuln_scan_id, updated_at=func.now()).returning(
+                VulnFinding.name, VulnFinding.vuln_type, VulnFinding.severity, VulnFinding.description,
+                VulnFinding.matched_at, VulnFinding.evidence, VulnFinding.template_id, VulnFinding.cve_id,
+                VulnFinding.reference_urls, VulnFinding.scanner, VulnFinding.found_at
+            )
+            rows = db.execute(stmt).all()
+
+            counts: Dict[str, int] = defaultdict(int)
+            for row in rows:
+                counts[row.severity if row.severity in SEVERITIES else 'info'] += 1
+            if rows:
+                values = {
+                    f"{severity}_count": getattr(VulnScan, f"{severity}_count") + count
+                    for severity, count in counts.items()
+                }
+                values['total_vulns'] = VulnScan.total_vulns + len(rows)
+                db.execute(update(VulnScan).where(VulnScan.id == vuln_scan_id).values(**values))
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to carry findings forward from scan {previous_scan_id}: {e}")
+            db.rollback()
+            return []
+        finally:
+            db.close()
+
+        return [{
+            'name': row.name,
+            'type': row.vuln_type,
+            'severity': row.severity,
+            'description': row.description,
+            'url': row.matched_at,
+            'evidence': row.evidence,
+            'template_id': row.template_id,
+            'cve_id': row.cve_id,
+            'reference_urls': row.reference_urls,
+            'scanner': row.scanner,
+            'found_at': row.found_at.isoformat() if row.found_at else None,
+            'reused': True,
+        } for row in rows]
+
+    def close(self, results: Dict[str, Dict], completed_at: datetime):
+        """Flush remaining findings and record each target's final status"""
+        self.flush()
+
+        db = SessionLocal()
+        try:
+            for target, result in results.items():
+                vuln_scan_id = self.scan_ids.get(target)
+                if vuln_scan_id is None:
+                    continue
+                values = {
+                    'status': result.get('status', 'completed'),
+                    # A scan whose findings couldn't all be saved isn't a clean baseline
+                    'error_message': result.get('error') or self._flush_errors.get(vuln_scan_id),
+                    'scanner_output': result.get('scanner_output'),
+                    'scan_duration': result.get('scan_duration'),
+                    'completed_at': completed_at,
+                }
+                if result.get('templates'):
+                    values['templates_used'] = result['templates']
+                if result.get('incremental'):
+                    values['template_version'] = result['incremental']['template_version']
+                    values['target_fingerprint'] = result['incremental']['fingerprint']
+                db.execute(update(VulnScan).where(VulnScan.id == vuln_scan_id).values(**values))
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to finalize vulnerability scans: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+        logger.info(f"Saved {self.saved} findings across {len(self.scan_ids)} {self.scanner} scans")
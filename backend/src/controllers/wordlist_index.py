@@ -0,0 +1,241 @@
+"""
+Wordlist Index
+Memory-mapped, deduplicated line index over large wordlists, split into shards
+
+The index stores the byte offset of every unique word, so any word or range
+can be read from the mmap without loading the file. Optional extensions are
+expanded virtually (word, word.php, word.bak, ...). Shards are contiguous
+ranges that separate fuzzing workers, or nodes sharing the checkpoint
+directory, claim through ShardCheckpoint. A shard is marked done only after
+its results are saved, so an interrupted job resumes where it stopped.
+"""
+
+import array
+import hashlib
+import json
+import logging
+import mmap
+import os
+import tempfile
+import time
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Wordlists a caller may name; anything outside is refused
+WORDLIST_DIR = os.getenv('WORDLIST_DIR', '/opt/wordlists')
+INDEX_DIR = os.getenv('WORDLIST_INDEX_DIR', os.path.join(tempfile.gettempdir(), 'wordlist_index'))
+CHECKPOINT_DIR = os.getenv('WORDLIST_CHECKPOINT_DIR', os.path.join(tempfile.gettempdir(), 'wordlist_checkpoints'))
+
+# A claim older than this is assumed to belong to a dead worker
+CLAIM_TTL = int(os.getenv('WORDLIST_CLAIM_TTL', '3600'))
+
+
+def resolve_wordlist(path: str) -> str:
+    """
+    Absolute path of a caller-supplied wordlist, which must lie in WORDLIST_DIR
+
+    A bare name is looked up in WORDLIST_DIR. Symlinks placed there (e.g. into
+    SecLists) are allowed; '..' and paths elsewhere raise ValueError.
+    """
+    root = os.path.abspath(WORDLIST_DIR)
+    candidate = os.path.abspath(os.path.join(root, path))
+    if os.path.commonpath([root, candidate]) != root:
+        raise ValueError(f"Wordlist must be inside {root}")
+    return candidate
+
+
+class WordlistIndex:
+    def __init__(self, path: str, extensions: Optional[Sequence[str]] = None):
+        self.path = path
+        self.extensions = [ext.lstrip('.') for ext in (extensions or []) if ext]
+        self._file = open(path, 'rb')
+        stat = os.fstat(self._file.fileno())
+        size = stat.st_size
+        # Identifies this version of the file (path, size and mtime, not a hash of its contents)
+        # for index caching and shard checkpoints
+        self.fingerprint = hashlib.sha1(f"{os.path.abspath(path)}:{size}:{stat.st_mtime_ns}".encode()).hexdigest()
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.offsets = self._load_or_build(size)
+
+    def _load_or_build(self, size: int) -> array.array:
+        offsets = array.array('Q')
+        if self._mmap is None:
+            return offsets
+
+        cache_path = os.path.join(INDEX_DIR, f"{self.fingerprint}.idx")
+        if os.path.exists(cache_path):
+            with open(cache_path, 'rb') as f:
+                offsets.frombytes(f.read())
+            return offsets
+
+        started = time.time()
+        seen = set()
+        position = 0
+        total = 0
+        while position < size:
+            end = self._mmap.find(b'\n', position)
+            if end == -1:
+                end = size
+            word = self._mmap[position:end].strip()
+            if word and not word.startswith(b'#'):
+                total += 1
+                digest = hashlib.blake2b(word, digest_size=8).digest()
+                if digest not in seen:
+                    seen.add(digest)
+                    offsets.append(position)
+            position = end + 1
+
+        os.makedirs(INDEX_DIR, exist_ok=True)
+        # Unique per writer: batch hosts are threads of one process and may index the same file at once
+        fd, tmp_path = tempfile.mkstemp(dir=INDEX_DIR, prefix=f"{self.fingerprint}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                offsets.tofile(f)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        logger.info(f"Indexed {self.path}: {len(offsets)} unique of {total} words in {time.time() - started:.1f}s")
+        return offsets
+
+    @property
+    def unique_words(self) -> int:
+        return len(self.offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) * (1 + len(self.extensions))
+
+    def _base_word(self, index: int) -> str:
+        start = self.offsets[index]
+        end = self._mmap.find(b'\n', start)
+        if end == -1:
+            end = len(self._mmap)
+        return self._mmap[start:end].strip().decode('utf-8', errors='replace')
+
+    def word(self, index: int) -> str:
+        """Word at a virtual index (extensions expanded after each base word)"""
+        variants = 1 + len(self.extensions)
+        base, variant = divmod(index, variants)
+        word = self._base_word(base)
+        return word if variant == 0 else f"{word}.{self.extensions[variant - 1]}"
+
+    def words(self, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        stop = len(self) if stop is None else min(stop, len(self))
+        for index in range(start, stop):
+            yield self.word(index)
+
+    def shard_range(self, shard: int, total_shards: int) -> Tuple[int, int]:
+        """[start, stop) of virtual indices for a shard"""
+        size = len(self)
+        per_shard = -(-size // total_shards)
+        start = min(shard * per_shard, size)
+        return start, min(start + per_shard, size)
+
+    def write_shard(self, shard: int, total_shards: int, output_path: str) -> int:
+        """Write a shard as a plain wordlist for ffuf/feroxbuster. Returns words written."""
+        start, stop = self.shard_range(shard, total_shards)
+        with open(output_path, 'w') as f:
+            for word in self.words(start, stop):
+                f.write(word)
+                f.write('\n')
+        return stop - start
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> 'WordlistIndex':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class ShardCheckpoint:
+    """
+    Claim/done markers for the shards of one fuzzing job
+
+    Markers are files created with O_EXCL, so workers on several nodes can
+    share CHECKPOINT_DIR (e.g. an NFS mount) without a coordinator.
+    """
+
+    def __init__(self, job_key: str, total_shards: int):
+        self.total_shards = total_shards
+        digest = hashlib.sha1(job_key.encode()).hexdigest()[:16]
+        self.directory = os.path.join(CHECKPOINT_DIR, f"{digest}_{total_shards}")
+        os.makedirs(self.directory, exist_ok=True)
+        meta_path = os.path.join(self.directory, 'job.json')
+        if not os.path.exists(meta_path):
+            with open(meta_path, 'w') as f:
+                json.dump({'job_key': job_key, 'total_shards': total_shards, 'created_at': time.time()}, f)
+
+    def _marker(self, shard: int, kind: str) -> str:
+        return os.path.join(self.directory, f"shard_{shard}.{kind}")
+
+    def is_done(self, shard: int) -> bool:
+        return os.path.exists(self._marker(shard, 'done'))
+
+    def done_shards(self) -> List[int]:
+        return [shard for shard in range(self.total_shards) if self.is_done(shard)]
+
+    def claim(self, shard: int) -> bool:
+        """Atomically claim a shard; stale claims from dead workers can be taken over"""
+        if self.is_done(shard):
+            return False
+
+        claim_path = self._marker(shard, 'claim')
+        try:
+            fd = os.open(claim_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.write(fd, f"{os.getpid()}@{os.uname().nodename}".encode())
+            os.close(fd)
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(claim_path) > CLAIM_TTL:
+                    os.unlink(claim_path)
+                    return self.claim(shard)
+            except OSError:
+                pass
+            return False
+
+    def claim_next(self) -> Optional[int]:
+        for shard in range(self.total_shards):
+            if self.claim(shard):
+                return shard
+        return None
+
+    def release(self, shard: int):
+        """Give a claimed shard back (e.g. the worker failed)"""
+        try:
+            os.unlink(self._marker(shard, 'claim'))
+        except OSError:
+            pass
+
+    def mark_done(self, shard: int):
+        with open(self._marker(shard, 'done'), 'w') as f:
+            f.write(str(time.time()))
+        self.release(shard)
+
+    @property
+    def complete(self) -> bool:
+        return len(self.done_shards()) == self.total_shards
+
+    def clear(self):
+        """Remove all markers once the job has finished"""
+        for name in os.listdir(self.directory):
+            try:
+                os.unlink(os.path.join(self.directory, name))
+            except OSError:
+                pass
+        try:
+            os.rmdir(self.directory)
+        except OSError:
+            pass
+
+    def to_dict(self) -> dict:
+        return {'total_shards': self.total_shards, 'done': len(self.done_shards())}
@@ -0,0 +1,217 @@
+"""
+ZAP Client
+Async OWASP ZAP API client shared by every content discovery scan
+
+All ZAP traffic goes through one event loop running in a background thread
+and one pooled httpx client per ZAP daemon, so scans from any worker thread
+reuse connections. Spider scans are tracked by ZAP scan id and several run
+concurrently. Status polling backs off exponentially instead of sleeping a
+fixed 5s, and Ajax spider results are read page by page.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+POLL_INITIAL_INTERVAL = 1.0
+POLL_MAX_INTERVAL = 15.0
+POLL_BACKOFF = 1.5
+
+AJAX_PAGE_SIZE = 500
+
+
+class ZapError(Exception):
+    """ZAP API call failed or ZAP is unreachable"""
+
+
+class ZapClient:
+    def __init__(self, base_url: str, api_key: str, max_connections: int = 10, request_timeout: int = 30):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self.request_timeout = request_timeout
+        self._http: Optional[httpx.AsyncClient] = None
+        # The Ajax spider is a singleton inside ZAP - one run at a time per daemon
+        self._ajax_lock: Optional[asyncio.Lock] = None
+        self.active_scans: Dict[str, Dict] = {}
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=self.request_timeout,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections)
+            )
+        return self._http
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def call(self, component: str, kind: str, name: str, **params) -> Dict:
+        """GET /JSON/{component}/{kind}/{name}/ and return the decoded body"""
+        url = f"{self.base_url}/JSON/{component}/{kind}/{name}/"
+        params = {'apikey': self.api_key, **{k: str(v) for k, v in params.items() if v is not None}}
+
+        try:
+            response = await self._client().get(url, params=params)
+        except httpx.ConnectError as e:
+            raise ZapError(f"ZAP is not running or not accessible at {self.base_url}") from e
+        except httpx.HTTPError as e:
+            raise ZapError(f"ZAP request {component}/{kind}/{name} failed: {e}") from e
+
+        if response.status_code != 200:
+            raise ZapError(f"ZAP {component}/{kind}/{name} returned {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    async def _poll(self, is_done: Callable, deadline: float) -> bool:
+        """Await is_done() with exponential backoff until it returns True or the deadline passes"""
+        interval = POLL_INITIAL_INTERVAL
+        while True:
+            if await is_done():
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(interval, remaining))
+            interval = min(interval * POLL_BACKOFF, POLL_MAX_INTERVAL)
+
+    # ==================== TRADITIONAL SPIDER ====================
+
+    async def start_spider(self, target: str, max_children: int = 100) -> str:
+        data = await self.call('spider', 'action', 'scan', url=target, maxChildren=max_children,
+                               recurse='true', subtreeOnly='true')
+        scan_id = str(data.get('scan'))
+        self.active_scans[scan_id] = {
+            'scan_id': scan_id, 'type': 'spider', 'target': target,
+            'progress': 0, 'started_at': datetime.utcnow().isoformat()
+        }
+        logger.info(f"ZAP Spider started for {target} with scan ID: {scan_id}")
+        return scan_id
+
+    async def spider_progress(self, scan_id: str) -> int:
+        data = await self.call('spider', 'view', 'status', scanId=scan_id)
+        progress = int(data.get('status', '0'))
+        if scan_id in self.active_scans:
+            self.active_scans[scan_id]['progress'] = progress
+        return progress
+
+    async def spider(self, target: str, timeout: int, max_children: int = 100) -> List[str]:
+        """Run a spider scan to completion (or timeout, keeping partial results)"""
+        scan_id = await self.start_spider(target, max_children)
+        try:
+            async def done() -> bool:
+                return await self.spider_progress(scan_id) >= 100
+
+            if not await self._poll(done, time.monotonic() + timeout):
+                logger.warning(f"ZAP Spider {scan_id} timed out for {target}, stopping and keeping partial results")
+                await self.call('spider', 'action', 'stop', scanId=scan_id)
+
+            data = await self.call('spider', 'view', 'results', scanId=scan_id)
+            return [url for url in data.get('results', []) if url]
+        finally:
+            self.active_scans.pop(scan_id, None)
+            try:
+                await self.call('spider', 'action', 'removeScan', scanId=scan_id)
+            except ZapError as e:
+                logger.debug(f"Could not remove ZAP scan {scan_id}: {e}")
+
+    # ==================== AJAX SPIDER ====================
+
+    async def ajax_results(self, page_size: int = AJAX_PAGE_SIZE) -> AsyncIterator[Dict]:
+        """Stream Ajax spider results page by page"""
+        start = 0
+        while True:
+            data = await self.call('ajaxSpider', 'view', 'results', start=start, count=page_size)
+            page = data.get('results', [])
+            for item in page:
+                yield item
+            if len(page) < page_size:
+                return
+            start += page_size
+
+    async def ajax_spider(self, target: str, timeout: int) -> List[str]:
+        """Run the Ajax spider for a target (serialized per daemon) and return request URLs"""
+        if self._ajax_lock is None:
+            self._ajax_lock = asyncio.Lock()
+
+        async with self._ajax_lock:
+            await self.call('ajaxSpider', 'action', 'scan', url=target, inScope='true', subtreeOnly='true')
+            scan_key = f"ajax:{target}"
+            self.active_scans[scan_key] = {
+                'scan_id': scan_key, 'type': 'ajax_spider', 'target': target,
+                'progress': None, 'started_at': datetime.utcnow().isoformat()
+            }
+            try:
+                async def done() -> bool:
+                    data = await self.call('ajaxSpider', 'view', 'status')
+                    return data.get('status') == 'stopped'
+
+                if not await self._poll(done, time.monotonic() + timeout):
+                    logger.warning(f"ZAP Ajax Spider timed out for {target}, stopping and keeping partial results")
+                    await self.call('ajaxSpider', 'action', 'stop')
+
+                urls = []
+                async for item in self.ajax_results():
+                    header = item.get('requestHeader', '')
+                    parts = header.split(' ')
+                    if len(parts) > 1:
+                        urls.append(parts[1])
+                return urls
+            finally:
+                self.active_scans.pop(scan_key, None)
+
+    async def site_urls(self, base_url: str) -> List[str]:
+        data = await self.call('core', 'view', 'urls', baseurl=base_url)
+        return [url for url in data.get('urls', []) if url]
+
+
+class ZapService:
+    """Owns the background event loop and one ZapClient per (ZAP URL, API key)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._clients: Dict[Tuple[str, str], ZapClient] = {}
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='zap-client', daemon=True)
+                thread.start()
+                self._loop = loop
+            return self._loop
+
+    def client(self, base_url: str, api_key: str) -> ZapClient:
+        key = (base_url.rstrip('/'), api_key)
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = ZapClient(base_url, api_key)
+            return self._clients[key]
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the ZAP loop from any thread and wait for its result"""
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+        return future.result(timeout)
+
+    def active_scans(self) -> List[Dict]:
+        with self._lock:
+            clients = list(self._clients.values())
+        return [dict(scan, zap=client.base_url) for client in clients for scan in list(client.active_scans.values())]
+
+
+zap_service = ZapService()
+
+
+def get_active_zap_scans() -> List[Dict]:
+    """Spider scans currently running through this process"""
+    return zap_service.active_scans()
@@ -1,5 +1,6 @@
-from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks, Query
+from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict
 from sqlalchemy.orm import Session
@@ -37,6 +38,18 @@ from src.controllers.content_discovery import (
     get_api_parameters
 )
 
+from src.controllers.passive_cache import get_cache_stats, clear_cache
+from src.controllers.param_mining import mine_parameters
+from src.controllers.adaptive_wordlist import build_adaptive_wordlist
+from src.controllers.wordlist_index import resolve_wordlist
+from src.controllers.zap_client import get_active_zap_scans
+
+from src.controllers.content_batch import (
+    create_content_batch,
+    run_content_batch,
+    get_content_batch_progress
+)
+
 from src.controllers.port_scanner import (
     start_port_scan,
     get_ports_by_target,
@@ -76,6 +89,7 @@ from src.controllers.validation import (
 
 from src.controllers.vuln_scanner import (
     run_vulnerability_scan,
+    run_batch_vulnerability_scan,
     get_vuln_stats_by_workspace,
     get_vuln_summary
 )
@@ -163,15 +177,21 @@ class ProbeHostsResponse(BaseModel):
 
 
 # Content Discovery Models
-class ContentDiscoveryRequest(BaseModel):
-    target_url: str = Field(..., description="Target URL to scan", example="https://example.com")
-    workspace_id: Optional[str] = Field(None, description="Workspace ID for isolation")
+class ContentDiscoveryOptions(BaseModel):
     scan_type: str = Field("full", description="Type of scan: full, fuzzing, passive, crawling, js_analysis, api")
     
     # Fuzzing options
     use_ffuf: bool = Field(True, description="Use ffuf for fuzzing")
     use_feroxbuster: bool = Field(True, description="Use feroxbuster for recursive fuzzing")
     wordlist: str = Field("/opt/wordlists/common.txt", description="Path to wordlist file")
+    recursive_fuzzing: bool = Field(True, description="Fuzz the most promising discovered directories")
+    recursion_request_budget: int = Field(50000, description="Follow-up fuzzing requests per target", ge=0, le=1000000)
+    recursion_max_depth: int = Field(3, description="Deepest directory level to recurse into", ge=1, le=10)
+    wordlist_extensions: Optional[List[str]] = Field(None, description="Extensions to append to every word, e.g. [\"php\", \"bak\"]")
+    wordlist_shards: int = Field(1, description="Split the deduplicated wordlist into this many checkpointed shards", ge=1, le=1000)
+    fuzz_workers: int = Field(1, description="Parallel ffuf/feroxbuster workers per tool", ge=1, le=16)
+    adaptive_wordlist: bool = Field(False, description="Rank words by hit rate across the workspace's discoveries")
+    adaptive_wordlist_limit: int = Field(5000, description="Maximum words in the adaptive wordlist", ge=1, le=1000000)
     
     # Passive options
     use_waymore: bool = Field(True, description="Use waymore for archive discovery")
@@ -188,22 +208,42 @@ class ContentDiscoveryRequest(BaseModel):
     # JS Analysis
     use_linkfinder: bool = Field(True, description="Use LinkFinder for JS analysis")
     use_jsluice: bool = Field(False, description="Use jsluice for JS URL extraction")
+    use_js_fetch: bool = Field(True, description="Fetch discovered .js files and extract endpoints")
+    js_fetch_limit: int = Field(500, description="Max JS files fetched per scan", ge=1, le=5000)
     
     # Parameter Discovery
     use_paramspider: bool = Field(False, description="Use ParamSpider for parameter mining")
+    mine_parameters: bool = Field(True, description="Extract query parameters from all saved URLs")
     
     # Specialized
-    use_unfurl: bool = Field(True, description="Use unfurl for URL parsing")
-    use_uro: bool = Field(True, description="Use uro for URL filtering")
+    use_unfurl: bool = Field(True, description="Canonicalize URLs (in-process, replaces unfurl)")
+    use_uro: bool = Field(True, description="Reduce URLs by pattern (in-process, replaces uro)")
     use_nuclei: bool = Field(False, description="Use nuclei for vulnerability templates")
     
     # General options
     threads: int = Field(10, description="Number of threads", ge=1, le=50)
     timeout: int = Field(600, description="Timeout in seconds", ge=60, le=1800)
     rate_limit: int = Field(150, description="Requests per second", ge=10, le=500)
+    max_active_tools: int = Field(2, description="Tools hitting the target at once (rate_limit is shared)", ge=1, le=10)
+    max_parallel_tools: int = Field(4, description="Tools running at once, including passive ones", ge=1, le=16)
+    calibrate: bool = Field(True, description="Probe random paths first and filter soft-404/wildcard responses")
+    refresh_passive_cache: bool = Field(False, description="Re-run gau/waymore/paramspider instead of using cached output")
+
+
+class ContentDiscoveryRequest(ContentDiscoveryOptions):
+    target_url: str = Field(..., description="Target URL to scan", example="https://example.com")
+    workspace_id: Optional[str] = Field(None, description="Workspace ID for isolation")
     subdomain_id: Optional[int] = Field(None, description="Link to subdomain ID")
 
 
+class BatchContentDiscoveryRequest(ContentDiscoveryOptions):
+    is_active: Optional[bool] = Field(True, description="Only hosts with this probe state (null for all)")
+    http_status: Optional[List[int]] = Field(None, description="Only hosts answering with one of these HTTP(S) status codes")
+    min_risk_score: Optional[int] = Field(None, description="Minimum host risk score", ge=0, le=100)
+    max_risk_score: Optional[int] = Field(None, description="Maximum host risk score", ge=0, le=100)
+    max_concurrent: int = Field(3, description="Hosts scanned at once", ge=1, le=10)
+
+
 # Port Scanning Models
 class PortScanRequest(BaseModel):
     targets: List[str] = Field(..., description="List of IPs or domains to scan", example=["example.com"])
@@ -246,6 +286,8 @@ class VulnScanRequest(BaseModel):
     rate_limit: int = Field(150, description="Requests per second", ge=10, le=500)
     scan_type: str = Field("quick", description="Scan type: quick, full, comprehensive")
     save_to_db: bool = Field(True, description="Save results to database")
+    smart_templates: bool = Field(True, description="Run only templates matching the target's known technologies")
+    incremental: bool = Field(True, description="If the target is unchanged since its last scan, run only new or changed templates")
 
 
 class BatchVulnScanRequest(BaseModel):
@@ -256,6 +298,8 @@ class BatchVulnScanRequest(BaseModel):
     concurrency: int = Field(10, description="Concurrent requests per scanner")
     timeout: int = Field(300, description="Timeout per scan")
     save_to_db: bool = Field(True, description="Save results to database")
+    smart_templates: bool = Field(True, description="Run only templates matching each target's known technologies")
+    incremental: bool = Field(True, description="For targets unchanged since their last scan, run only new or changed templates")
 
 
 # Validation Models
@@ -270,6 +314,7 @@ class DomainValidationRequest(BaseModel):
     workspace_id: Optional[str] = Field(None, description="Workspace ID for isolation")
     limit: int = Field(10, description="Max targets to validate", ge=1, le=50)
     min_risk_score: int = Field(30, description="Minimum risk score", ge=0, le=100)
+    max_concurrent: int = Field(10, description="Targets validated at once", ge=1, le=50)
 
 
 # ==================== Startup Event ====================
@@ -548,6 +593,14 @@ async def scan_content(request: ContentDiscoveryRequest):
             use_ffuf=request.use_ffuf,
             use_feroxbuster=request.use_feroxbuster,
             wordlist=request.wordlist,
+            recursive_fuzzing=request.recursive_fuzzing,
+            recursion_request_budget=request.recursion_request_budget,
+            recursion_max_depth=request.recursion_max_depth,
+            wordlist_extensions=request.wordlist_extensions,
+            wordlist_shards=request.wordlist_shards,
+            fuzz_workers=request.fuzz_workers,
+            adaptive_wordlist=request.adaptive_wordlist,
+            adaptive_wordlist_limit=request.adaptive_wordlist_limit,
             use_waymore=request.use_waymore,
             use_gau=request.use_gau,
             use_katana=request.use_katana,
@@ -558,13 +611,20 @@ async def scan_content(request: ContentDiscoveryRequest):
             crawl_depth=request.crawl_depth,
             use_linkfinder=request.use_linkfinder,
             use_jsluice=request.use_jsluice,
+            use_js_fetch=request.use_js_fetch,
+            js_fetch_limit=request.js_fetch_limit,
             use_paramspider=request.use_paramspider,
+            mine_parameters=request.mine_parameters,
             use_unfurl=request.use_unfurl,
             use_uro=request.use_uro,
             use_nuclei=request.use_nuclei,
             threads=request.threads,
             timeout=request.timeout,
             rate_limit=request.rate_limit,
+            max_active_tools=request.max_active_tools,
+            max_parallel_tools=request.max_parallel_tools,
+            calibrate=request.calibrate,
+            refresh_passive_cache=request.refresh_passive_cache,
             subdomain_id=request.subdomain_id
         )
         return result
@@ -625,6 +685,114 @@ async def get_interesting(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/v1/scan/content/batch/{workspace_id}")
+async def scan_content_batch(
+    workspace_id: str,
+    request: BatchContentDiscoveryRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """Start content discovery on every matching host in a workspace"""
+    try:
+        workspace = get_workspace_db(db, workspace_id)
+        if not workspace:
+            raise HTTPException(status_code=404, detail="Workspace not found")
+        
+        batch = create_content_batch(
+            db,
+            workspace_id=workspace_id,
+            is_active=request.is_active,
+            http_status=request.http_status,
+            min_risk_score=request.min_risk_score,
+            max_risk_score=request.max_risk_score,
+            max_concurrent=request.max_concurrent,
+            **request.model_dump(include=set(ContentDiscoveryOptions.model_fields))
+        )
+        
+        if batch.hosts:
+            background_tasks.add_task(run_content_batch, batch.id)
+        
+        return batch.to_dict(include_hosts=False)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Batch content discovery failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/v1/content/batch/{batch_id}")
+async def get_content_batch_status(batch_id: str, include_hosts: bool = Query(True)):
+    """Aggregated and per-host progress of a batch content discovery run"""
+    progress = get_content_batch_progress(batch_id, include_hosts=include_hosts)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return progress
+
+
+@app.post("/api/v1/content/parameters/mine/{workspace_id}")
+async def mine_workspace_parameters(
+    workspace_id: str,
+    target_url: Optional[str] = Query(None, description="Limit to one scan target")
+):
+    """Rebuild the query-parameter inventory from URLs already discovered in a workspace"""
+    try:
+        upserted = mine_parameters(workspace_id=workspace_id, target_url=target_url)
+        return {"workspace_id": workspace_id, "target_url": target_url, "parameters_upserted": upserted}
+    except Exception as e:
+        logger.error(f"Parameter mining failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/v1/content/wordlist/adaptive/{workspace_id}")
+async def build_workspace_wordlist(
+    workspace_id: str,
+    base_wordlist: Optional[str] = Query("/opt/wordlists/common.txt", description="Static wordlist appended after mined words (a name or path inside WORDLIST_DIR)"),
+    limit: int = Query(5000, ge=1, le=1000000)
+):
+    """Build a wordlist ranked by hit rate across a workspace's discovered paths"""
+    try:
+        if base_wordlist:
+            base_wordlist = resolve_wordlist(base_wordlist)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        return build_adaptive_wordlist(workspace_id, base_wordlist=base_wordlist, limit=limit).to_dict()
+    except Exception as e:
+        logger.error(f"Adaptive wordlist failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/v1/content/zap/scans")
+async def zap_active_scans():
+    """ZAP spider scans currently running for content discovery"""
+    return {"scans": get_active_zap_scans()}
+
+
+@app.get("/api/v1/content/passive-cache/stats")
+async def passive_cache_stats():
+    """Size, age and hit rate of the gau/waymore/paramspider output cache"""
+    try:
+        return get_cache_stats()
+    except Exception as e:
+        logger.error(f"Failed to get passive cache stats: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.delete("/api/v1/content/passive-cache")
+async def passive_cache_clear(
+    tool: Optional[str] = Query(None, description="gau, waymore or paramspider"),
+    domain: Optional[str] = Query(None)
+):
+    """Drop cached passive source output"""
+    try:
+        return {"removed": clear_cache(tool=tool, domain=domain)}
+    except Exception as e:
+        logger.error(f"Failed to clear passive cache: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # ==================== PORT SCANNING ENDPOINTS ====================
 
 @app.post("/api/v1/scan/ports")
@@ -813,7 +981,9 @@ async def nuclei_scan(request: VulnScanRequest, db: Session = Depends(get_db)):
             timeout=request.timeout,
             rate_limit=request.rate_limit,
             scan_type=request.scan_type,
-            save_to_db=request.save_to_db
+            save_to_db=request.save_to_db,
+            smart_templates=request.smart_templates,
+            incremental=request.incremental
         )
         return result
     except Exception as e:
@@ -823,34 +993,25 @@ async def nuclei_scan(request: VulnScanRequest, db: Session = Depends(get_db)):
 
 @app.post("/api/v1/vuln-scan/batch")
 async def batch_vuln_scan(request: BatchVulnScanRequest, db: Session = Depends(get_db)):
-    """Run vulnerability scans on multiple targets"""
-    import uuid
+    """Run vulnerability scans on multiple targets (nuclei scans all targets in one run)"""
     batch_id = str(uuid.uuid4())
     
-    results = []
-    
-    for target in request.targets:
-        for scanner in request.scanners:
-            try:
-                result = run_vulnerability_scan(
-                    target_url=target,
-                    workspace_id=request.workspace_id,
-                    scanner=scanner,
-                    templates=request.templates,
-                    concurrency=request.concurrency,
-                    timeout=request.timeout,
-                    save_to_db=request.save_to_db,
-                    batch_id=batch_id
-                )
-                results.append(result)
-            except Exception as e:
-                logger.error(f"Batch scan failed for {target} with {scanner}: {e}")
-                results.append({
-                    'target': target,
-                    'scanner': scanner,
-                    'status': 'failed',
-                    'error': str(e)
-                })
+    try:
+        results = run_batch_vulnerability_scan(
+            targets=request.targets,
+            workspace_id=request.workspace_id,
+            scanners=request.scanners,
+            templates=request.templates,
+            concurrency=request.concurrency,
+            timeout=request.timeout,
+            save_to_db=request.save_to_db,
+            batch_id=batch_id,
+            smart_templates=request.smart_templates,
+            incremental=request.incremental
+        )
+    except Exception as e:
+        logger.error(f"Batch vuln scan failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
     
     return {
         'batch_id': batch_id,
@@ -888,7 +1049,7 @@ async def get_vuln_summary_endpoint(
 # ==================== VALIDATION ENDPOINTS ====================
 
 @app.post("/api/v1/validate/target")
-async def validate_target(request: ValidationRequest, db: Session = Depends(get_db)):
+def validate_target(request: ValidationRequest, db: Session = Depends(get_db)):
     """Validate a single target for vulnerabilities"""
     try:
         result = validate_single_target(
@@ -904,7 +1065,7 @@ async def validate_target(request: ValidationRequest, db: Session = Depends(get_
 
 
 @app.post("/api/v1/validate/domain")
-async def validate_domain(request: DomainValidationRequest, db: Session = Depends(get_db)):
+def validate_domain(request: DomainValidationRequest, db: Session = Depends(get_db)):
     """Validate high-value targets for a domain"""
     try:
         results = validate_high_value_targets_for_domain(
@@ -912,7 +1073,8 @@ async def validate_domain(request: DomainValidationRequest, db: Session = Depend
             db=db,
             workspace_id=request.workspace_id,
             limit=request.limit,
-            min_risk_score=request.min_risk_score
+            min_risk_score=request.min_risk_score,
+            max_concurrent=request.max_concurrent
         )
         return {"domain": request.domain, "results": results}
     except Exception as e:
@@ -921,10 +1083,11 @@ async def validate_domain(request: DomainValidationRequest, db: Session = Depend
 
 
 @app.post("/api/v1/validate/workspace/{workspace_id}")
-async def validate_workspace(
+def validate_workspace(
     workspace_id: str,
     limit: int = Query(10, ge=1, le=50),
     min_risk_score: int = Query(30, ge=0, le=100),
+    max_concurrent: int = Query(10, ge=1, le=50),
     db: Session = Depends(get_db)
 ):
     """Validate high-value targets across a workspace"""
@@ -933,7 +1096,8 @@ async def validate_workspace(
             workspace_id=workspace_id,
             db=db,
             limit=limit,
-            min_risk_score=min_risk_score
+            min_risk_score=min_risk_score,
+            max_concurrent=max_concurrent
         )
         return {"workspace_id": workspace_id, "results": results}
     except Exception as e:
@@ -973,7 +1137,9 @@ async def get_workspace_validation_report_endpoint(
 # TODO: Migrate to Celery for production scale
 
 import uuid
+import asyncio
 from src.models.scan_job import ScanJob, ScanStatus
+from src.controllers.scan_events import scan_event_broker, format_sse, TERMINAL_STATUSES
 
 
 class AutoScanRequest(BaseModel):
@@ -984,6 +1150,17 @@ class AutoScanRequest(BaseModel):
 # In-memory tracking for running scans (will be replaced by Celery)
 _running_scans: Dict[str, bool] = {}
 
+# Seconds between SSE keep-alive comments when a job is quiet
+SSE_KEEPALIVE_INTERVAL = 15
+
+
+def _publish_job(job: ScanJob):
+    """Push job changes to SSE subscribers (never fails the scan)"""
+    try:
+        scan_event_broker.publish_job_state(job)
+    except Exception as e:
+        logger.warning(f"Failed to publish scan events for {job.id}: {e}")
+
 
 async def run_scan_background(job_id: str, db_url: str):
     """Background task to run the scan"""
@@ -1003,6 +1180,7 @@ async def run_scan_background(job_id: str, db_url: str):
         job.started_at = datetime.utcnow()
         job.add_log(f"Starting scan of {job.target_domain}")
         db.commit()
+        _publish_job(job)
         
         # Phase 1: Subdomains
         if _running_scans.get(job_id) and job.settings.get("enable_subdomains", True):
@@ -1011,6 +1189,7 @@ async def run_scan_background(job_id: str, db_url: str):
                 job.phase_progress["subdomains"] = 0
                 job.add_log("Starting subdomain enumeration", phase="subdomains")
                 db.commit()
+                _publish_job(job)
                 
                 from src.controllers.subdomains import start_subdomain_scan
                 config = {
@@ -1028,10 +1207,12 @@ async def run_scan_background(job_id: str, db_url: str):
                 job.phase_progress["subdomains"] = 100
                 job.add_log(f"Found {result.get('total', 0)} subdomains", phase="subdomains")
                 db.commit()
+                _publish_job(job)
             except Exception as e:
                 job.failed_phases = (job.failed_phases or []) + ["subdomains"]
                 job.add_log(f"Subdomain scan failed: {str(e)}", level="error", phase="subdomains")
                 db.commit()
+                _publish_job(job)
         
         # Phase 2: Live Hosts
         if _running_scans.get(job_id) and job.settings.get("enable_live_hosts", True):
@@ -1040,6 +1221,7 @@ async def run_scan_background(job_id: str, db_url: str):
                 job.phase_progress["live_hosts"] = 0
                 job.add_log("Starting live host detection", phase="live_hosts")
                 db.commit()
+                _publish_job(job)
                 
                 from src.controllers.http_prober import probe_workspace_subdomains
                 results = probe_workspace_subdomains(
@@ -1055,10 +1237,12 @@ async def run_scan_background(job_id: str, db_url: str):
                 job.phase_progress["live_hosts"] = 100
                 job.add_log(f"Found {live_count} live hosts", phase="live_hosts")
                 db.commit()
+                _publish_job(job)
             except Exception as e:
                 job.failed_phases = (job.failed_phases or []) + ["live_hosts"]
                 job.add_log(f"Live host detection failed: {str(e)}", level="error", phase="live_hosts")
                 db.commit()
+                _publish_job(job)
         
         # Complete
         if _running_scans.get(job_id):
@@ -1072,6 +1256,7 @@ async def run_scan_background(job_id: str, db_url: str):
             job.add_log("Scan was cancelled", level="warning")
         
         db.commit()
+        _publish_job(job)
         
     except Exception as e:
         logger.error(f"Scan failed: {e}")
@@ -1081,6 +1266,7 @@ async def run_scan_background(job_id: str, db_url: str):
             job.completed_at = datetime.utcnow()
             job.add_log(f"Scan failed: {str(e)}", level="error")
             db.commit()
+            _publish_job(job)
         except:
             pass
     finally:
@@ -1132,6 +1318,7 @@ async def start_autoscan(
         db.add(job)
         db.commit()
         db.refresh(job)
+        _publish_job(job)
         
         # Mark as running and queue background task
         _running_scans[job.id] = True
@@ -1169,6 +1356,55 @@ async def get_autoscan_status(workspace_id: str, db: Session = Depends(get_db)):
     }
 
 
+@app.get("/api/v1/autoscan/stream/{job_id}")
+async def stream_autoscan_job(job_id: str, request: Request, db: Session = Depends(get_db)):
+    """
+    Stream scan job progress as Server-Sent Events
+    
+    Sends one `snapshot` event with the full job, then `status`, `phase`,
+    `progress`, `counters` and `log` events as the background task publishes
+    them. The stream closes once the job reaches a terminal status.
+    """
+    # Subscribe before reading the snapshot so no event falls in between
+    queue = scan_event_broker.subscribe(job_id)
+    
+    job = db.query(ScanJob).filter(ScanJob.id == job_id).first()
+    if not job:
+        scan_event_broker.unsubscribe(job_id, queue)
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    snapshot = job.to_dict()
+    db.close()
+    
+    async def event_stream():
+        try:
+            yield format_sse("snapshot", snapshot)
+            if snapshot["status"] in TERMINAL_STATUSES:
+                return
+            
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                yield format_sse(message["event"], message["data"])
+                
+                if message["event"] == "status" and message["data"].get("status") in TERMINAL_STATUSES:
+                    break
+        finally:
+            scan_event_broker.unsubscribe(job_id, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get("/api/v1/autoscan/job/{job_id}")
 async def get_autoscan_job(job_id: str, db: Session = Depends(get_db)):
     """Get details of a specific scan job"""
@@ -1192,6 +1428,7 @@ async def pause_autoscan_endpoint(job_id: str, db: Session = Depends(get_db)):
     job.status = ScanStatus.PAUSED.value
     job.add_log("Scan paused by user", level="warning")
     db.commit()
+    _publish_job(job)
     
     return {"status": "paused", "job_id": job_id}
 
@@ -1209,6 +1446,7 @@ async def resume_autoscan_endpoint(job_id: str, db: Session = Depends(get_db)):
     job.status = ScanStatus.RUNNING.value
     job.add_log("Scan resumed by user")
     db.commit()
+    _publish_job(job)
     
     return {"status": "resumed", "job_id": job_id}
 
@@ -1230,6 +1468,7 @@ async def cancel_autoscan_endpoint(job_id: str, db: Session = Depends(get_db)):
     job.completed_at = datetime.utcnow()
     job.add_log("Scan cancelled by user", level="warning")
     db.commit()
+    _publish_job(job)
     
     return {"status": "cancelled", "job_id": job_id}
 
@@ -1246,6 +1485,7 @@ async def delete_autoscan_job(job_id: str, db: Session = Depends(get_db)):
     
     db.delete(job)
     db.commit()
+    scan_event_broker.forget(job_id)
     
     return {"status": "deleted", "job_id": job_id}
 
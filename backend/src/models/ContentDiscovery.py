@@ -3,11 +3,26 @@ Content Discovery Models
 Stores discovered content (APIs, endpoints, directories, JS files) with workspace isolation
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey, Index
+import hashlib
+
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Boolean, Text, Float, ForeignKey, Index
 from sqlalchemy.sql import func
 from src.config.database import Base
 
 
+def url_hash(value: str) -> int:
+    """
+    64-bit signed key for a URL (first 8 bytes of its MD5)
+    Matches url_hash_sql() so rows hashed in Python and in Postgres agree
+    """
+    return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big', signed=True)
+
+
+def url_hash_sql(expression: str) -> str:
+    """Postgres expression computing url_hash() of a text expression"""
+    return f"('x' || left(md5({expression}), 16))::bit(64)::bigint"
+
+
 class ContentDiscovery(Base):
     __tablename__ = "content_discovery"
     
@@ -20,6 +35,7 @@ class ContentDiscovery(Base):
     subdomain_id = Column(Integer, ForeignKey('subdomains.id', ondelete='SET NULL'), nullable=True)
     target_url = Column(String(512), nullable=False, index=True)
     discovered_url = Column(String(2048), nullable=False)
+    url_hash = Column(BigInteger, nullable=True)  # url_hash(discovered_url) - dedupe key
     path = Column(String(1024), nullable=True)
     
     # HTTP response info
@@ -48,7 +64,8 @@ class ContentDiscovery(Base):
     __table_args__ = (
         Index('idx_content_workspace_target', 'workspace_id', 'target_url'),
         Index('idx_content_workspace_type', 'workspace_id', 'discovery_type'),
-        Index('idx_content_target_url', 'target_url', 'discovered_url'),
+        Index('idx_content_workspace_url_hash', 'workspace_id', 'url_hash',
+              unique=True, postgresql_nulls_not_distinct=True),
     )
     
     def to_dict(self):
@@ -91,6 +108,7 @@ class JSEndpoint(Base):
     
     # Extracted endpoint
     endpoint = Column(String(2048), nullable=False)
+    endpoint_hash = Column(BigInteger, nullable=True)  # url_hash(endpoint) - dedupe key
     endpoint_type = Column(String(50), nullable=True)  # path, api, resource
     
     # Analysis
@@ -105,6 +123,8 @@ class JSEndpoint(Base):
     __table_args__ = (
         Index('idx_jsendpoint_workspace', 'workspace_id'),
         Index('idx_jsendpoint_source', 'source_url'),
+        Index('idx_jsendpoint_workspace_hash', 'workspace_id', 'endpoint_hash',
+              unique=True, postgresql_nulls_not_distinct=True),
     )
     
     def to_dict(self):
@@ -123,6 +143,11 @@ class JSEndpoint(Base):
         return f"<JSEndpoint(id={self.id}, endpoint={self.endpoint[:50] if self.endpoint else 'N/A'})>"
 
 
+def param_key(target_url: str, parameter_name: str, parameter_type: str = 'query') -> str:
+    """Canonical identity of a parameter: endpoint, name and location"""
+    return f"{target_url}\n{parameter_name}\n{parameter_type or 'query'}"
+
+
 class APIParameter(Base):
     """API parameters discovered during content analysis"""
     __tablename__ = "api_parameters"
@@ -138,16 +163,21 @@ class APIParameter(Base):
     # Parameter info
     parameter_name = Column(String(255), nullable=False)
     parameter_type = Column(String(50), nullable=True)  # query, body, header, path
+    param_hash = Column(BigInteger, nullable=True)  # url_hash(param_key(...)) - dedupe key
+    occurrence_count = Column(Integer, nullable=False, default=1, server_default='1')  # discovered URLs using it
     
     # Metadata
     scan_id = Column(String(36), nullable=True, index=True)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_seen_at = Column(DateTime(timezone=True), nullable=True)
     
     __table_args__ = (
         Index('idx_apiparam_workspace', 'workspace_id'),
         Index('idx_apiparam_target', 'target_url'),
+        Index('idx_apiparam_workspace_hash', 'workspace_id', 'param_hash',
+              unique=True, postgresql_nulls_not_distinct=True),
     )
     
     def to_dict(self):
@@ -157,8 +187,10 @@ class APIParameter(Base):
             'target_url': self.target_url,
             'parameter_name': self.parameter_name,
             'parameter_type': self.parameter_type,
+            'occurrence_count': self.occurrence_count,
             'scan_id': self.scan_id,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'last_seen_at': self.last_seen_at.isoformat() if self.last_seen_at else None
         }
     
     def __repr__(self):
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Index, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Boolean, Text, ForeignKey, Index, JSON
 from sqlalchemy.sql import func
 from datetime import datetime
 
@@ -6,11 +6,17 @@ from datetime import datetime
 from src.config.database import Base
 
 
+def finding_key(template_id: str, matched_at: str) -> str:
+    """Text hashed into VulnFinding.finding_hash (see url_hash)"""
+    return f"{template_id}\n{matched_at}"
+
+
 class VulnScan(Base):
     """Store vulnerability scan results"""
     __tablename__ = 'vuln_scans'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
+    workspace_id = Column(String(36), ForeignKey('workspaces.id', ondelete='CASCADE'), nullable=True, index=True)
     subdomain_id = Column(Integer, nullable=True, index=True)  # Reference to subdomains table
     target = Column(String(512), nullable=False, index=True)  # Target URL or domain
     scanner = Column(String(50), nullable=False, index=True)  # nuclei, nikto, sqlmap, etc.
@@ -32,6 +38,8 @@ class VulnScan(Base):
     scan_duration = Column(String(50))  # e.g., "12.5s"
     templates_used = Column(JSON)  # For nuclei: list of template categories
     scan_config = Column(JSON)  # Configuration used for this scan
+    template_version = Column(String(32))  # Nuclei template index version scanned with
+    target_fingerprint = Column(String(64))  # Probe response, open ports and technologies at scan time
     
     # Status
     status = Column(String(20), default='completed', index=True)  # running, completed, failed, stopped
@@ -52,6 +60,7 @@ class VulnScan(Base):
         Index('idx_vuln_target_scanner', 'target', 'scanner'),
         Index('idx_vuln_scan_status', 'scan_id', 'status'),
         Index('idx_vuln_severity', 'critical_count', 'high_count'),
+        Index('idx_vuln_workspace_target', 'workspace_id', 'target', 'scanner'),
     )
     
     def __repr__(self):
@@ -60,6 +69,7 @@ class VulnScan(Base):
     def to_dict(self):
         return {
             'id': self.id,
+            'workspace_id': self.workspace_id,
             'subdomain_id': self.subdomain_id,
             'target': self.target,
             'scanner': self.scanner,
@@ -75,6 +85,8 @@ class VulnScan(Base):
             'scan_duration': self.scan_duration,
             'templates_used': self.templates_used,
             'scan_config': self.scan_config,
+            'template_version': self.template_version,
+            'target_fingerprint': self.target_fingerprint,
             'status': self.status,
             'error_message': self.error_message,
             'scan_id': self.scan_id,
@@ -91,7 +103,8 @@ class VulnFinding(Base):
     __tablename__ = 'vuln_findings'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    vuln_scan_id = Column(Integer, ForeignKey('vuln_scans.id'), nullable=False, index=True)
+    vuln_scan_id = Column(Integer, ForeignKey('vuln_scans.id'), nullable=False, index=True)  # Latest scan that reported it
+    workspace_id = Column(String(36), ForeignKey('workspaces.id', ondelete='CASCADE'), nullable=True, index=True)
     subdomain_id = Column(Integer, nullable=True, index=True)
     
     # Vulnerability details
@@ -102,6 +115,7 @@ class VulnFinding(Base):
     # Location
     target_url = Column(Text, nullable=False)
     matched_at = Column(Text)  # Specific URL/endpoint where vuln was found
+    finding_hash = Column(BigInteger, nullable=True)  # url_hash(finding_key(template_id, matched_at)) - dedupe key
     
     # Evidence
     description = Column(Text)
@@ -136,6 +150,8 @@ class VulnFinding(Base):
     __table_args__ = (
         Index('idx_finding_severity_status', 'severity', 'status'),
         Index('idx_finding_type_scanner', 'vuln_type', 'scanner'),
+        Index('idx_finding_workspace_hash', 'workspace_id', 'finding_hash',
+              unique=True, postgresql_nulls_not_distinct=True),
     )
     
     def __repr__(self):
@@ -145,6 +161,7 @@ class VulnFinding(Base):
         return {
             'id': self.id,
             'vuln_scan_id': self.vuln_scan_id,
+            'workspace_id': self.workspace_id,
             'subdomain_id': self.subdomain_id,
             'name': self.name,
             'vuln_type': self.vuln_type,
@@ -7,6 +7,7 @@ from src.models.Workspace import Workspace
 from src.models.Subdomain import Subdomain
 from src.models.ContentDiscovery import ContentDiscovery, JSEndpoint, APIParameter
 from src.models.PortScan import PortScan
+from src.models.VulnScan import VulnScan, VulnFinding
 from src.models.scan_job import ScanJob, ScanStatus
 
 __all__ = [
@@ -16,6 +17,8 @@ __all__ = [
     'JSEndpoint',
     'APIParameter',
     'PortScan',
+    'VulnScan',
+    'VulnFinding',
     'ScanJob',
     'ScanStatus'
 ]
\ No newline at end of file
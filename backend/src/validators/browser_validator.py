@@ -8,9 +8,11 @@ For full JavaScript analysis, install Selenium separately
 import requests
 from typing import List, Dict, Optional
 import logging
-import re
 from urllib.parse import urlparse
 
+from .js_scanner import SINK_SEVERITY, ScanResult, scan_text
+from .response_cache import CachedResponse, ResponseCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,12 +22,26 @@ class BrowserValidator:
     For full JS analysis, use Selenium version
     """
     
-    def __init__(self, timeout: int = 10):
+    def __init__(self, timeout: int = 10, session: Optional[requests.Session] = None,
+                 cache: Optional[ResponseCache] = None):
         self.timeout = timeout
-        self.session = requests.Session()
+        self.session = session or requests.Session()
         self.session.verify = False
+        self.cache = cache or ResponseCache()
+        self._scans: Dict[str, ScanResult] = {}
         requests.packages.urllib3.disable_warnings()
+    
+    def _get(self, url: str) -> CachedResponse:
+        """GET through the run's response cache (every static check reads the same page)"""
+        return self.cache.fetch('GET', url, lambda: self.session.get(url, timeout=self.timeout))
         
+    def _scan(self, url: str) -> ScanResult:
+        """Sinks and endpoints of a page, from one scan shared by both static checks"""
+        result = self._scans.get(url)
+        if result is None:
+            result = self._scans[url] = scan_text(self._get(url).text)
+        return result
+    
     def detect_sinks_static(self, url: str) -> List[Dict]:
         """
         Detect dangerous JavaScript sinks via static analysis
@@ -34,27 +50,17 @@ class BrowserValidator:
         sinks_found = []
         
         try:
-            response = self.session.get(url, timeout=self.timeout)
-            html = response.text
-            
-            # Pattern matching for dangerous sinks
-            sink_patterns = {
-                'eval': r'eval\s*\(',
-                'innerHTML': r'\.innerHTML\s*=',
-                'document.write': r'document\.write\s*\(',
-                'setTimeout_string': r'setTimeout\s*\(\s*["\']',
-                'javascript_protocol': r'href\s*=\s*["\']javascript:',
-            }
+            sink_counts = self._scan(url).sink_counts
             
-            for sink_type, pattern in sink_patterns.items():
-                matches = re.findall(pattern, html, re.IGNORECASE)
-                if matches:
+            for sink_type, severity in SINK_SEVERITY.items():
+                count = sink_counts.get(sink_type, 0)
+                if count:
                     sinks_found.append({
                         'url': url,
                         'sink_type': sink_type,
-                        'count': len(matches),
-                        'severity': 'HIGH' if sink_type in ['eval', 'javascript_protocol'] else 'MEDIUM',
-                        'evidence': f'Found {len(matches)} instances of {sink_type}'
+                        'count': count,
+                        'severity': severity,
+                        'evidence': f'Found {count} instances of {sink_type}'
                     })
                     
         except Exception as e:
@@ -69,30 +75,17 @@ class BrowserValidator:
         endpoints = []
         
         try:
-            response = self.session.get(url, timeout=self.timeout)
-            html = response.text
+            found = self._scan(url).endpoints
             
-            # Find fetch() calls
-            fetch_pattern = r'fetch\s*\(\s*["\']([^"\']+)["\']'
-            fetch_matches = re.findall(fetch_pattern, html)
-            
-            for endpoint in fetch_matches:
-                endpoints.append({
-                    'url': endpoint,
-                    'type': 'fetch',
-                    'discovered_via': 'static_analysis'
-                })
-            
-            # Find $.ajax() calls
-            ajax_pattern = r'\$\.ajax\s*\(\s*\{[^}]*url\s*:\s*["\']([^"\']+)["\']'
-            ajax_matches = re.findall(ajax_pattern, html)
-            
-            for endpoint in ajax_matches:
-                endpoints.append({
-                    'url': endpoint,
-                    'type': 'jquery_ajax',
-                    'discovered_via': 'static_analysis'
-                })
+            # fetch() calls first, then $.ajax() calls
+            for endpoint_type in ('fetch', 'jquery_ajax'):
+                for found_type, endpoint in found:
+                    if found_type == endpoint_type:
+                        endpoints.append({
+                            'url': endpoint,
+                            'type': endpoint_type,
+                            'discovered_via': 'static_analysis'
+                        })
                 
         except Exception as e:
             logger.debug(f"AJAX endpoint discovery error: {e}")
@@ -104,7 +97,7 @@ class BrowserValidator:
         Test for clickjacking via HTTP headers
         """
         try:
-            response = self.session.get(url, timeout=self.timeout)
+            response = self._get(url)
             
             xfo = response.headers.get('X-Frame-Options')
             csp = response.headers.get('Content-Security-Policy')
@@ -155,9 +148,14 @@ class BrowserValidator:
         return results
 
 
-def validate_high_value_target(target_url: str, discovered_paths: List[str] = None) -> Dict:
+def validate_high_value_target(target_url: str, discovered_paths: List[str] = None,
+                               session: Optional[requests.Session] = None) -> Dict:
     """
     Complete validation pipeline
+    
+    The HTTP checks run on their own async engine and the browser checks on
+    the given (e.g. rate-limited) session; both share one response cache, so
+    a URL is fetched once per run.
     """
     from .webapp_validator import WebAppValidator
     
@@ -171,14 +169,15 @@ def validate_high_value_target(target_url: str, discovered_paths: List[str] = No
     }
     
     # HTTP validation
-    http_validator = WebAppValidator()
+    cache = ResponseCache()
+    http_validator = WebAppValidator(cache=cache)
     results['http_validation'] = http_validator.validate_target(
         target_url,
         discovered_paths=discovered_paths
     )
     
     # Browser validation
-    browser_validator = BrowserValidator()
+    browser_validator = BrowserValidator(session=session, cache=cache)
     results['browser_validation'] = browser_validator.comprehensive_validation(target_url)
     
     # Aggregate
@@ -187,5 +186,6 @@ def validate_high_value_target(target_url: str, discovered_paths: List[str] = No
         results['browser_validation']['total_issues']
     )
     results['critical_vulns'] = results['http_validation']['critical_vulns']
+    results['response_cache'] = cache.to_dict()
     
     return results
\ No newline at end of file
@@ -0,0 +1,202 @@
+"""
+Async HTTP Engine
+Concurrent request engine for the validator checks
+
+One httpx.AsyncClient per validation keeps connections alive per host. A
+per-host semaphore bounds in-flight requests, and the process-wide token
+bucket shared with the validation scheduler bounds their rate. Bodies are
+streamed, so a check can stop reading once it has seen what it needs, and
+first_result() lets a check stop all its remaining requests as soon as one
+of them produces a proof. With a ResponseCache, a request already answered
+during the run is served from memory.
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+from urllib.parse import urlsplit
+
+import httpx
+from requests.structures import CaseInsensitiveDict
+
+from src.controllers.validation_scheduler import TokenBucket, bucket_for_host
+from .response_cache import CachedResponse, ResponseCache, cache_key
+
+logger = logging.getLogger(__name__)
+
+# Requests in flight to one host at a time
+VALIDATION_HOST_CONCURRENCY = int(os.getenv('VALIDATION_HOST_CONCURRENCY', '6'))
+
+# Bodies are cut off here; checks only look for markers near the top of a page
+MAX_BODY_BYTES = 1024 * 1024
+
+T = TypeVar('T')
+
+
+class EngineResponse:
+    """Status and headers of a streamed response; the body is read on demand"""
+
+    def __init__(self, response: httpx.Response):
+        self._response = response
+        self.url = str(response.url)
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.content = b''
+        self.complete = False
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self._response.charset_encoding or 'utf-8', errors='replace')
+
+    async def read(self, max_bytes: int = MAX_BODY_BYTES,
+                   until: Optional[Callable[[bytes], bool]] = None) -> bytes:
+        """
+        Read the body up to max_bytes, stopping early once until(body_so_far) is true
+
+        Stopping early drops the connection instead of returning it to the pool,
+        which is still cheaper than downloading a large file.
+        """
+        chunks = []
+        size = 0
+        async for chunk in self._response.aiter_bytes():
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= max_bytes or (until and until(b''.join(chunks))):
+                break
+        else:
+            self.complete = True
+        self.content = b''.join(chunks)[:max_bytes]
+        return self.content
+
+    def to_cached(self) -> CachedResponse:
+        return CachedResponse(
+            url=self.url,
+            status_code=self.status_code,
+            headers=CaseInsensitiveDict(self.headers),
+            content=self.content,
+            complete=self.complete,
+            encoding=self._response.charset_encoding
+        )
+
+
+class AsyncHTTPEngine:
+    def __init__(self, timeout: int = 10, max_per_host: int = VALIDATION_HOST_CONCURRENCY,
+                 rate_limit: bool = True, cache: Optional[ResponseCache] = None):
+        self.timeout = timeout
+        self.max_per_host = max(1, max_per_host)
+        self.rate_limit = rate_limit
+        self.cache = cache
+        self.requests = 0
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    async def __aenter__(self) -> 'AsyncHTTPEngine':
+        limits = httpx.Limits(max_connections=self.max_per_host * 4, max_keepalive_connections=self.max_per_host * 4)
+        self._client = httpx.AsyncClient(timeout=self.timeout, verify=False, limits=limits)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._client.aclose()
+        return False
+
+    def _slots(self, host: str) -> asyncio.Semaphore:
+        slots = self._host_slots.get(host)
+        if slots is None:
+            slots = self._host_slots[host] = asyncio.Semaphore(self.max_per_host)
+        return slots
+
+    async def _wait_for_rate(self, host: str):
+        if not self.rate_limit:
+            return
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = bucket_for_host(host)
+        delay = bucket.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _cache_key(self, method: str, url: str, kwargs: Dict):
+        return cache_key(method, url, kwargs.get('data'), kwargs.get('follow_redirects', False))
+
+    @asynccontextmanager
+    async def _send(self, method: str, url: str, key, **kwargs) -> AsyncIterator[EngineResponse]:
+        host = (urlsplit(url).hostname or '').lower()
+        async with self._slots(host):
+            await self._wait_for_rate(host)
+            self.requests += 1
+            async with self._client.stream(method, url, **kwargs) as response:
+                engine_response = EngineResponse(response)
+                yield engine_response
+        # Whatever part of the body the caller read is cached
+        if key:
+            self.cache.put(key, engine_response.to_cached())
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[EngineResponse]:
+        """
+        Send a request and yield its response with the body still unread (raises httpx.HTTPError)
+
+        A fully cached response is yielded instead of sending.
+        """
+        key = self._cache_key(method, url, kwargs) if self.cache else None
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            yield cached
+            return
+        async with self._send(method, url, key, **kwargs) as response:
+            yield response
+
+    async def request(self, method: str, url: str, max_bytes: int = MAX_BODY_BYTES,
+                      **kwargs) -> Optional[EngineResponse]:
+        """Send a request and read its body (up to max_bytes). Returns None on connection errors."""
+        key = self._cache_key(method, url, kwargs) if self.cache else None
+        cached = self.cache.get(key, min_bytes=max_bytes) if key else None
+        if cached is not None:
+            return cached
+        try:
+            async with self._send(method, url, key, **kwargs) as response:
+                if max_bytes:
+                    await response.read(max_bytes)
+                return response
+        except httpx.HTTPError as e:
+            logger.debug(f"{method} {url} failed: {e}")
+            return None
+
+    async def first_result(self, attempts: List[Awaitable[Optional[T]]]) -> Optional[T]:
+        """
+        Run attempts concurrently and return the first non-None result
+
+        The remaining attempts are cancelled as soon as one succeeds; an attempt
+        that raises counts as no result.
+        """
+        tasks = [asyncio.ensure_future(attempt) for attempt in attempts]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    result = await next_done
+                except Exception as e:
+                    logger.debug(f"Validation attempt failed: {e}")
+                    continue
+                if result is not None:
+                    return result
+            return None
+        finally:
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """Run a coroutine to completion (blocking; safe to call from inside a running event loop)"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
@@ -0,0 +1,134 @@
+"""
+Static JS Scanner
+Single-pass detection of dangerous sinks and AJAX endpoints in HTML/JS
+
+All sink and endpoint patterns are compiled once into one alternation and a
+document is scanned once instead of once per pattern. The alternation runs
+on an ASCII-lowercased copy of the text (sinks ignore ASCII case only),
+without IGNORECASE or groups, which keeps it on the regex engine's fast
+literal-prefix search. Every branch starts with a different character, so
+the first character of a match says which pattern it is; endpoint
+candidates are then confirmed (case-sensitive) and their URL extracted with
+an anchored match on the original text. Per-pattern end offsets keep counts
+identical to running re.findall per pattern.
+
+Large bodies are scanned in CHUNK_SIZE windows that overlap by MAX_MATCH
+characters. Repetitions are bounded so no match is longer than that, and a
+window only reports matches starting before its overlap, so each match is
+reported exactly once.
+"""
+
+import logging
+import re
+import string
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+# Longest URL captured, longest gap between `$.ajax({` and its url, longest run of whitespace
+MAX_CAPTURE = 2048
+MAX_SPACE = 64
+MAX_MATCH = 2 * MAX_CAPTURE + 4 * MAX_SPACE + 64
+
+SINK_SEVERITY = {
+    'eval': 'HIGH',
+    'innerHTML': 'MEDIUM',
+    'document.write': 'MEDIUM',
+    'setTimeout_string': 'MEDIUM',
+    'javascript_protocol': 'HIGH',
+}
+
+_S = rf'\s{{0,{MAX_SPACE}}}'
+
+# Lowercase branches, one per pattern; the first character identifies the branch
+_BRANCHES = {
+    'e': ('eval', rf'eval{_S}\('),
+    '.': ('innerHTML', rf'\.innerhtml{_S}='),
+    'd': ('document.write', rf'document\.write{_S}\('),
+    's': ('setTimeout_string', rf'settimeout{_S}\({_S}["\']'),
+    'h': ('javascript_protocol', rf'href{_S}={_S}["\']javascript:'),
+    'f': ('fetch', rf'fetch{_S}\('),
+    '$': ('jquery_ajax', r'\$\.ajax'),
+}
+
+SCANNER_PATTERN = re.compile('|'.join(pattern for _, pattern in _BRANCHES.values()))
+
+# Case-sensitive endpoint patterns, matched at a candidate's position in the original text
+ENDPOINT_PATTERNS = {
+    'fetch': re.compile(rf'fetch{_S}\({_S}["\']([^"\']{{1,{MAX_CAPTURE}}})["\']'),
+    'jquery_ajax': re.compile(
+        rf'\$\.ajax{_S}\({_S}\{{[^}}]{{0,{MAX_CAPTURE}}}url{_S}:{_S}["\']([^"\']{{1,{MAX_CAPTURE}}})["\']'
+    ),
+}
+
+# Length-preserving lowercase (str.lower can change the length of non-ASCII text)
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+@dataclass
+class ScanResult:
+    sink_counts: Dict[str, int] = field(default_factory=dict)
+    endpoints: List[Tuple[str, str]] = field(default_factory=list)  # (type, url) in document order
+    chars: int = 0
+
+
+class JSScanner:
+    """Incremental scanner: feed() text as it arrives, then finish()"""
+
+    def __init__(self):
+        self.result = ScanResult()
+        self._buffer = ''
+        self._offset = 0  # absolute position of _buffer[0]
+        self._ends: Dict[str, int] = {}  # absolute end of each pattern's last match
+
+    def _scan(self, final: bool):
+        text = self._buffer
+        limit = len(text) if final else max(0, len(text) - MAX_MATCH)
+        for match in SCANNER_PATTERN.finditer(text.translate(_ASCII_LOWER)):
+            position = match.start()
+            if position >= limit:
+                break
+            name = _BRANCHES[match.group()[0]][0]
+            # Same non-overlapping semantics as re.findall for each pattern on its own
+            if self._offset + position < self._ends.get(name, 0):
+                continue
+
+            endpoint_pattern = ENDPOINT_PATTERNS.get(name)
+            if endpoint_pattern is None:
+                end = match.end()
+                self.result.sink_counts[name] = self.result.sink_counts.get(name, 0) + 1
+            else:
+                exact = endpoint_pattern.match(text, position)
+                if exact is None:
+                    continue
+                end = exact.end()
+                self.result.endpoints.append((name, exact.group(1)))
+            self._ends[name] = self._offset + end
+
+        self._buffer = text[limit:]
+        self._offset += limit
+
+    def feed(self, text: str):
+        self.result.chars += len(text)
+        self._buffer += text
+        if len(self._buffer) >= CHUNK_SIZE + MAX_MATCH:
+            self._scan(final=False)
+
+    def finish(self) -> ScanResult:
+        self._scan(final=True)
+        return self.result
+
+
+def scan_chunks(chunks: Iterable[str]) -> ScanResult:
+    scanner = JSScanner()
+    for chunk in chunks:
+        scanner.feed(chunk)
+    return scanner.finish()
+
+
+def scan_text(text: str) -> ScanResult:
+    """Scan a whole document in CHUNK_SIZE windows"""
+    return scan_chunks(text[i:i + CHUNK_SIZE] for i in range(0, len(text), CHUNK_SIZE))
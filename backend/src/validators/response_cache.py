@@ -0,0 +1,133 @@
+"""
+Validation Response Cache
+Responses shared by every check of one validation run
+
+Several checks look at the same page: the static sink, AJAX endpoint and
+clickjacking checks all fetch the target URL. Responses are cached by
+method, URL, body and redirect handling, so the first check pays for the
+request and the rest read it from memory. The cache lives for one run and
+is bounded by entry count and total body bytes (least recently used entries
+go first); bodies above MAX_ENTRY_BYTES aren't cached at all.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRIES = 256
+MAX_TOTAL_BYTES = 32 * 1024 * 1024
+MAX_ENTRY_BYTES = 2 * 1024 * 1024
+
+CacheKey = Tuple[str, str, str, bool]
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    status_code: int
+    headers: CaseInsensitiveDict
+    content: bytes
+    complete: bool = True  # False when only the start of the body was read
+    encoding: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    async def read(self, max_bytes: Optional[int] = None, until: Optional[Callable[[bytes], bool]] = None) -> bytes:
+        """Same interface as a streamed engine response; the body is already here"""
+        return self.content if max_bytes is None else self.content[:max_bytes]
+
+    @classmethod
+    def from_requests(cls, response) -> 'CachedResponse':
+        return cls(
+            url=response.url,
+            status_code=response.status_code,
+            headers=CaseInsensitiveDict(response.headers),
+            content=response.content,
+            encoding=response.encoding
+        )
+
+
+def cache_key(method: str, url: str, body=None, follow_redirects: bool = True) -> CacheKey:
+    if body is None:
+        body_key = ''
+    elif isinstance(body, Mapping):
+        body_key = hashlib.sha1(repr(sorted(body.items())).encode()).hexdigest()
+    else:
+        body_key = hashlib.sha1(body if isinstance(body, bytes) else str(body).encode()).hexdigest()
+    return method.upper(), url, body_key, follow_redirects
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_total_bytes: int = MAX_TOTAL_BYTES,
+                 max_entry_bytes: int = MAX_ENTRY_BYTES):
+        self.max_entries = max_entries
+        self.max_total_bytes = max_total_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[CacheKey, CachedResponse]' = OrderedDict()
+        self._size = 0
+        # Browser checks run on a worker thread while HTTP checks run on their own event loop
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey, min_bytes: Optional[int] = None) -> Optional[CachedResponse]:
+        """
+        Cached response for a key
+
+        A partially read body only counts if it has at least min_bytes
+        (None means the whole body is needed).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.complete or (min_bytes is not None and len(entry.content) >= min_bytes)):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            return None
+
+    def put(self, key: CacheKey, response: CachedResponse):
+        size = len(response.content)
+        if size > self.max_entry_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous.content)
+                # Don't replace a full body with a shorter partial read
+                if previous.complete and not response.complete:
+                    response = previous
+                    size = len(previous.content)
+            self._entries[key] = response
+            self._size += size
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_total_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.content)
+
+    def fetch(self, method: str, url: str, send: Callable, body=None,
+              follow_redirects: bool = True) -> CachedResponse:
+        """Cached response, or send() it with a blocking client (a requests.Response) and cache it"""
+        key = cache_key(method, url, body, follow_redirects)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        response = CachedResponse.from_requests(send())
+        self.put(key, response)
+        return response
+
+    def to_dict(self) -> Dict:
+        return {
+            'entries': len(self._entries),
+            'bytes': self._size,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
